@@ -13,6 +13,12 @@ from routes.search import search_bp
 from routes.stream import stream_bp
 from routes.comments import comments_bp
 from routes.admin import admin_bp
+from routes.health import health_bp
+from routes.items import items_bp
+from routes.home import home_bp
+from routes.people import people_bp
+import db
+from utils import query_stats
 # Thêm vào app.py
 import logging
 logging.basicConfig(level=logging.DEBUG)
@@ -20,6 +26,8 @@ load_dotenv()
 
 app = Flask(__name__, static_folder="static")
 CORS(app)
+db.init_app(app)
+query_stats.init_app(app)
 
 @app.route('/api/static/<path:filename>')
 def serve_static(filename):
@@ -39,6 +47,10 @@ app.register_blueprint(search_bp, url_prefix='/api')
 app.register_blueprint(stream_bp, url_prefix='/api')
 app.register_blueprint(comments_bp, url_prefix='/api')
 app.register_blueprint(admin_bp, url_prefix='/api')
+app.register_blueprint(health_bp, url_prefix='/api')
+app.register_blueprint(items_bp, url_prefix='/api')
+app.register_blueprint(home_bp, url_prefix='/api')
+app.register_blueprint(people_bp, url_prefix='/api')
 
 
 if __name__ == '__main__':
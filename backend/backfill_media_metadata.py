@@ -0,0 +1,65 @@
+import os
+import sys
+import argparse
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from dotenv import load_dotenv
+from db import create_connection
+from utils.media_paths import movie_playlist_path, episode_playlist_path
+from utils.media_probe import probe_media, save_media_metadata
+
+load_dotenv()
+
+
+def pending_titles(cursor, reprobe):
+    """[(item_type, id, đường dẫn playlist)] của các title có video (chỉ title chưa probe nếu không reprobe)"""
+    where = '' if reprobe else 'AND media_probed_at IS NULL'
+    cursor.execute(f"SELECT id, video_file FROM movies WHERE video_file IS NOT NULL AND video_file <> '' {where}")
+    titles = [('movie', row['id'], movie_playlist_path(row['video_file'])) for row in cursor.fetchall()]
+    cursor.execute(f"SELECT id, filepath FROM show_episodes WHERE filepath <> '' {where}")
+    titles += [('episode', row['id'], episode_playlist_path(row['filepath'])) for row in cursor.fetchall()]
+    return titles
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Probe các thư mục HLS đã có và ghi metadata media vào DB")
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 1, help="số tiến trình ffprobe song song")
+    parser.add_argument('--all', action='store_true', help="probe lại cả title đã có metadata")
+    args = parser.parse_args()
+
+    conn = create_connection()
+    try:
+        with conn.cursor() as cursor:
+            titles = pending_titles(cursor, args.all)
+        print(f"[📂] {len(titles)} title cần probe, {args.workers} tiến trình")
+
+        updated = missing = failed = 0
+        # Đọc playlist + ffprobe chạy trong process pool; ghi DB tuần tự ở tiến trình chính
+        with ProcessPoolExecutor(max_workers=args.workers) as executor:
+            futures = {executor.submit(probe_media, path): (item_type, item_id, path) for item_type, item_id, path in titles}
+            for future in as_completed(futures):
+                item_type, item_id, path = futures[future]
+                try:
+                    metadata = future.result()
+                except Exception as e:
+                    print(f"[❌] {item_type} {item_id}: {e}")
+                    failed += 1
+                    continue
+                if metadata is None:
+                    print(f"[❌] {item_type} {item_id}: không tìm thấy {path}")
+                    missing += 1
+                    continue
+                with conn.cursor() as cursor:
+                    save_media_metadata(cursor, item_type, item_id, metadata)
+                conn.commit()
+                updated += 1
+                print(f"[✅] {item_type} {item_id}: {metadata['quality']}, {metadata['duration']}s, "
+                      f"{metadata['segment_count']} segment, {metadata['file_size']} byte")
+    finally:
+        conn.close()
+
+    print(f"[✅] Đã cập nhật {updated}, thiếu file {missing}, lỗi {failed}")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,77 @@
+import os
+import sys
+import time
+import argparse
+from flask import Flask
+from dotenv import load_dotenv
+import db
+from routes.stream import stream_bp
+from utils.media_paths import media_paths, playlist_path
+from utils.segments import sign_url, url_expiry
+
+load_dotenv()
+
+
+def create_app():
+    app = Flask(__name__)
+    db.init_app(app)
+    app.register_blueprint(stream_bp, url_prefix='/api')
+    return app
+
+
+def first_segment(key):
+    """Tên segment đầu tiên trong playlist của title"""
+    path = playlist_path(key)
+    if path is None:
+        return None
+    with open(path, 'r', encoding='utf-8') as f:
+        for line in f:
+            line = line.strip()
+            if line and not line.startswith('#'):
+                return line
+    return None
+
+
+def run(client, url, requests, before_each=None):
+    """Số segment/giây khi gọi url tuần tự `requests` lần trong một worker"""
+    started = time.perf_counter()
+    for _ in range(requests):
+        if before_each:
+            before_each()
+        response = client.get(url)
+        if response.status_code != 200:
+            raise RuntimeError(f"{url} -> {response.status_code}")
+        response.close()
+    return requests / (time.perf_counter() - started)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Đo số segment/giây của một worker trước và sau khi cache đường dẫn title")
+    parser.add_argument('movie_id', type=int)
+    parser.add_argument('--requests', type=int, default=500)
+    args = parser.parse_args()
+
+    key = ('movie', args.movie_id)
+    segment = first_segment(key)
+    if segment is None:
+        print(f"[❌] Movie {args.movie_id} không có video / playlist")
+        return 1
+    url = sign_url(f"/api/stream/movie/{args.movie_id}/{segment}", url_expiry())
+    size = os.path.getsize(os.path.join(os.path.dirname(playlist_path(key)), segment))
+    print(f"[📂] {url} ({size / 1024:.0f} KB), {args.requests} request mỗi lượt")
+
+    client = create_app().test_client()
+    run(client, url, min(args.requests, 20))   # làm nóng pool kết nối / page cache
+
+    # Trước: mỗi segment một lần query DB (như khi chưa cache đường dẫn)
+    before = run(client, url, args.requests, before_each=media_paths.invalidate)
+    # Sau: chỉ chạm filesystem
+    after = run(client, url, args.requests)
+
+    print(f"[⏱️] Query DB mỗi segment: {before:,.0f} segment/s")
+    print(f"[⏱️] Cache đường dẫn:      {after:,.0f} segment/s ({after / before:.1f}x)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,371 @@
+import ast
+import os
+import re
+import sys
+import importlib
+import itertools
+from db import create_connection
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+# routes/ chạy theo từng request, utils/ gồm các truy vấn nạp index / cache dùng chung
+SOURCE_DIRS = ('routes', 'utils')
+
+# Bảng có ít dòng hơn ngưỡng này thì full scan / filesort chỉ cảnh báo (optimizer thường chọn scan cho bảng nhỏ)
+MIN_ROWS = int(os.getenv("QUERY_PLAN_MIN_ROWS", 1000))
+
+# Truy vấn biết trước là không thể dùng index, kèm lý do
+ALLOWED_SCANS = {
+    ('admin.py', 'get_admin_movies'): "Tìm kiếm admin dùng LIKE '%q%'",
+    ('admin.py', 'get_admin_stats'): "Thống kê COUNT(*) toàn bảng cho dashboard admin",
+    ('search.py', 'db_search[like]'): "SEARCH_BACKEND=like dùng LIKE '%q%'",
+    ('search_index.py', '_load'): "Nạp toàn bộ index tìm kiếm khi khởi động / rebuild",
+    ('suggest_index.py', '_load'): "Nạp toàn bộ index gợi ý khi khởi động / rebuild",
+    ('genre_index.py', '_load'): "Nạp toàn bộ index thể loại khi khởi động / rebuild",
+    ('people_index.py', '_load'): "Nạp toàn bộ index diễn viên khi khởi động / rebuild",
+}
+
+
+def _search_queries():
+    from routes import search
+    for backend, branches in (('like', search.like_branches), ('fulltext', search.fulltext_branches)):
+        for sql, params in search.db_search_queries(branches('a', None), 0, 10):
+            yield f"db_search[{backend}]", sql, params
+
+
+# Câu SQL chỉ biết được khi chạy (ghép từ các nhánh truyền vào): lấy câu thật từ code dựng truy vấn,
+# EXPLAIN với tham số mẫu -> [(tên, sql, tham số)]
+DYNAMIC_QUERIES = {
+    ('search.py', 'db_search'): _search_queries,
+}
+
+_WRITE_STATEMENT = re.compile(r'\s*(UPDATE|INSERT|DELETE|REPLACE|CREATE|ALTER|DROP)\b', re.IGNORECASE)
+_COMPARED_COLUMN = re.compile(r'([\w.`]+)\s*(?:=|<>|!=|<=|>=|<|>)\s*$')
+_IN_COLUMN = re.compile(r'([\w.`]+)\s+IN\s*\([^()]*$', re.IGNORECASE)
+_ARITHMETIC_BEFORE = re.compile(r'[-+*/]\s*$')
+_ARITHMETIC_AFTER = re.compile(r'^\s*[-+*/]')
+_SAMPLE_TIME = "TIMESTAMP '2024-01-01 00:00:00'"
+
+
+def _sample_value(before, after):
+    """Giá trị mẫu có kiểu đúng cho %s dựa vào ngữ cảnh quanh nó trong câu SQL"""
+    if re.search(r'\b(LIMIT|OFFSET)\s*$', before, re.IGNORECASE):
+        return '10'
+    if _ARITHMETIC_BEFORE.search(before) or _ARITHMETIC_AFTER.match(after):
+        return '1'
+    if re.search(r'\bLIKE\s*$', before, re.IGNORECASE):
+        return "'%a%'"
+    if re.search(r'\bAGAINST\s*\(\s*$', before, re.IGNORECASE):
+        return "'a'"
+    match = _COMPARED_COLUMN.search(before) or _IN_COLUMN.search(before)
+    if match:
+        column = match.group(1).split('.')[-1].strip('`').lower()
+        # So sánh cột thời gian với chuỗi '1' làm optimizer bỏ range trên index (created_at, id)
+        if column.endswith('_at') or column.endswith('_date'):
+            return _SAMPLE_TIME
+        if column == 'id' or column.endswith('_id'):
+            return '1'
+    return "'a'"
+
+
+def bind_sample_params(sql):
+    """Thay từng %s bằng giá trị mẫu đúng kiểu: thời gian cho cột *_at, số cho id / LIMIT, chuỗi cho phần còn lại"""
+    parts = sql.split('%s')
+    bound = parts[0]
+    for part in parts[1:]:
+        bound += _sample_value(bound, part) + part
+    return bound
+
+
+class _Module:
+    """Các tên có thể dùng khi dựng lại câu SQL của một file: hằng cấp module và tên được import"""
+
+    def __init__(self, tree, module_name):
+        self.module_name = module_name
+        self.assignments = _assignments(tree.body)
+        self.imports = {}
+        for node in tree.body:
+            if isinstance(node, ast.ImportFrom) and node.module:
+                for alias in node.names:
+                    self.imports[alias.asname or alias.name] = (node.module, alias.name)
+
+    def value(self, name):
+        """Giá trị lúc chạy của tên (hằng cấp module hoặc tên import), _UNKNOWN nếu không lấy được"""
+        if name in self.imports:
+            module, attr = self.imports[name]
+        elif name in self.assignments:
+            module, attr = self.module_name, name
+        else:
+            return _UNKNOWN
+        try:
+            return getattr(importlib.import_module(module), attr)
+        except Exception:
+            return _UNKNOWN
+
+
+_UNKNOWN = object()
+
+
+def _assignments(statements):
+    """Biểu thức được gán cho mỗi tên (kể cả gán tuple: a, b = (x, y) if ... else (z, t))"""
+    values = {}
+
+    def tuple_elements(value, size):
+        if isinstance(value, ast.Tuple) and len(value.elts) == size:
+            return [[elt] for elt in value.elts]
+        if isinstance(value, ast.IfExp):
+            body, orelse = tuple_elements(value.body, size), tuple_elements(value.orelse, size)
+            if body and orelse:
+                return [a + b for a, b in zip(body, orelse)]
+        return None
+
+    for statement in statements:
+        for node in ast.walk(statement):
+            if isinstance(node, ast.Assign):
+                for target in node.targets:
+                    if isinstance(target, ast.Name):
+                        values.setdefault(target.id, []).append(node.value)
+                    elif isinstance(target, ast.Tuple):
+                        elements = tuple_elements(node.value, len(target.elts))
+                        for elt, nodes in zip(target.elts, elements or ()):
+                            if isinstance(elt, ast.Name):
+                                values.setdefault(elt.id, []).extend(nodes)
+            elif isinstance(node, ast.AugAssign) and isinstance(node.target, ast.Name) \
+                    and isinstance(node.op, ast.Add):
+                # q += "..." -> thêm biến thể có phần nối thêm
+                augmented = ast.BinOp(left=ast.Name(id=node.target.id, ctx=ast.Load()), op=ast.Add(), right=node.value)
+                augmented.augmented = True
+                values.setdefault(node.target.id, []).append(augmented)
+    return values
+
+
+class _Renderer:
+    """Dựng lại (các biến thể của) câu SQL từ AST của một hàm; None nếu không xác định được tĩnh"""
+
+    def __init__(self, module, func):
+        self.module = module
+        self.assignments = dict(module.assignments, **_assignments(func.body))
+        self.functions = {f.name: f for f in ast.walk(func) if isinstance(f, ast.FunctionDef) and f is not func}
+
+    def render(self, node, depth=0, seen=()):
+        if depth > 8:
+            return None
+        if isinstance(node, ast.Constant):
+            return [node.value] if isinstance(node.value, str) else None
+        if isinstance(node, ast.Name):
+            return self._render_name(node.id, depth, seen)
+        if isinstance(node, ast.JoinedStr):
+            parts = []
+            for value in node.values:
+                formatted = isinstance(value, ast.FormattedValue)
+                rendered = self.render(value.value if formatted else value, depth + 1, seen)
+                if rendered is None:
+                    return None
+                parts.append(rendered)
+            return [''.join(p) for p in itertools.product(*parts)]
+        if isinstance(node, ast.IfExp):
+            body, orelse = self.render(node.body, depth + 1, seen), self.render(node.orelse, depth + 1, seen)
+            return None if body is None or orelse is None else body + orelse
+        if isinstance(node, ast.BinOp) and isinstance(node.op, ast.Add):
+            left, right = self.render(node.left, depth + 1, seen), self.render(node.right, depth + 1, seen)
+            return None if left is None or right is None else [a + b for a, b in itertools.product(left, right)]
+        if isinstance(node, ast.Call):
+            return self._render_call(node, depth, seen)
+        return None
+
+    def _render_name(self, name, depth, seen):
+        if name in self.assignments:
+            values = self.assignments[name]
+            if name in seen:
+                # Vế trái của q += ...: chỉ dùng các lần gán thường
+                values = [v for v in values if not getattr(v, 'augmented', False)]
+            variants = []
+            for value in values:
+                rendered = self.render(value, depth + 1, seen + (name,))
+                if rendered is None:
+                    return None
+                variants.extend(rendered)
+            return variants
+        value = self.module.value(name)
+        return [value] if isinstance(value, str) else None
+
+    def _render_call(self, call, depth, seen):
+        func = call.func
+        # ', '.join([...] * n) / ' UNION ALL '.join([q] * n) / ', '.join(HẰNG_TUPLE): dựng với 2 phần tử
+        if isinstance(func, ast.Attribute) and func.attr == 'join' and len(call.args) == 1:
+            separator = self.render(func.value, depth + 1, seen)
+            items = self._render_items(call.args[0], depth, seen)
+            if separator is None or items is None:
+                return None
+            return [sep.join(group) for sep in separator for group in items]
+        if isinstance(func, ast.Name) and func.id == 'select_columns':
+            return self._render_select_columns(call)
+        # Hàm lồng trong hàm (vd. where(cột, ids)) chỉ gồm một lệnh return
+        nested = self.functions.get(func.id) if isinstance(func, ast.Name) else None
+        if nested and len(nested.body) >= 1 and isinstance(nested.body[-1], ast.Return):
+            inner = _Renderer(self.module, nested)
+            inner.assignments = dict(self.assignments, **inner.assignments)
+            for param, arg in zip(nested.args.args, call.args):
+                inner.assignments[param.arg] = [arg]
+            return inner.render(nested.body[-1].value, depth + 1, seen)
+        return None
+
+    def _render_items(self, node, depth, seen):
+        """Các phần tử của iterable được join -> [[phần tử...]]"""
+        if isinstance(node, ast.BinOp) and isinstance(node.op, ast.Mult) and isinstance(node.left, ast.List) \
+                and len(node.left.elts) == 1:
+            rendered = self.render(node.left.elts[0], depth + 1, seen)
+            return None if rendered is None else [[item, item] for item in rendered]
+        if isinstance(node, ast.Name) and node.id not in self.assignments:
+            value = self.module.value(node.id)
+            if isinstance(value, (list, tuple)) and all(isinstance(v, str) for v in value):
+                return [list(value)]
+        return None
+
+    def _render_select_columns(self, call):
+        """select_columns(MAP, fields, extra=...) -> danh sách cột thật: fields mặc định của
+        requested_fields(...) nếu có, không thì mọi field (projection rộng nhất client có thể yêu cầu)"""
+        field_map = self._runtime_value(call.args[0]) if call.args else _UNKNOWN
+        if not isinstance(field_map, dict):
+            return None
+        fields = self._default_fields(call.args[1]) if len(call.args) > 1 else _UNKNOWN
+        if fields is _UNKNOWN:
+            fields = list(field_map)
+        extra = ()
+        for keyword in call.keywords:
+            if keyword.arg == 'extra':
+                try:
+                    extra = ast.literal_eval(keyword.value)
+                except ValueError:
+                    return None
+        from utils.fields import select_columns
+        return [select_columns(field_map, [f for f in fields if f in field_map], extra=extra)]
+
+    def _default_fields(self, node):
+        if isinstance(node, ast.Name) and node.id in self.assignments:
+            for value in self.assignments[node.id]:
+                if isinstance(value, ast.Call) and isinstance(value.func, ast.Name) \
+                        and value.func.id == 'requested_fields' and len(value.args) > 1:
+                    return self._runtime_value(value.args[1])
+            return _UNKNOWN
+        return self._runtime_value(node)
+
+    def _runtime_value(self, node):
+        if isinstance(node, ast.Name):
+            return self.module.value(node.id)
+        try:
+            return ast.literal_eval(node)
+        except ValueError:
+            return _UNKNOWN
+
+
+def _is_select(sql):
+    return sql.lstrip('( \n\t').upper().startswith('SELECT')
+
+
+def _is_write(node):
+    """Câu ghi (UPDATE / INSERT...) không cần EXPLAIN: nhận ra từ phần chữ đầu tiên của câu"""
+    first = node.values[0] if isinstance(node, ast.JoinedStr) and node.values else node
+    return isinstance(first, ast.Constant) and isinstance(first.value, str) and bool(_WRITE_STATEMENT.match(first.value))
+
+
+def extract_queries():
+    """Tìm mọi câu SELECT truyền vào cursor.execute(...) trong routes/*.py và utils/*.py.
+
+    Trả về (truy vấn dựng lại được, truy vấn không dựng được tĩnh).
+    """
+    queries, skipped = [], []
+    for directory in SOURCE_DIRS:
+        for filename in sorted(os.listdir(os.path.join(BASE_DIR, directory))):
+            if not filename.endswith('.py'):
+                continue
+            with open(os.path.join(BASE_DIR, directory, filename), 'r', encoding='utf-8') as f:
+                tree = ast.parse(f.read())
+            module = _Module(tree, f"{directory}.{filename[:-3]}")
+
+            for func in ast.walk(tree):
+                if not isinstance(func, ast.FunctionDef):
+                    continue
+                params = {arg.arg for arg in func.args.args}
+                renderer = _Renderer(module, func)
+                for call in ast.walk(func):
+                    if not (isinstance(call, ast.Call) and isinstance(call.func, ast.Attribute)
+                            and call.func.attr == 'execute' and call.args):
+                        continue
+                    sql_node = call.args[0]
+                    # Wrapper cursor (vd. utils/query_stats.py) chỉ chuyển tiếp câu SQL của caller
+                    if isinstance(sql_node, ast.Name) and sql_node.id in params:
+                        continue
+                    if _is_write(sql_node):
+                        continue
+                    variants = renderer.render(sql_node)
+                    if variants is None:
+                        skipped.append((filename, func.name, call.lineno))
+                        continue
+                    for sql in dict.fromkeys(variants):
+                        if _is_select(sql):
+                            queries.append((filename, func.name, call.lineno, sql))
+    return queries, skipped
+
+
+def check_plan(rows):
+    """Trả về danh sách vấn đề (full scan / filesort) trong kết quả EXPLAIN"""
+    problems = []
+    for row in rows:
+        extra = row.get('Extra') or ''
+        estimated = row.get('rows') or 0
+        table = row.get('table') or ''
+        # <derivedN> / <unionN,M>: bảng tạm của UNION / subquery, các nhánh bên trong đã được xét riêng
+        if table.startswith('<'):
+            continue
+        if row.get('type') == 'ALL':
+            problems.append((estimated, f"full scan trên `{table}` (~{estimated} dòng)"))
+        if 'Using filesort' in extra:
+            problems.append((estimated, f"filesort trên `{table}` (~{estimated} dòng)"))
+    return problems
+
+
+def main():
+    queries, skipped = extract_queries()
+    explains = [(filename, func_name, f"{filename}:{lineno} {func_name}", bind_sample_params(sql), None)
+                for filename, func_name, lineno, sql in queries]
+
+    failures = 0
+    for filename, func_name, lineno in skipped:
+        builder = DYNAMIC_QUERIES.get((filename, func_name))
+        if builder is None:
+            # Không EXPLAIN được thì không biết có dùng index hay không -> tính là lỗi
+            failures += 1
+            print(f"[❌] {filename}:{lineno} {func_name}: câu SQL dựng động, chưa được kiểm tra "
+                  f"(thêm vào DYNAMIC_QUERIES)")
+            continue
+        for name, sql, params in builder():
+            explains.append((filename, name, f"{filename}:{lineno} {name}", sql, params))
+
+    conn = create_connection()
+    with conn:
+        with conn.cursor() as cursor:
+            for filename, func_name, location, sql, params in explains:
+                try:
+                    cursor.execute("EXPLAIN " + sql, params)
+                    rows = cursor.fetchall()
+                except Exception as e:
+                    failures += 1
+                    print(f"[❌] {location}: EXPLAIN lỗi: {e}")
+                    continue
+
+                allowed = ALLOWED_SCANS.get((filename, func_name))
+                for estimated, problem in check_plan(rows):
+                    if allowed:
+                        print(f"[ℹ️] {location}: {problem} (cho phép: {allowed})")
+                    elif estimated < MIN_ROWS:
+                        print(f"[⚠️] {location}: {problem} (bảng nhỏ hơn {MIN_ROWS} dòng)")
+                    else:
+                        failures += 1
+                        print(f"[❌] {location}: {problem}")
+
+    print(f"Đã kiểm tra {len(explains)} truy vấn, {failures} lỗi")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,10 +1,25 @@
 import pymysql
 import os
+import time
+import logging
+import threading
+from flask import g, has_request_context, request
 from dotenv import load_dotenv
+from utils.query_stats import InstrumentedCursor
 
 load_dotenv()
 
-def get_db_connection():
+logger = logging.getLogger(__name__)
+
+# Cấu hình pool kết nối MySQL
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", 10))
+DB_POOL_TIMEOUT = float(os.getenv("DB_POOL_TIMEOUT", 10))            # giây chờ tối đa khi pool đã đầy
+DB_POOL_IDLE_TIMEOUT = float(os.getenv("DB_POOL_IDLE_TIMEOUT", 300))  # đóng kết nối rảnh quá lâu
+DB_POOL_LEAK_TIMEOUT = float(os.getenv("DB_POOL_LEAK_TIMEOUT", 30))   # cảnh báo kết nối bị giữ quá lâu
+
+
+def create_connection():
+    """Mở kết nối trực tiếp (không qua pool) - dùng cho script CLI như migrate.py"""
     return pymysql.connect(
         host=os.getenv("DB_HOST"),
         port=int(os.getenv("DB_PORT")),
@@ -13,3 +28,232 @@ def get_db_connection():
         database=os.getenv("DB_NAME"),
         cursorclass=pymysql.cursors.DictCursor
     )
+
+
+def _close_quietly(raw):
+    try:
+        raw.close()
+    except Exception:
+        pass
+
+
+def _borrower():
+    """Mô tả endpoint đang mượn kết nối (dùng cho leak detection)"""
+    if has_request_context():
+        return f"{request.method} {request.path} ({request.endpoint})"
+    return f"<{threading.current_thread().name}>"
+
+
+class PoolTimeout(pymysql.err.OperationalError):
+    """Hết thời gian chờ kết nối rảnh trong pool"""
+
+
+class PooledConnection:
+    """Proxy quanh pymysql connection: close() / with-block trả kết nối về pool thay vì đóng socket"""
+
+    def __init__(self, pool, raw, borrower):
+        self._pool = pool
+        self._raw = raw
+        self.borrower = borrower
+        self.borrowed_at = time.monotonic()
+        self.leak_reported = False
+        self.released = False
+
+    def __getattr__(self, name):
+        return getattr(self._raw, name)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    def cursor(self, *args, **kwargs):
+        return InstrumentedCursor(self._raw.cursor(*args, **kwargs))
+
+    def close(self):
+        if not self.released:
+            self.released = True
+            self._pool.release(self)
+
+
+class ConnectionPool:
+    """Pool kết nối thread-safe, giới hạn kích thước, ping khi checkout"""
+
+    def __init__(self, connect, max_size, timeout, idle_timeout, leak_timeout):
+        self._connect = connect
+        self.max_size = max_size
+        self.timeout = timeout
+        self.idle_timeout = idle_timeout
+        self.leak_timeout = leak_timeout
+
+        self._cond = threading.Condition()
+        self._idle = []          # [(raw, last_used)] - LIFO để kết nối nóng được dùng lại trước
+        self._in_use = set()     # các PooledConnection đang được mượn
+        self._size = 0           # tổng số kết nối đang mở (idle + in use + đang tạo)
+        self._waiting = 0
+
+        self._created = 0
+        self._reused = 0
+        self._discarded = 0
+        self._timeouts = 0
+        self._leaks = 0
+        self._checkouts = 0
+        self._wait_total = 0.0
+        self._wait_max = 0.0
+
+    def acquire(self):
+        start = time.monotonic()
+        raw = None
+        with self._cond:
+            self._report_leaks(start)
+            while True:
+                raw = self._pop_idle()
+                if raw is not None:
+                    break
+                if self._size < self.max_size:
+                    self._size += 1
+                    break
+                remaining = self.timeout - (time.monotonic() - start)
+                if remaining <= 0:
+                    self._timeouts += 1
+                    raise PoolTimeout(f"Không lấy được kết nối DB sau {self.timeout}s (pool size={self.max_size})")
+                self._waiting += 1
+                try:
+                    self._cond.wait(remaining)
+                finally:
+                    self._waiting -= 1
+
+        raw = self._checkout(raw)
+
+        waited = time.monotonic() - start
+        conn = PooledConnection(self, raw, _borrower())
+        with self._cond:
+            self._in_use.add(conn)
+            self._checkouts += 1
+            self._wait_total += waited
+            self._wait_max = max(self._wait_max, waited)
+        return conn
+
+    def release(self, conn):
+        raw = conn._raw
+        healthy = True
+        try:
+            # Huỷ transaction dang dở để người mượn sau không thấy snapshot cũ
+            raw.rollback()
+        except Exception:
+            healthy = False
+
+        with self._cond:
+            self._in_use.discard(conn)
+            if healthy and raw.open:
+                self._idle.append((raw, time.monotonic()))
+            else:
+                self._size -= 1
+                self._discarded += 1
+            self._cond.notify()
+
+        if not healthy:
+            _close_quietly(raw)
+
+    def _pop_idle(self):
+        """Lấy kết nối rảnh gần nhất, đóng các kết nối đã rảnh quá idle_timeout"""
+        now = time.monotonic()
+        while self._idle:
+            raw, last_used = self._idle.pop()
+            if now - last_used <= self.idle_timeout:
+                return raw
+            self._size -= 1
+            self._discarded += 1
+            _close_quietly(raw)
+        return None
+
+    def _checkout(self, raw):
+        """Ping kết nối tái sử dụng hoặc mở kết nối mới (ngoài lock)"""
+        if raw is not None:
+            try:
+                raw.ping(reconnect=False)
+                with self._cond:
+                    self._reused += 1
+                return raw
+            except Exception:
+                _close_quietly(raw)
+                with self._cond:
+                    self._discarded += 1
+
+        try:
+            raw = self._connect()
+        except Exception:
+            with self._cond:
+                self._size -= 1
+                self._cond.notify()
+            raise
+        with self._cond:
+            self._created += 1
+        return raw
+
+    def _report_leaks(self, now):
+        for conn in self._in_use:
+            held = now - conn.borrowed_at
+            if not conn.leak_reported and held > self.leak_timeout:
+                conn.leak_reported = True
+                self._leaks += 1
+                logger.warning(f"[DB POOL] Kết nối bị giữ {held:.1f}s chưa trả: {conn.borrower}")
+
+    def reclaim(self, conn):
+        """Trả lại kết nối mà handler quên đóng khi request kết thúc"""
+        if conn.released:
+            return
+        with self._cond:
+            self._leaks += 1
+        logger.warning(f"[DB POOL] Handler không đóng kết nối, tự thu hồi: {conn.borrower}")
+        conn.close()
+
+    def stats(self):
+        now = time.monotonic()
+        with self._cond:
+            self._report_leaks(now)
+            borrowed = sorted(self._in_use, key=lambda c: c.borrowed_at)
+            return {
+                'max_size': self.max_size,
+                'open': self._size,
+                'in_use': len(self._in_use),
+                'idle': len(self._idle),
+                'waiting': self._waiting,
+                'created': self._created,
+                'reused': self._reused,
+                'discarded': self._discarded,
+                'timeouts': self._timeouts,
+                'leaks': self._leaks,
+                'checkouts': self._checkouts,
+                'wait_avg_ms': round(self._wait_total / self._checkouts * 1000, 3) if self._checkouts else 0,
+                'wait_max_ms': round(self._wait_max * 1000, 3),
+                'borrowers': [{
+                    'endpoint': c.borrower,
+                    'held_ms': round((now - c.borrowed_at) * 1000, 3)
+                } for c in borrowed]
+            }
+
+
+pool = ConnectionPool(
+    create_connection,
+    max_size=DB_POOL_SIZE,
+    timeout=DB_POOL_TIMEOUT,
+    idle_timeout=DB_POOL_IDLE_TIMEOUT,
+    leak_timeout=DB_POOL_LEAK_TIMEOUT
+)
+
+
+def get_db_connection():
+    conn = pool.acquire()
+    if has_request_context():
+        g.setdefault('_db_connections', []).append(conn)
+    return conn
+
+
+def init_app(app):
+    """Đăng ký thu hồi kết nối chưa đóng khi mỗi request kết thúc"""
+    @app.teardown_request
+    def _reclaim_db_connections(exc=None):
+        for conn in g.pop('_db_connections', []):
+            pool.reclaim(conn)
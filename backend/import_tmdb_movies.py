@@ -5,6 +5,8 @@ import pymysql
 from dotenv import load_dotenv
 from urllib.parse import urlsplit
 import json
+from utils import catalog
+from utils.movie_relations import save_movie_relations, parse_genre_ids
 
 load_dotenv()
 
@@ -89,6 +91,7 @@ def insert_movies(movies, tag):
                 try:
                     detail = fetch_movie_detail(movie['id'])
                     cast_json = fetch_movie_cast(movie['id'])
+                    genre_ids = parse_genre_ids(movie.get('genre_ids'))
 
                     poster_file = download_image(movie.get('poster_path'), 'posters')
                     backdrop_file = download_image(movie.get('backdrop_path'), 'backdrops')
@@ -118,7 +121,7 @@ def insert_movies(movies, tag):
                         poster_file,
                         backdrop_file,
                         movie.get('release_date'),
-                        str(movie.get('genre_ids')),
+                        json.dumps(genre_ids),
                         detail.get('original_language'),
                         detail.get('vote_average'),
                         detail.get('vote_count'),
@@ -127,10 +130,16 @@ def insert_movies(movies, tag):
                         cast_json
                     ))
                     inserted += cursor.rowcount
+
+                    # ON DUPLICATE KEY UPDATE không trả lastrowid tin cậy -> lấy id theo tmdb_id
+                    cursor.execute("SELECT id FROM movies WHERE tmdb_id = %s", (movie['id'],))
+                    save_movie_relations(cursor, cursor.fetchone()['id'], genre_ids, cast_json)
                 except Exception as e:
                     print(f"[❌ Lỗi insert phim ID {movie['id']}]:", e)
 
         conn.commit()
+    # Báo cho server đang chạy xoá cache catalog
+    catalog.touch_stamp()
     print(f"[✅ Đã thêm/cập nhật {inserted} phim loại {tag}]")
 
 if __name__ == "__main__":
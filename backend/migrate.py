@@ -0,0 +1,114 @@
+import os
+import re
+import sys
+import importlib.util
+from db import create_connection
+
+MIGRATIONS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'migrations')
+MIGRATION_FILE = re.compile(r'^(\d+)_([\w-]+)\.(sql|py)$')
+
+
+def list_migrations():
+    """Danh sách (version, name, path) trong thư mục migrations/, sắp theo version"""
+    migrations = []
+    for filename in os.listdir(MIGRATIONS_DIR):
+        match = MIGRATION_FILE.match(filename)
+        if match:
+            migrations.append((int(match.group(1)), match.group(2), os.path.join(MIGRATIONS_DIR, filename)))
+    return sorted(migrations)
+
+
+def split_statements(sql):
+    """Tách file .sql thành từng câu lệnh (kết thúc bằng ';' ở cuối dòng), bỏ comment '--'"""
+    statements, current = [], []
+    for line in sql.splitlines():
+        stripped = line.strip()
+        if not stripped or stripped.startswith('--'):
+            continue
+        current.append(line)
+        if stripped.endswith(';'):
+            statements.append('\n'.join(current).rstrip().rstrip(';'))
+            current = []
+    if current:
+        statements.append('\n'.join(current))
+    return statements
+
+
+def run_migration(cursor, path):
+    """.sql: chạy lần lượt từng câu lệnh; .py: gọi upgrade(cursor) (dùng cho backfill dữ liệu)"""
+    if path.endswith('.py'):
+        spec = importlib.util.spec_from_file_location(os.path.splitext(os.path.basename(path))[0], path)
+        module = importlib.util.module_from_spec(spec)
+        spec.loader.exec_module(module)
+        module.upgrade(cursor)
+        return
+
+    with open(path, 'r', encoding='utf-8') as f:
+        statements = split_statements(f.read())
+    for statement in statements:
+        cursor.execute(statement)
+
+
+def ensure_migrations_table(cursor):
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS schema_migrations (
+            version INT NOT NULL PRIMARY KEY,
+            name VARCHAR(255) NOT NULL,
+            applied_at TIMESTAMP NULL DEFAULT CURRENT_TIMESTAMP
+        )
+    """)
+
+
+def applied_versions(cursor):
+    cursor.execute("SELECT version FROM schema_migrations")
+    return {row['version'] for row in cursor.fetchall()}
+
+
+def migrate():
+    conn = create_connection()
+    with conn:
+        with conn.cursor() as cursor:
+            ensure_migrations_table(cursor)
+            applied = applied_versions(cursor)
+
+            pending = [m for m in list_migrations() if m[0] not in applied]
+            if not pending:
+                print("[✅] Schema đã ở phiên bản mới nhất")
+                return
+
+            for version, name, path in pending:
+                print(f"🚀 Áp dụng migration {version:03d}_{name}...")
+                try:
+                    run_migration(cursor, path)
+                    cursor.execute(
+                        "INSERT INTO schema_migrations (version, name) VALUES (%s, %s)",
+                        (version, name)
+                    )
+                    conn.commit()
+                except Exception as e:
+                    conn.rollback()
+                    print(f"[❌ Migration {version:03d}_{name} lỗi]:", e)
+                    sys.exit(1)
+                print(f"[✅ Đã áp dụng {version:03d}_{name}]")
+
+
+def status():
+    conn = create_connection()
+    with conn:
+        with conn.cursor() as cursor:
+            ensure_migrations_table(cursor)
+            applied = applied_versions(cursor)
+    for version, name, _ in list_migrations():
+        mark = '✅' if version in applied else '⏳'
+        print(f"{mark} {version:03d}_{name}")
+
+
+if __name__ == "__main__":
+    command = sys.argv[1] if len(sys.argv) > 1 else 'up'
+    if command == 'up':
+        migrate()
+    elif command == 'status':
+        status()
+    else:
+        print("⚠️ Hãy chạy: python migrate.py [up|status]")
+        sys.exit(1)
@@ -0,0 +1,38 @@
+-- Index cho các truy vấn nóng nhất (listing phim/show, favorites, comments)
+
+-- /movies?type=<tag> và listing "mới nhất" (ORDER BY created_at DESC LIMIT ...)
+ALTER TABLE movies
+    ADD INDEX idx_movies_tag_created (tag, created_at, id),
+    ADD INDEX idx_movies_created (created_at, id);
+
+-- /shows (ORDER BY created_at DESC)
+ALTER TABLE shows
+    ADD INDEX idx_shows_created (created_at, id);
+
+-- Danh sách tập của một show (WHERE show_id = ? ORDER BY episode_number)
+ALTER TABLE show_episodes
+    ADD INDEX idx_episodes_show_number (show_id, episode_number);
+
+-- /favorites: covering index cho (user_id[, item_type]) ORDER BY created_at
+ALTER TABLE favorites
+    ADD INDEX idx_favorites_user_type_created (user_id, item_type, created_at, item_id),
+    ADD INDEX idx_favorites_user_created (user_id, created_at, item_type, item_id);
+
+-- Comments gốc: WHERE movie_id = ? AND parent_id IS NULL AND is_deleted = 0 ORDER BY created_at | likes_count
+-- Replies:      WHERE parent_id = ? AND is_deleted = 0 ORDER BY created_at
+ALTER TABLE movie_comments
+    ADD INDEX idx_movie_comments_listing_created (movie_id, parent_id, is_deleted, created_at),
+    ADD INDEX idx_movie_comments_listing_likes (movie_id, parent_id, is_deleted, likes_count, created_at),
+    ADD INDEX idx_movie_comments_replies (parent_id, is_deleted, created_at);
+
+ALTER TABLE show_comments
+    ADD INDEX idx_show_comments_listing_created (show_id, parent_id, is_deleted, created_at),
+    ADD INDEX idx_show_comments_listing_likes (show_id, parent_id, is_deleted, likes_count, created_at),
+    ADD INDEX idx_show_comments_replies (parent_id, is_deleted, created_at);
+
+-- Tra cứu token xác thực email / đặt lại mật khẩu
+ALTER TABLE users
+    ADD INDEX idx_users_verification_token (verification_token);
+
+ALTER TABLE password_reset_tokens
+    ADD INDEX idx_password_reset_token (token);
@@ -0,0 +1,32 @@
+-- Chuẩn hoá movies.cast (JSON) và movies.genre_ids (chuỗi) thành bảng riêng
+-- để join / index được thay vì parse mỗi request. Dữ liệu cũ được backfill ở 003.
+
+CREATE TABLE IF NOT EXISTS people (
+    id INT NOT NULL AUTO_INCREMENT PRIMARY KEY,
+    -- so khớp chính xác tên (general_ci coi 'José' = 'Jose')
+    name VARCHAR(255) CHARACTER SET utf8mb4 COLLATE utf8mb4_bin NOT NULL,
+    profile_path VARCHAR(500) DEFAULT NULL,
+    UNIQUE KEY uq_people_name (name)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_general_ci;
+
+-- Diễn viên của phim theo thứ tự billing; (person_id, movie_id) cho tra cứu phim theo diễn viên
+CREATE TABLE IF NOT EXISTS movie_cast (
+    movie_id INT NOT NULL,
+    person_id INT NOT NULL,
+    character_name VARCHAR(255) DEFAULT NULL,
+    cast_order SMALLINT NOT NULL DEFAULT 0,
+    PRIMARY KEY (movie_id, cast_order),
+    KEY idx_movie_cast_person (person_id, movie_id),
+    CONSTRAINT fk_movie_cast_movie FOREIGN KEY (movie_id) REFERENCES movies (id) ON DELETE CASCADE,
+    CONSTRAINT fk_movie_cast_person FOREIGN KEY (person_id) REFERENCES people (id) ON DELETE CASCADE
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_general_ci;
+
+-- Thể loại TMDB của phim; (genre_id, movie_id) cho lọc phim theo thể loại
+CREATE TABLE IF NOT EXISTS movie_genres (
+    movie_id INT NOT NULL,
+    genre_id INT NOT NULL,
+    genre_order TINYINT NOT NULL DEFAULT 0,
+    PRIMARY KEY (movie_id, genre_id),
+    KEY idx_movie_genres_genre (genre_id, movie_id),
+    CONSTRAINT fk_movie_genres_movie FOREIGN KEY (movie_id) REFERENCES movies (id) ON DELETE CASCADE
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_general_ci;
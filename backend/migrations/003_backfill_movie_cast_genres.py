@@ -0,0 +1,16 @@
+"""Backfill people / movie_cast / movie_genres từ cột movies.cast và movies.genre_ids hiện có"""
+import json
+from utils.movie_relations import save_movie_relations, parse_genre_ids
+
+
+def upgrade(cursor):
+    cursor.execute("SELECT id, genre_ids, `cast` FROM movies")
+    movies = cursor.fetchall()
+    for movie in movies:
+        save_movie_relations(cursor, movie['id'], movie['genre_ids'], movie['cast'])
+        # Chuyển genre_ids dạng str(list) cũ sang JSON
+        cursor.execute(
+            "UPDATE movies SET genre_ids = %s WHERE id = %s",
+            (json.dumps(parse_genre_ids(movie['genre_ids'])), movie['id'])
+        )
+    print(f"   ↳ đã backfill cast/thể loại cho {len(movies)} phim")
@@ -0,0 +1,14 @@
+"""FULLTEXT index cho SEARCH_BACKEND=fulltext.
+
+MySQL: dùng parser ngram (token 2 ký tự, hợp với âm tiết tiếng Việt ngắn như 'bo', 'oi').
+MariaDB không có parser ngram -> FULLTEXT mặc định (tách theo khoảng trắng); cần đặt
+innodb_ft_min_token_size=2 để không bỏ qua âm tiết 2 ký tự.
+"""
+
+
+def upgrade(cursor):
+    cursor.execute("SELECT VERSION() AS version")
+    parser = '' if 'mariadb' in cursor.fetchone()['version'].lower() else ' WITH PARSER ngram'
+
+    cursor.execute(f"ALTER TABLE movies ADD FULLTEXT INDEX ft_movies_search (title, original_title, overview){parser}")
+    cursor.execute(f"ALTER TABLE shows ADD FULLTEXT INDEX ft_shows_search (title, description){parser}")
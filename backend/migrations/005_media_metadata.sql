@@ -0,0 +1,32 @@
+-- Metadata media lấy bằng ffprobe + playlist khi ingest (utils/media_probe.py);
+-- title cũ được điền bằng backfill_media_metadata.py. NULL = chưa probe.
+
+-- quality mặc định '1080p' là giá trị giả -> để NULL cho tới khi probe
+ALTER TABLE movies
+    MODIFY quality VARCHAR(20) DEFAULT NULL,
+    ADD COLUMN width SMALLINT UNSIGNED DEFAULT NULL,
+    ADD COLUMN height SMALLINT UNSIGNED DEFAULT NULL,
+    ADD COLUMN video_codec VARCHAR(50) DEFAULT NULL,
+    ADD COLUMN audio_codec VARCHAR(50) DEFAULT NULL,
+    ADD COLUMN bitrate INT UNSIGNED DEFAULT NULL COMMENT 'bit/s trung bình của rendition cao nhất',
+    ADD COLUMN segment_count INT UNSIGNED DEFAULT NULL,
+    ADD COLUMN renditions TINYINT UNSIGNED DEFAULT NULL,
+    ADD COLUMN packaging VARCHAR(10) DEFAULT NULL COMMENT 'ts | fmp4',
+    ADD COLUMN media_probed_at TIMESTAMP NULL DEFAULT NULL;
+
+UPDATE movies SET quality = NULL WHERE media_probed_at IS NULL;
+
+-- /video-info/show/... đọc các cột này nhưng bảng chưa từng có
+ALTER TABLE show_episodes
+    ADD COLUMN duration INT DEFAULT NULL,
+    ADD COLUMN quality VARCHAR(20) DEFAULT NULL,
+    ADD COLUMN file_size BIGINT DEFAULT NULL,
+    ADD COLUMN width SMALLINT UNSIGNED DEFAULT NULL,
+    ADD COLUMN height SMALLINT UNSIGNED DEFAULT NULL,
+    ADD COLUMN video_codec VARCHAR(50) DEFAULT NULL,
+    ADD COLUMN audio_codec VARCHAR(50) DEFAULT NULL,
+    ADD COLUMN bitrate INT UNSIGNED DEFAULT NULL,
+    ADD COLUMN segment_count INT UNSIGNED DEFAULT NULL,
+    ADD COLUMN renditions TINYINT UNSIGNED DEFAULT NULL,
+    ADD COLUMN packaging VARCHAR(10) DEFAULT NULL,
+    ADD COLUMN media_probed_at TIMESTAMP NULL DEFAULT NULL;
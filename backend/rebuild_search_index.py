@@ -0,0 +1,23 @@
+import sys
+from utils import catalog
+from utils.search_index import search_index
+from utils.suggest_index import suggest_index
+
+
+def main():
+    # Dựng thử một lần để kiểm tra dữ liệu và đo thời gian
+    search_index.rebuild()
+    stats = search_index.stats()
+    print(f"[✅] Index: {stats['documents']} tài liệu, {stats['terms']} term, dựng trong {stats['last_rebuild_ms']}ms")
+    suggest_index.rebuild()
+    stats = suggest_index.stats()
+    print(f"[✅] Gợi ý: {stats['items']} mục, {stats['entries']} cụm từ, dựng trong {stats['last_rebuild_ms']}ms")
+
+    # Các worker server đang chạy thấy file đánh dấu đổi -> tự nạp lại index ở truy vấn kế tiếp
+    catalog.touch_stamp()
+    print("[✅] Đã báo các tiến trình server nạp lại index tìm kiếm")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
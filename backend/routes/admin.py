@@ -8,6 +8,16 @@ from flask import Blueprint, request, jsonify
 from werkzeug.utils import secure_filename
 from db import get_db_connection
 from utils.check_admin import admin_required
+from utils import catalog
+from utils.movie_relations import save_movie_relations, parse_genre_ids
+from utils.search_index import search_index
+from utils.suggest_index import suggest_index
+from utils.media_paths import movie_playlist_path
+from utils.media_probe import probe_media, save_media_metadata
+from utils.hls_ladder import (
+    FFMPEG_PATH, HLS_TIMEOUT, HLS_PACKAGING, probe_source, plan_ladder, build_ffmpeg_command,
+    write_master_playlist, write_dash_manifest
+)
 from PIL import Image
 
 admin_bp = Blueprint('admin', __name__)
@@ -17,7 +27,6 @@ MOVIE_VIDEO_PATH = os.getenv("MOVIE_VIDEO_PATH", "C:/Users/PC/Desktop/netflix-pr
 ALLOWED_VIDEO_EXTENSIONS = {'.mp4', '.avi', '.mov', '.mkv', '.flv', '.wmv', '.webm'}
 ALLOWED_IMAGE_EXTENSIONS = {'.jpg', '.jpeg', '.png', '.gif', '.webp'}
 UPLOAD_FOLDER = os.getenv("UPLOAD_FOLDER", "C:/Users/PC/Desktop/netflix-project/backend/static")
-FFMPEG_PATH = "ffmpeg"  # Đảm bảo ffmpeg đã được thêm vào PATH
 
 def save_image(file, folder):
     """Save and optimize image file"""
@@ -81,29 +90,20 @@ def clean_filename(filename):
     return clean_name
 
 def process_video_to_hls(input_file_path, output_dir, base_name):
-    """Convert video to HLS format using FFmpeg"""
+    """Convert video to an adaptive-bitrate HLS ladder (one variant playlist per rendition + master playlist)"""
     try:
         print(f"[DEBUG] Starting HLS conversion for: {input_file_path}")
         
         # Create output directory
         os.makedirs(output_dir, exist_ok=True)
         
-        # Output files
+        # Output files: master playlist keeps the old single-playlist name so video_file is unchanged
         playlist_file = os.path.join(output_dir, f"{base_name}.m3u8")
         
-        # FFmpeg command for HLS conversion
-        ffmpeg_cmd = [
-            FFMPEG_PATH,
-            "-i", input_file_path,
-            "-profile:v", "baseline",
-            "-level", "3.0", 
-            "-start_number", "0",
-            "-hls_time", "10",
-            "-hls_list_size", "0",
-            "-f", "hls",
-            "-hls_segment_filename", os.path.join(output_dir, f"{base_name}_%03d.ts"),
-            playlist_file
-        ]
+        # Renditions from HLS_LADDER, skipping those above the source resolution
+        plan = plan_ladder(probe_source(input_file_path))
+        print(f"[DEBUG] HLS ladder: {', '.join(r['name'] for r in plan)}")
+        ffmpeg_cmd = build_ffmpeg_command(input_file_path, output_dir, base_name, plan)
         
         print(f"[DEBUG] FFmpeg command: {' '.join(ffmpeg_cmd)}")
         
@@ -112,11 +112,15 @@ def process_video_to_hls(input_file_path, output_dir, base_name):
             ffmpeg_cmd,
             capture_output=True,
             text=True,
-            timeout=3600  # 1 hour timeout
+            timeout=HLS_TIMEOUT
         )
         
         if result.returncode == 0:
-            print(f"[DEBUG] HLS conversion successful. Playlist: {playlist_file}")
+            write_master_playlist(playlist_file, base_name, plan)
+            if HLS_PACKAGING == 'fmp4':
+                # DASH manifest over the same fMP4 files (served by /stream/movie/<id>/dash)
+                write_dash_manifest(os.path.join(output_dir, f"{base_name}.mpd"), output_dir, base_name, plan)
+            print(f"[DEBUG] HLS conversion successful. Master playlist: {playlist_file}")
             return playlist_file
         else:
             print(f"[DEBUG] FFmpeg error: {result.stderr}")
@@ -250,6 +254,9 @@ def upload_movie():
                 if not video_file_path:
                     return jsonify({'error': 'Failed to process video file'}), 400
         
+        # Probe the HLS output once (duration, resolution, codecs, bitrate, segments, bytes) before opening a DB connection
+        media_metadata = probe_media(movie_playlist_path(video_file_path)) if video_file_path else None
+        
         # Insert movie into database
         conn = get_db_connection()
         try:
@@ -265,15 +272,20 @@ def upload_movie():
                     )
                 """
                 
+                genre_list = parse_genre_ids(genre_ids)
                 cursor.execute(insert_query, (
-                    title, original_title, overview, release_date, genre_ids,
+                    title, original_title, overview, release_date, json.dumps(genre_list),
                     original_language, vote_average, vote_count, runtime,
                     poster_filename, backdrop_filename, video_file_path, tag,
                     json.dumps(cast_data)
                 ))
                 
                 movie_id = cursor.lastrowid
+                save_movie_relations(cursor, movie_id, genre_list, cast_data)
+                if media_metadata:
+                    save_media_metadata(cursor, 'movie', movie_id, media_metadata)
                 conn.commit()
+                catalog.notify_change('movie', movie_id, 'upsert')
                 
                 print(f"[DEBUG] Movie inserted with ID: {movie_id}")
                 return jsonify({
@@ -282,7 +294,8 @@ def upload_movie():
                     'poster': poster_filename,
                     'backdrop': backdrop_filename,
                     'video_playlist': video_file_path,
-                    'video_folder': video_folder
+                    'video_folder': video_folder,
+                    'media': media_metadata
                 }), 201
                 
         except Exception as e:
@@ -454,6 +467,7 @@ def delete_movie(movie_id):
                 # Delete movie from database
                 cursor.execute("DELETE FROM movies WHERE id = %s", (movie_id,))
                 conn.commit()
+                catalog.notify_change('movie', movie_id, 'delete')
                 
                 print("[DEBUG] Deleting associated files")
                 # Delete associated files
@@ -529,4 +543,17 @@ def get_admin_stats():
     except Exception as e:
         print(f"[DEBUG] Exception in get_admin_stats: {e}")
         logging.error(f"Get stats error: {e}")
-        return jsonify({'error': 'Internal server error'}), 500
\ No newline at end of file
+        return jsonify({'error': 'Internal server error'}), 500
+
+
+@admin_bp.route('/admin/search-index/rebuild', methods=['POST'])
+@admin_required
+def rebuild_search_index():
+    """Rebuild the in-memory search and suggest indexes of this worker from the database"""
+    try:
+        search_index.rebuild()
+        suggest_index.rebuild()
+        return jsonify({'search': search_index.stats(), 'suggest': suggest_index.stats()}), 200
+    except Exception as e:
+        logging.error(f"Rebuild search index error: {e}")
+        return jsonify({'error': 'Internal server error'}), 500
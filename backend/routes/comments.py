@@ -636,19 +636,19 @@ def get_movie_comment_stats(movie_id):
         cursor = connection.cursor()
         
         cursor.execute(
-            "SELECT COUNT(*) FROM comments WHERE movie_id = %s AND is_deleted = 0",
+            "SELECT COUNT(*) FROM movie_comments WHERE movie_id = %s AND is_deleted = 0",
             (movie_id,)
         )
         total_comments = cursor.fetchone()[0]
         
         cursor.execute(
-            "SELECT SUM(likes_count) FROM comments WHERE movie_id = %s AND is_deleted = 0",
+            "SELECT SUM(likes_count) FROM movie_comments WHERE movie_id = %s AND is_deleted = 0",
             (movie_id,)
         )
         total_likes = cursor.fetchone()[0] or 0
         
         cursor.execute(
-            "SELECT COUNT(*) FROM comments WHERE movie_id = %s AND is_deleted = 0 AND created_at >= DATE_SUB(NOW(), INTERVAL 24 HOUR)",
+            "SELECT COUNT(*) FROM movie_comments WHERE movie_id = %s AND is_deleted = 0 AND created_at >= DATE_SUB(NOW(), INTERVAL 24 HOUR)",
             (movie_id,)
         )
         recent_activity = cursor.fetchone()[0]
@@ -732,10 +732,10 @@ def debug_table():
         cursor = connection.cursor()
         
         # Check movie comments table structure
-        cursor.execute("DESCRIBE comments")
+        cursor.execute("DESCRIBE movie_comments")
         movie_columns = cursor.fetchall()
         
-        cursor.execute("SELECT COUNT(*) FROM comments")
+        cursor.execute("SELECT COUNT(*) FROM movie_comments")
         movie_count = cursor.fetchone()[0]
         
         # Check show comments table structure  
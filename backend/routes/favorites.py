@@ -50,6 +50,8 @@ def add_favorite():
     except Exception as e:
         print(f"Database error: {e}")
         return jsonify({'error': 'DB Error'}), 500
+    finally:
+        conn.close()
 
 @favorites_bp.route('/favorites/<int:item_id>', methods=['DELETE'])
 def remove_favorite(item_id):
@@ -80,6 +82,8 @@ def remove_favorite(item_id):
     except Exception as e:
         print(f"Database error: {e}")
         return jsonify({'error': 'DB Error'}), 500
+    finally:
+        conn.close()
 
 @favorites_bp.route('/favorites', methods=['GET'])
 def get_favorites():
@@ -132,6 +136,8 @@ def get_favorites():
     except Exception as e:
         print(f"Database error: {e}")
         return jsonify({'error': 'DB Error'}), 500
+    finally:
+        conn.close()
 
 # Backward compatibility endpoints
 @favorites_bp.route('/favorites/movies', methods=['GET'])
@@ -157,6 +163,8 @@ def get_favorite_movies():
     except Exception as e:
         print(f"Database error: {e}")
         return jsonify({'error': 'DB Error'}), 500
+    finally:
+        conn.close()
 
 @favorites_bp.route('/favorites/shows', methods=['GET'])
 def get_favorite_shows():
@@ -180,6 +188,8 @@ def get_favorite_shows():
     except Exception as e:
         print(f"Database error: {e}")
         return jsonify({'error': 'DB Error'}), 500
+    finally:
+        conn.close()
 
 @favorites_bp.route('/favorites/check/<int:item_id>', methods=['GET'])
 def check_favorite(item_id):
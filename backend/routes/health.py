@@ -0,0 +1,60 @@
+from flask import Blueprint, jsonify
+from db import pool
+from utils.check_admin import admin_required
+from utils.query_stats import summary
+from utils.cache import catalog_cache
+from utils import search_cache
+from utils.playlist_cache import playlist_cache
+from utils.media_paths import media_paths
+from utils.segment_cache import segment_cache
+from utils.file_ranges import fd_cache
+from utils.genre_index import genre_index
+from utils.search_index import search_index
+from utils.suggest_index import suggest_index
+from utils.people_index import people_index
+
+health_bp = Blueprint('health', __name__)
+
+# Các endpoint /health/<...> lộ dạng câu SQL, endpoint đang giữ kết nối, truy vấn tìm kiếm...
+# -> chỉ admin; probe liveness công khai chỉ trả 'ok'
+
+@health_bp.route('/health', methods=['GET'])
+def liveness():
+    """Tiến trình còn sống (không chạm DB / cache)"""
+    return jsonify({'status': 'ok'})
+
+@health_bp.route('/health/db', methods=['GET'])
+@admin_required
+def db_health():
+    """Tình trạng pool kết nối DB: số kết nối đang mượn / rảnh và thời gian chờ"""
+    return jsonify(pool.stats())
+
+@health_bp.route('/health/queries', methods=['GET'])
+@admin_required
+def query_health():
+    """Tổng hợp số truy vấn / thời gian DB theo endpoint, kèm các dạng câu lệnh N+1"""
+    return jsonify(summary.snapshot())
+
+@health_bp.route('/health/cache', methods=['GET'])
+@admin_required
+def cache_health():
+    """Hit / miss / eviction của các cache trong tiến trình"""
+    return jsonify({
+        'catalog': catalog_cache.stats(),
+        'search': search_cache.stats(),
+        'playlist': playlist_cache.stats(),
+        'media_paths': media_paths.stats(),
+        'segments': segment_cache.stats(),
+        'fd': fd_cache.stats()
+    })
+
+@health_bp.route('/health/indexes', methods=['GET'])
+@admin_required
+def index_health():
+    """Kích thước và số lần nạp lại của các index trong bộ nhớ"""
+    return jsonify({
+        'genre': genre_index.stats(),
+        'search': search_index.stats(),
+        'suggest': suggest_index.stats(),
+        'people': people_index.stats()
+    })
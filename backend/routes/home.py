@@ -0,0 +1,75 @@
+import os
+from flask import Blueprint, jsonify, request
+from db import get_db_connection
+from utils.http_cache import catalog_etag
+from utils.cache import cached_json, catalog_cache
+from utils.fields import requested_fields, select_columns
+from utils.pagination import page_limit
+from routes.movies import MOVIE_FIELDS, serialize_movie, attach_movie_relations
+from routes.shows import SHOW_FIELDS, SHOW_LIST_FIELDS, serialize_show
+
+home_bp = Blueprint('home', __name__)
+
+# Các hàng phim trên trang chủ (theo movies.tag), theo thứ tự hiển thị
+HOME_MOVIE_ROWS = tuple(
+    tag.strip() for tag in os.getenv("HOME_MOVIE_ROWS", "trending,top_rated,upcoming").split(',') if tag.strip()
+)
+HOME_ROW_LIMIT = int(os.getenv("HOME_ROW_LIMIT", 20))
+
+# Field Banner / SlideRow / MoviePopup cần hiển thị
+HOME_MOVIE_FIELDS = ('id', 'title', 'original_title', 'poster_path', 'backdrop_path', 'overview', 'release_date')
+
+
+@home_bp.route('/home', methods=['GET'])
+@catalog_etag
+@cached_json(catalog_cache)
+def get_home_feed():
+    """Toàn bộ các hàng của trang chủ trong 1 response"""
+    requested = (t.strip() for t in request.args.get('rows', '').split(','))
+    tags = list(dict.fromkeys(t for t in requested if t and t in HOME_MOVIE_ROWS)) or list(HOME_MOVIE_ROWS)
+    limit = page_limit(request.args.get('limit') or HOME_ROW_LIMIT)
+    movie_fields = requested_fields(MOVIE_FIELDS, HOME_MOVIE_FIELDS)
+
+    movie_columns = select_columns(MOVIE_FIELDS, movie_fields, extra=('id', 'tag'))
+    show_columns = select_columns(SHOW_FIELDS, SHOW_LIST_FIELDS, extra=('id',))
+
+    # Mỗi hàng là một nhánh UNION ALL đọc N dòng đầu của index (tag, created_at, id):
+    # 1 round trip cho mọi hàng, không filesort. row_tag là tag được yêu cầu: MySQL so sánh tag
+    # không phân biệt hoa thường / bỏ khoảng trắng cuối nên movies.tag có thể khác ('Trending ')
+    row_query = f"""
+        (SELECT %s AS row_tag, {movie_columns} FROM movies
+         WHERE tag = %s
+         ORDER BY created_at DESC, id DESC
+         LIMIT %s)
+    """
+    params = []
+    for tag in tags:
+        params.extend([tag, tag, limit])
+
+    conn = get_db_connection()
+    try:
+        with conn.cursor() as cursor:
+            cursor.execute(" UNION ALL ".join([row_query] * len(tags)), params)
+            movies = cursor.fetchall()
+            attach_movie_relations(cursor, movies, movie_fields)
+
+            cursor.execute(f"""
+                SELECT {show_columns} FROM shows
+                ORDER BY created_at DESC, id DESC
+                LIMIT %s
+            """, (limit,))
+            shows = cursor.fetchall()
+
+        rows = {tag: [] for tag in tags}
+        for m in movies:
+            rows[m['row_tag']].append(serialize_movie(m, movie_fields))
+
+        return jsonify({
+            'rows': [{'tag': tag, 'items': rows[tag]} for tag in tags],
+            'shows': [serialize_show(s) for s in shows]
+        })
+    except Exception as e:
+        print("[❌ GET /api/home]", e)
+        return jsonify({'error': 'Lỗi server'}), 500
+    finally:
+        conn.close()
@@ -0,0 +1,85 @@
+from flask import Blueprint, jsonify, request
+from db import get_db_connection
+from utils.http_cache import catalog_etag
+from utils.fields import requested_fields, select_columns
+from routes.movies import MOVIE_FIELDS, MOVIE_LIST_FIELDS, serialize_movie, attach_movie_relations
+from routes.shows import SHOW_FIELDS, SHOW_LIST_FIELDS, serialize_show
+
+items_bp = Blueprint('items', __name__)
+
+# Số id tối đa trong một mệnh đề IN (...); danh sách dài hơn được chia thành nhiều truy vấn
+BATCH_CHUNK_SIZE = 1000
+
+BATCH_MOVIE_FIELDS = MOVIE_LIST_FIELDS + ('original_title', 'vote_average', 'vote_count', 'runtime')
+
+
+def parse_ids(param):
+    """?movie_ids=1,2,3 (hoặc lặp lại param) -> list id, giữ thứ tự, bỏ trùng"""
+    ids = []
+    for raw in request.args.getlist(param):
+        for part in raw.split(','):
+            part = part.strip()
+            if part:
+                ids.append(int(part))
+    return list(dict.fromkeys(ids))
+
+
+def fetch_movies_by_ids(cursor, ids, fields):
+    columns = select_columns(MOVIE_FIELDS, fields, extra=('id',))
+    rows = {}
+    for start in range(0, len(ids), BATCH_CHUNK_SIZE):
+        chunk = ids[start:start + BATCH_CHUNK_SIZE]
+        placeholders = ', '.join(['%s'] * len(chunk))
+        cursor.execute(f"SELECT {columns} FROM movies WHERE id IN ({placeholders})", chunk)
+        movies = cursor.fetchall()
+        attach_movie_relations(cursor, movies, fields)
+        rows.update((row['id'], row) for row in movies)
+    return rows
+
+
+def fetch_shows_by_ids(cursor, ids, fields):
+    columns = select_columns(SHOW_FIELDS, fields, extra=('id',))
+    rows = {}
+    for start in range(0, len(ids), BATCH_CHUNK_SIZE):
+        chunk = ids[start:start + BATCH_CHUNK_SIZE]
+        placeholders = ', '.join(['%s'] * len(chunk))
+        cursor.execute(f"SELECT {columns} FROM shows WHERE id IN ({placeholders})", chunk)
+        rows.update((row['id'], row) for row in cursor.fetchall())
+    return rows
+
+
+@items_bp.route('/items/batch', methods=['GET'])
+@catalog_etag
+def get_items_batch():
+    """Lấy nhiều phim / show trong 1 request, giữ nguyên thứ tự id được yêu cầu"""
+    try:
+        movie_ids = parse_ids('movie_ids')
+        show_ids = parse_ids('show_ids')
+    except ValueError:
+        return jsonify({'error': 'Danh sách id không hợp lệ'}), 400
+
+    movie_fields = requested_fields(MOVIE_FIELDS, BATCH_MOVIE_FIELDS, param='movie_fields')
+    show_fields = requested_fields(SHOW_FIELDS, SHOW_LIST_FIELDS, param='show_fields')
+
+    if not movie_ids and not show_ids:
+        return jsonify({'movies': [], 'shows': [], 'missing': {'movies': [], 'shows': []}})
+
+    conn = get_db_connection()
+    try:
+        with conn.cursor() as cursor:
+            movies = fetch_movies_by_ids(cursor, movie_ids, movie_fields) if movie_ids else {}
+            shows = fetch_shows_by_ids(cursor, show_ids, show_fields) if show_ids else {}
+
+        return jsonify({
+            'movies': [serialize_movie(movies[i], movie_fields) for i in movie_ids if i in movies],
+            'shows': [serialize_show(shows[i], show_fields) for i in show_ids if i in shows],
+            'missing': {
+                'movies': [i for i in movie_ids if i not in movies],
+                'shows': [i for i in show_ids if i not in shows]
+            }
+        })
+    except Exception as e:
+        print("[❌ GET /api/items/batch]", e)
+        return jsonify({'error': 'Lỗi server'}), 500
+    finally:
+        conn.close()
@@ -1,34 +1,154 @@
-import json
 from flask import Blueprint, jsonify, request
 from db import get_db_connection
+from utils.http_cache import catalog_etag
+from utils.pagination import page_limit, request_cursor, keyset_params, paginate, paged_response, encode_cursor
+from utils.cache import cached_json, catalog_cache
+from utils.fields import requested_fields, select_columns, serialize_row
+from utils.movie_relations import load_movie_cast, load_movie_genres
+from utils.genre_index import genre_index
 
 movies_bp = Blueprint('movies', __name__)
 
+# Field trả về -> (các cột cần SELECT, hàm serialize từ row DB)
+# genre_ids / cast không đọc từ cột mà từ bảng movie_genres / movie_cast (xem attach_movie_relations)
+MOVIE_FIELDS = {
+    'id': (('id',), lambda m: m['id']),
+    'title': (('title',), lambda m: m['title']),
+    'original_title': (('original_title',), lambda m: m.get('original_title')),
+    'poster_path': (('poster_path',), lambda m: f"/api/static/posters/{m['poster_path']}" if m['poster_path'] else None),
+    'backdrop_path': (('backdrop_path',), lambda m: f"/api/static/backdrops/{m['backdrop_path']}" if m['backdrop_path'] else None),
+    'overview': (('overview',), lambda m: m['overview']),
+    'release_date': (('release_date',), lambda m: m['release_date'].strftime('%Y-%m-%d') if m['release_date'] else ''),
+    'genre_ids': ((), lambda m: m.get('genre_ids', [])),
+    'original_language': (('original_language',), lambda m: m.get('original_language')),
+    'vote_average': (('vote_average',), lambda m: m.get('vote_average')),
+    'vote_count': (('vote_count',), lambda m: m.get('vote_count')),
+    'runtime': (('runtime',), lambda m: m.get('runtime')),
+    'tag': (('tag',), lambda m: m.get('tag')),
+    'cast': ((), lambda m: m.get('cast', [])),
+}
+
+MOVIE_RELATIONS = {
+    'genre_ids': load_movie_genres,
+    'cast': load_movie_cast,
+}
+
+# Field mặc định cho danh sách (SlideRow, MoviePage...) và trang chi tiết
+MOVIE_LIST_FIELDS = ('id', 'title', 'poster_path', 'backdrop_path', 'overview', 'release_date')
+MOVIE_DETAIL_FIELDS = (
+    'id', 'title', 'original_title', 'poster_path', 'backdrop_path', 'overview', 'release_date',
+    'genre_ids', 'original_language', 'vote_average', 'vote_count', 'runtime', 'cast'
+)
+
+
+def serialize_movie(row, fields=MOVIE_LIST_FIELDS):
+    return serialize_row(MOVIE_FIELDS, row, fields)
+
+
+def attach_movie_relations(cursor, rows, fields):
+    """Gắn genre_ids / cast vào các row phim nếu được yêu cầu - mỗi loại một truy vấn cho cả danh sách"""
+    movie_ids = [row['id'] for row in rows]
+    for field, load in MOVIE_RELATIONS.items():
+        if field in fields and movie_ids:
+            values = load(cursor, movie_ids)
+            for row in rows:
+                row[field] = values[row['id']]
+
+
+def request_genres():
+    """Đọc ?genre=28&genre=12 (hoặc ?genre=28,12); ValueError nếu có id không phải số"""
+    genres = []
+    for raw in request.args.getlist('genre'):
+        for part in raw.split(','):
+            part = part.strip()
+            if part:
+                try:
+                    genres.append(int(part))
+                except ValueError:
+                    raise ValueError(f'Thể loại không hợp lệ: {part}')
+    return list(dict.fromkeys(genres))
+
+
+def get_movies_by_genre(genres, tags, fields, limit, page_cursor):
+    """Lọc theo thể loại / tag bằng inverted index trong bộ nhớ, DB chỉ đọc các phim của trang theo id"""
+    match_all = request.args.get('genre_mode', 'all') != 'any'
+    bits = genre_index.query(genres, match_all=match_all, tags=tags)
+    positions = genre_index.page(bits, limit + 1, after=page_cursor)
+    if not positions:
+        return paged_response([], None)
+
+    # Cursor lấy từ vị trí trong index (không phụ thuộc dòng DB còn tồn tại hay không)
+    next_cursor = encode_cursor(*positions[limit - 1]) if len(positions) > limit else None
+    ids = [movie_id for _, movie_id in positions[:limit]]
+
+    columns = select_columns(MOVIE_FIELDS, fields, extra=('id', 'created_at'))
+    placeholders = ', '.join(['%s'] * len(ids))
+    conn = get_db_connection()
+    try:
+        with conn.cursor() as cursor:
+            cursor.execute(f"SELECT {columns} FROM movies WHERE id IN ({placeholders})", ids)
+            rows = {row['id']: row for row in cursor.fetchall()}
+            # Giữ thứ tự của index; phim vừa bị xoá (index chưa kịp cập nhật) thì bỏ qua
+            movies = [rows[i] for i in ids if i in rows]
+            attach_movie_relations(cursor, movies, fields)
+    finally:
+        conn.close()
+
+    return paged_response([serialize_movie(m, fields) for m in movies], next_cursor)
+
+
 @movies_bp.route('/movies', methods=['GET'])
+@catalog_etag
+@cached_json(catalog_cache)
 def get_movies():
     movie_type = request.args.get("type")
+    fields = requested_fields(MOVIE_FIELDS, MOVIE_LIST_FIELDS)
+    limit = page_limit(request.args.get("limit"))
+    try:
+        page_cursor = request_cursor()
+        genres = request_genres()
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+
+    # ?genre=..&tag=.. (AND / OR với ?genre_mode=any) -> giao / hợp bitset thay vì quét bảng
+    tags = request.args.getlist('tag')
+    if genres or tags:
+        try:
+            return get_movies_by_genre(genres, tags + ([movie_type] if movie_type else []), fields, limit, page_cursor)
+        except Exception as e:
+            print("[❌ DB ERROR]", e)
+            return jsonify({'error': 'Lỗi server hoặc DB'}), 500
+
+    # Chỉ lấy cột cần serialize (+ created_at, id cho keyset) thay vì SELECT *
+    columns = select_columns(MOVIE_FIELDS, fields, extra=('id', 'created_at'))
     conn = get_db_connection()
 
     try:
         with conn:
             with conn.cursor() as cursor:
+                # Keyset pagination theo (created_at, id) - không dùng OFFSET
                 if movie_type:
-                    cursor.execute("SELECT * FROM movies WHERE tag = %s", (movie_type,))
+                    cursor.execute(f"""
+                        SELECT {columns} FROM movies
+                        WHERE tag = %s
+                          AND (created_at < %s OR (created_at = %s AND id < %s) OR (created_at IS NULL AND id < %s))
+                        ORDER BY created_at DESC, id DESC
+                        LIMIT %s
+                    """, [movie_type] + keyset_params(page_cursor) + [limit + 1])
                 else:
-                    cursor.execute("SELECT * FROM movies ORDER BY created_at DESC LIMIT 50")
+                    cursor.execute(f"""
+                        SELECT {columns} FROM movies
+                        WHERE (created_at < %s OR (created_at = %s AND id < %s) OR (created_at IS NULL AND id < %s))
+                        ORDER BY created_at DESC, id DESC
+                        LIMIT %s
+                    """, keyset_params(page_cursor) + [limit + 1])
 
-                movies = cursor.fetchall()
+                movies, next_cursor = paginate(cursor.fetchall(), limit)
+                attach_movie_relations(cursor, movies, fields)
 
-        result = [{
-            'id': m['id'],
-            'title': m['title'],
-            'poster_path': f"/api/static/posters/{m['poster_path']}" if m['poster_path'] else None,
-            'backdrop_path': f"/api/static/backdrops/{m['backdrop_path']}" if m['backdrop_path'] else None,
-            'overview': m['overview'],
-            'release_date': m['release_date'].strftime('%Y-%m-%d') if m['release_date'] else ''
-        } for m in movies]
+        result = [serialize_movie(m, fields) for m in movies]
 
-        return jsonify(result)
+        return paged_response(result, next_cursor)
 
     except Exception as e:
         print("[❌ DB ERROR]", e)
@@ -37,42 +157,26 @@ def get_movies():
 
 # ✅ API mới: Lấy chi tiết 1 phim theo ID
 @movies_bp.route('/movies/<int:movie_id>', methods=['GET'])
+@catalog_etag
+@cached_json(catalog_cache)
 def get_movie_detail(movie_id):
+    fields = requested_fields(MOVIE_FIELDS, MOVIE_DETAIL_FIELDS)
+    columns = select_columns(MOVIE_FIELDS, fields)
     conn = get_db_connection()
 
     try:
         with conn:
             with conn.cursor() as cursor:
-                cursor.execute("SELECT * FROM movies WHERE id = %s", (movie_id,))
+                cursor.execute(f"SELECT {columns} FROM movies WHERE id = %s", (movie_id,))
                 m = cursor.fetchone()
+                if m:
+                    attach_movie_relations(cursor, [m], fields)
 
         if not m:
             return jsonify({'error': 'Phim không tồn tại'}), 404
 
-
-        movie = {
-            'id': m['id'],
-            'title': m['title'],
-            'original_title': m.get('original_title'),
-            'poster_path': f"/api/static/posters/{m['poster_path']}" if m['poster_path'] else None,
-            'backdrop_path': f"/api/static/backdrops/{m['backdrop_path']}" if m['backdrop_path'] else None,
-            'overview': m['overview'],
-            'release_date': m['release_date'].strftime('%Y-%m-%d') if m['release_date'] else '',
-            'genre_ids': m.get('genre_ids'),
-            'original_language': m.get('original_language'),
-            'vote_average': m.get('vote_average'),
-            'vote_count': m.get('vote_count'),
-            'runtime': m.get('runtime'),
-            'cast': json.loads(m['cast']) if m.get('cast') else []  # 👈 convert từ chuỗi JSON sang object
-        }
-
-
-
-        return jsonify(movie)
+        return jsonify(serialize_movie(m, fields))
 
     except Exception as e:
         print("[❌ DB ERROR]", e)
         return jsonify({'error': 'Lỗi server hoặc DB'}), 500
-
-
-
@@ -0,0 +1,41 @@
+from flask import Blueprint, jsonify
+from db import get_db_connection
+from utils.http_cache import catalog_etag
+from utils.cache import cached_json, catalog_cache
+from utils.fields import requested_fields
+from utils.people_index import people_index
+from routes.movies import MOVIE_FIELDS, MOVIE_LIST_FIELDS, serialize_movie
+from routes.items import fetch_movies_by_ids
+
+people_bp = Blueprint('people', __name__)
+
+
+@people_bp.route('/people/<path:name>/movies', methods=['GET'])
+@catalog_etag
+@cached_json(catalog_cache)
+def get_person_movies(name):
+    """Các phim có diễn viên theo tên (không phân biệt hoa thường / dấu), tra từ people index"""
+    fields = requested_fields(MOVIE_FIELDS, MOVIE_LIST_FIELDS)
+    try:
+        found = people_index.lookup(name)
+        if not found:
+            return jsonify({'error': 'Không tìm thấy diễn viên'}), 404
+        person, credits = found
+
+        conn = get_db_connection()
+        try:
+            with conn.cursor() as cursor:
+                movies = fetch_movies_by_ids(cursor, [movie_id for movie_id, _ in credits], fields)
+        finally:
+            conn.close()
+
+        return jsonify({
+            'person': person,
+            'movies': [
+                dict(serialize_movie(movies[movie_id], fields), character=character)
+                for movie_id, character in credits if movie_id in movies
+            ]
+        })
+    except Exception as e:
+        print("[❌ GET /api/people/<name>/movies]", e)
+        return jsonify({'error': 'Lỗi server'}), 500
@@ -12,12 +12,15 @@ def get_profile():
         return jsonify({'error': 'Unauthorized'}), 401
 
     conn = get_db_connection()
-    with conn.cursor() as cursor:
-        cursor.execute("""
-            SELECT name, email, birthdate, phone FROM users WHERE id = %s
-        """, (user_id,))
-        user = cursor.fetchone()
-        return jsonify(user)
+    try:
+        with conn.cursor() as cursor:
+            cursor.execute("""
+                SELECT name, email, birthdate, phone FROM users WHERE id = %s
+            """, (user_id,))
+            user = cursor.fetchone()
+            return jsonify(user)
+    finally:
+        conn.close()
     
 @profile_bp.route('/profile', methods=['PUT'])
 def update_profile():
@@ -30,21 +33,24 @@ def update_profile():
         return jsonify({'error': 'Thiếu dữ liệu'}), 400
 
     conn = get_db_connection()
-    with conn.cursor() as cursor:
-        if not birthdate_raw:
-            cursor.execute("SELECT birthdate FROM users WHERE id = %s", (user_id,))
-            birthdate = cursor.fetchone()["birthdate"]
-        else:
-            try:
-                birthdate = datetime.strptime(birthdate_raw[:10], '%Y-%m-%d').date()
-            except:
-                return jsonify({'error': 'Định dạng ngày không hợp lệ'}), 400
-        cursor.execute("""
-            UPDATE users
-            SET name = %s, birthdate = %s, phone = %s
-            WHERE id = %s
-        """, (name, birthdate,phone, user_id))
-    conn.commit()
+    try:
+        with conn.cursor() as cursor:
+            if not birthdate_raw:
+                cursor.execute("SELECT birthdate FROM users WHERE id = %s", (user_id,))
+                birthdate = cursor.fetchone()["birthdate"]
+            else:
+                try:
+                    birthdate = datetime.strptime(birthdate_raw[:10], '%Y-%m-%d').date()
+                except:
+                    return jsonify({'error': 'Định dạng ngày không hợp lệ'}), 400
+            cursor.execute("""
+                UPDATE users
+                SET name = %s, birthdate = %s, phone = %s
+                WHERE id = %s
+            """, (name, birthdate,phone, user_id))
+        conn.commit()
+    finally:
+        conn.close()
     return jsonify({'message': 'Cập nhật thành công'})
 
 
@@ -59,14 +65,17 @@ def change_password():
         return jsonify({'error': 'Thiếu thông tin'}), 400
 
     conn = get_db_connection()
-    with conn.cursor() as cursor:
-        cursor.execute("SELECT password FROM users WHERE id = %s", (user_id,))
-        user = cursor.fetchone()
-        if not user or user['password'] != old:
-            return jsonify({'error': 'Sai mật khẩu cũ'}), 400
-
-        cursor.execute("UPDATE users SET password = %s WHERE id = %s", (new, user_id))
-        conn.commit()
+    try:
+        with conn.cursor() as cursor:
+            cursor.execute("SELECT password FROM users WHERE id = %s", (user_id,))
+            user = cursor.fetchone()
+            if not user or user['password'] != old:
+                return jsonify({'error': 'Sai mật khẩu cũ'}), 400
+
+            cursor.execute("UPDATE users SET password = %s WHERE id = %s", (new, user_id))
+            conn.commit()
+    finally:
+        conn.close()
     return jsonify({'message': 'Đổi mật khẩu thành công'})
 
 
@@ -1,62 +1,205 @@
+import os
 from flask import Blueprint, jsonify, request
 from db import get_db_connection
+from utils.http_cache import catalog_etag
+from utils.pagination import page_limit, encode_offset_cursor, decode_offset_cursor
+from utils.search_index import search_index, search_document
+from utils.suggest_index import suggest_index
+from utils.search_cache import cached_search
 
 search_bp = Blueprint('search', __name__)
 
+# 'memory': inverted index BM25 trong tiến trình (mặc định)
+# 'fulltext': FULLTEXT index của MySQL/MariaDB (migration 004), xếp theo MATCH ... AGAINST
+# 'like': quét LIKE trên DB như cũ
+SEARCH_BACKEND = os.getenv("SEARCH_BACKEND", "memory")
+SEARCH_RESULT_LIMIT = int(os.getenv("SEARCH_RESULT_LIMIT", 50))   # số kết quả cho client cũ (không phân trang)
+SEARCH_TYPES = ('movie', 'show')
+SUGGEST_LIMIT = int(os.getenv("SUGGEST_LIMIT", 8))
+SUGGEST_MAX_LIMIT = 20
+SUGGEST_TYPES = ('movie', 'show', 'person')
+
+MOVIE_MATCH = "MATCH(title, original_title, overview) AGAINST (%s IN NATURAL LANGUAGE MODE)"
+SHOW_MATCH = "MATCH(title, description) AGAINST (%s IN NATURAL LANGUAGE MODE)"
+
+
+def fetch_documents(cursor, matches):
+    """Đọc chi tiết (kèm overview) chỉ cho các dòng của trang, giữ thứ tự xếp hạng"""
+    ids = {'movie': [], 'show': []}
+    for row in matches:
+        ids[row['content_type']].append(row['id'])
+
+    rows = {}
+    if ids['movie']:
+        placeholders = ', '.join(['%s'] * len(ids['movie']))
+        cursor.execute(f"""
+            SELECT id, title, poster_path, backdrop_path, overview, release_date
+            FROM movies WHERE id IN ({placeholders})
+        """, ids['movie'])
+        rows.update((('movie', row['id']), row) for row in cursor.fetchall())
+    if ids['show']:
+        placeholders = ', '.join(['%s'] * len(ids['show']))
+        cursor.execute(f"""
+            SELECT id, title, show_poster AS poster_path, NULL AS backdrop_path,
+                   description AS overview, NULL AS release_date
+            FROM shows WHERE id IN ({placeholders})
+        """, ids['show'])
+        rows.update((('show', row['id']), row) for row in cursor.fetchall())
+
+    documents = []
+    for match in matches:
+        row = rows.get((match['content_type'], match['id']))
+        if row:
+            documents.append(dict(search_document(row, match['content_type']), score=round(float(match['score']), 4)))
+    return documents
+
+
+def db_search_queries(branches, offset, limit):
+    """[(câu SQL, tham số)] của bước xếp hạng và bước đếm cho các nhánh tìm kiếm.
+
+    branches: [(câu SELECT content_type, id, created_at, score, tham số)] - mỗi bảng một nhánh,
+    bộ lọc type chỉ giữ lại nhánh tương ứng. Tách riêng để check_query_plans.py EXPLAIN được.
+    """
+    union = " UNION ALL ".join(f"({sql})" for sql, _ in branches)
+    params = [p for _, branch_params in branches for p in branch_params]
+    return [
+        (f"""
+            SELECT content_type, id, score FROM ({union}) AS matches
+            ORDER BY score DESC, created_at DESC
+            LIMIT %s OFFSET %s
+        """, params + [limit, offset]),
+        (f"SELECT COUNT(*) AS total FROM ({union}) AS matches", params)
+    ]
+
+
+def db_search(branches, offset, limit):
+    """Xếp hạng chung phim + show trong một truy vấn UNION ALL.
+
+    Bước xếp hạng chỉ đọc id + điểm, overview chỉ được đọc cho các dòng của trang.
+    Trả về (tổng số kết quả, kết quả của trang).
+    """
+    (rank_sql, rank_params), (count_sql, count_params) = db_search_queries(branches, offset, limit)
+
+    conn = get_db_connection()
+    with conn:
+        with conn.cursor() as cursor:
+            cursor.execute(rank_sql, rank_params)
+            matches = cursor.fetchall()
+
+            cursor.execute(count_sql, count_params)
+            total = cursor.fetchone()['total']
+
+            return total, fetch_documents(cursor, matches)
+
+
+def like_branches(query, content_type):
+    """Nhánh tìm bằng LIKE '%q%' (không dùng được index, xếp theo created_at thay vì độ liên quan)"""
+    like_query = f"%{query.lower()}%"
+    branches = []
+    if content_type in (None, 'movie'):
+        branches.append(("""
+            SELECT 'movie' AS content_type, id, created_at, 0 AS score FROM movies
+            WHERE LOWER(title) LIKE %s OR LOWER(overview) LIKE %s OR LOWER(tag) LIKE %s
+        """, [like_query] * 3))
+    if content_type in (None, 'show'):
+        branches.append(("""
+            SELECT 'show' AS content_type, id, created_at, 0 AS score FROM shows
+            WHERE LOWER(title) LIKE %s OR LOWER(description) LIKE %s
+        """, [like_query] * 2))
+    return branches
+
+
+def fulltext_branches(query, content_type):
+    """Nhánh tìm bằng FULLTEXT index, xếp theo độ liên quan của MATCH ... AGAINST"""
+    branches = []
+    if content_type in (None, 'movie'):
+        branches.append((f"""
+            SELECT 'movie' AS content_type, id, created_at, {MOVIE_MATCH} AS score FROM movies
+            WHERE {MOVIE_MATCH}
+        """, [query, query]))
+    if content_type in (None, 'show'):
+        branches.append((f"""
+            SELECT 'show' AS content_type, id, created_at, {SHOW_MATCH} AS score FROM shows
+            WHERE {SHOW_MATCH}
+        """, [query, query]))
+    return branches
+
+
+def run_search(query, content_type, offset, limit):
+    """(tổng số kết quả, kết quả trang [offset, offset + limit)) theo SEARCH_BACKEND"""
+    total, items = 0, []
+    if SEARCH_BACKEND == 'like':
+        total, items = db_search(like_branches(query, content_type), offset, limit)
+    elif SEARCH_BACKEND == 'fulltext':
+        total, items = db_search(fulltext_branches(query, content_type), offset, limit)
+
+    # Index trong bộ nhớ chịu được lỗi gõ (trigram + edit distance) -> dùng khi backend DB không khớp gì
+    if not total:
+        total, items = search_index.search(query, limit, offset, content_type)
+    return total, items
+
+
 @search_bp.route('/search', methods=['GET'])
+@catalog_etag
 def search_all():
+    """Một danh sách xếp hạng chung cho phim + show.
+
+    Client cũ (chỉ ?q=) nhận mảng SEARCH_RESULT_LIMIT kết quả đầu. Có ?page= / ?cursor= /
+    ?limit= / ?type= thì nhận {items, total, page, next_cursor}.
+    """
     query = request.args.get("q")
+    paged = any(param in request.args for param in ('page', 'cursor', 'limit', 'type'))
     if not query:
-        return jsonify([])
+        return jsonify({'items': [], 'total': 0, 'page': 1, 'next_cursor': None} if paged else [])
 
-    conn = get_db_connection()
+    content_type = request.args.get("type") or None
+    if content_type and content_type not in SEARCH_TYPES:
+        return jsonify({'error': 'type phải là movie hoặc show'}), 400
 
+    limit = page_limit(request.args.get("limit")) if paged else SEARCH_RESULT_LIMIT
     try:
-        with conn:
-            with conn.cursor() as cursor:
-                like_query = f"%{query.lower()}%"
-
-                # Search in movies
-                cursor.execute("""
-                    SELECT id, title, poster_path, backdrop_path, overview, release_date,
-                           'movie' AS content_type
-                    FROM movies
-                    WHERE LOWER(title) LIKE %s OR LOWER(overview) LIKE %s OR LOWER(tag) LIKE %s
-                    ORDER BY created_at DESC
-                    LIMIT 25
-                """, (like_query, like_query, like_query))
-                movies = cursor.fetchall()
-
-                # Search in shows (title + description)
-                cursor.execute("""
-                    SELECT id, title, show_poster AS poster_path, NULL AS backdrop_path,
-                        description AS overview, NULL AS release_date,
-                        'show' AS content_type
-                    FROM shows
-                    WHERE LOWER(title) LIKE %s OR LOWER(description) LIKE %s
-                    ORDER BY created_at DESC
-                    LIMIT 25
-                """, (like_query, like_query))
-                shows = cursor.fetchall()
-
-        # Merge and format result
-        combined = list(movies) + list(shows)
-        result = []
-        for row in combined:
-            poster_path = row['poster_path']
-            poster_prefix = "/api/static/posters/" if row['content_type'] == 'movie' else "/api/static/show-poster/"
-            result.append({
-                'id': row['id'],
-                'title': row['title'],
-                'poster_path': f"{poster_prefix}{poster_path}" if poster_path else None,
-                'backdrop_path': f"/api/static/backdrops/{row['backdrop_path']}" if row.get('backdrop_path') else None,
-                'overview': row['overview'],
-                'release_date': row['release_date'].strftime('%Y-%m-%d') if row.get('release_date') else '',
-                'type': row['content_type']  # 'movie' or 'show'
-            })
-
-        return jsonify(result)
+        if request.args.get('cursor'):
+            offset = decode_offset_cursor(request.args['cursor'])
+        else:
+            offset = (max(1, int(request.args.get('page', 1))) - 1) * limit
+    except ValueError:
+        return jsonify({'error': 'Trang hoặc cursor không hợp lệ'}), 400
 
+    try:
+        scope = (SEARCH_BACKEND, content_type, offset, limit)
+        total, items = cached_search(
+            scope, query,
+            lambda q: run_search(q, content_type, offset, limit),
+            exact=SEARCH_BACKEND in ('like', 'fulltext')
+        )
     except Exception as e:
         print("[❌ SEARCH ERROR]", e)
-        return jsonify({'error': 'Lỗi tìm kiếm từ server'}), 500
\ No newline at end of file
+        return jsonify({'error': 'Lỗi tìm kiếm từ server'}), 500
+
+    if not paged:
+        return jsonify(items)
+    next_offset = offset + limit
+    return jsonify({
+        'items': items,
+        'total': total,
+        'page': offset // limit + 1,
+        'next_cursor': encode_offset_cursor(next_offset) if next_offset < total else None
+    })
+
+
+@search_bp.route('/search/suggest', methods=['GET'])
+@catalog_etag
+def search_suggest():
+    """Gợi ý khi đang gõ: tiền tố của từ bất kỳ trong tên phim / show / diễn viên, phổ biến nhất trước"""
+    query = request.args.get("q", "")
+    try:
+        limit = max(1, min(int(request.args.get("limit", SUGGEST_LIMIT)), SUGGEST_MAX_LIMIT))
+    except ValueError:
+        limit = SUGGEST_LIMIT
+    types = {t for t in request.args.getlist("type") if t in SUGGEST_TYPES}
+
+    try:
+        return jsonify(suggest_index.suggest(query, limit, types))
+    except Exception as e:
+        print("[❌ SUGGEST ERROR]", e)
+        return jsonify({'error': 'Lỗi tìm kiếm từ server'}), 500
@@ -1,60 +1,93 @@
 import json
 from flask import Blueprint, jsonify, request
 from db import get_db_connection
+from utils.http_cache import catalog_etag
+from utils.pagination import page_limit, request_cursor, keyset_params, paginate, paged_response
+from utils.cache import cached_json, catalog_cache
+from utils.fields import requested_fields, select_columns, serialize_row
 
 shows_bp = Blueprint('shows', __name__)
 
+# Field trả về -> (các cột cần SELECT, hàm serialize từ row DB)
+SHOW_FIELDS = {
+    'id': (('id',), lambda s: s['id']),
+    'title': (('title',), lambda s: s['title']),
+    'description': (('description',), lambda s: s.get('description', '')),
+    'genre': (('genre',), lambda s: s.get('genre', '')),
+    'year': (('year',), lambda s: s.get('year')),
+    'show_poster': (('show_poster',), lambda s: f"/api/static/show-poster/{s['show_poster']}" if s['show_poster'] else None),
+}
+
+SHOW_LIST_FIELDS = ('id', 'title', 'description', 'genre', 'year', 'show_poster')
+
+
+def serialize_show(row, fields=SHOW_LIST_FIELDS):
+    return serialize_row(SHOW_FIELDS, row, fields)
+
+
 @shows_bp.route('/shows', methods=['GET'])
+@catalog_etag
+@cached_json(catalog_cache)
 def get_shows():
+    fields = requested_fields(SHOW_FIELDS, SHOW_LIST_FIELDS)
+    limit = page_limit(request.args.get("limit"))
+    try:
+        page_cursor = request_cursor()
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+
+    columns = select_columns(SHOW_FIELDS, fields, extra=('id', 'created_at'))
     conn = get_db_connection()
     try:
         with conn.cursor() as cursor:
-            cursor.execute("SELECT * FROM shows ORDER BY created_at DESC")
-            shows = cursor.fetchall()
-
-        return jsonify([{
-            'id': s['id'],
-            'title': s['title'],
-            'description': s.get('description', ''),
-            'genre': s.get('genre', ''),
-            'year': s.get('year'),
-            'show_poster': f"/api/static/show-poster/{s['show_poster']}" if s['show_poster'] else None,
-
-        } for s in shows])
+            # Keyset pagination theo (created_at, id) - không dùng OFFSET
+            cursor.execute(f"""
+                SELECT {columns} FROM shows
+                WHERE (created_at < %s OR (created_at = %s AND id < %s) OR (created_at IS NULL AND id < %s))
+                ORDER BY created_at DESC, id DESC
+                LIMIT %s
+            """, keyset_params(page_cursor) + [limit + 1])
+            shows, next_cursor = paginate(cursor.fetchall(), limit)
+
+        return paged_response([serialize_show(s, fields) for s in shows], next_cursor)
     except Exception as e:
         print("[❌ GET /api/shows]", e)
         return jsonify({'error': 'Lỗi server'}), 500
+    finally:
+        conn.close()
 
 
 
 # ✅ API mới: Lấy chi tiết 1 phim theo ID
 @shows_bp.route('/shows/<int:show_id>', methods=['GET'])
+@catalog_etag
+@cached_json(catalog_cache)
 def get_show_detail(show_id):
+    # 'episodes' không phải cột của shows, được lấy bằng truy vấn riêng
+    fields = requested_fields(dict(SHOW_FIELDS, episodes=None), SHOW_LIST_FIELDS + ('episodes',))
+    show_fields = [f for f in fields if f != 'episodes']
+    columns = select_columns(SHOW_FIELDS, show_fields)
     conn = get_db_connection()
     try:
         with conn.cursor() as cursor:
-            cursor.execute("SELECT * FROM shows WHERE id = %s", (show_id,))
+            cursor.execute(f"SELECT {columns} FROM shows WHERE id = %s", (show_id,))
             show = cursor.fetchone()
             if not show:
                 return jsonify({'error': 'Không tìm thấy chương trình'}), 404
 
-            cursor.execute("""
-                SELECT id, title, episode_number, thumbnail_url
-                FROM show_episodes
-                WHERE show_id = %s
-                ORDER BY episode_number
-            """, (show_id,))
-            episodes = cursor.fetchall()
-
-        return jsonify({
-            'id': show['id'],
-            'title': show['title'],
-            'description': show.get('description', ''),
-            'genre': show.get('genre', ''),
-            'year': show.get('year'),
-            'show_poster': f"/api/static/show-poster/{show['show_poster']}" if show['show_poster'] else None,
-            'episodes': episodes
-        })
+            result = serialize_show(show, show_fields)
+            if 'episodes' in fields:
+                cursor.execute("""
+                    SELECT id, title, episode_number, thumbnail_url
+                    FROM show_episodes
+                    WHERE show_id = %s
+                    ORDER BY episode_number
+                """, (show_id,))
+                result['episodes'] = cursor.fetchall()
+
+        return jsonify(result)
     except Exception as e:
         print("[❌ GET /api/shows/<id>]", e)
         return jsonify({'error': 'Lỗi server'}), 500
+    finally:
+        conn.close()
@@ -1,203 +1,131 @@
-from flask import Blueprint, Response, request, jsonify, send_file, send_from_directory
+from flask import Blueprint, request, jsonify, send_from_directory
 from db import get_db_connection
+from utils.media_paths import playlist_path, segment_path
+from utils.playlist_cache import playlist_response
+from utils.segments import send_segment, verify_url
+from utils.media_probe import MEDIA_COLUMNS
 import os
 import mimetypes
 
 stream_bp = Blueprint('stream', __name__)
 
-# Đường dẫn lưu video
-MOVIE_VIDEO_PATH = os.getenv("MOVIE_VIDEO_PATH", "C:/Users/PC/Desktop/netflix-project/video/movie/")
-SHOW_VIDEO_PATH = os.getenv("SHOW_VIDEO_PATH", "C:/Users/PC/Desktop/netflix-project/video/show/")
+# Đường dẫn title -> thư mục video được cache trong utils.media_paths (xoá khi catalog đổi),
+# nên playlist / segment chỉ query DB lần đầu mỗi title.
+
+
+def variant_playlist_response(key, path, url_prefix, segment):
+    """Playlist của một rendition (URL trong master playlist); URI bên trong tương đối với thư mục của nó"""
+    subdir = os.path.dirname(segment)
+    response = playlist_response(key, path, f"{url_prefix}/{subdir}" if subdir else url_prefix)
+    if response is None:
+        return jsonify({'error': 'File m3u8 không tìm thấy'}), 404
+    return response
 
-# Thêm vào đầu file stream.py
 
 @stream_bp.route('/stream/movie/<int:movie_id>')
 def stream_movie_hls(movie_id):
     """Stream HLS playlist (m3u8) cho movie"""
-    conn = get_db_connection()
-    
     try:
-        with conn.cursor() as cursor:
-            cursor.execute("""
-                SELECT video_file, title
-                FROM movies
-                WHERE id = %s
-            """, (movie_id,))
-            
-            result = cursor.fetchone()
-            
-            if not result or not result.get('video_file'):
-                return jsonify({'error': 'Movie không tồn tại hoặc chưa có video'}), 404
-            
-            # video_file chứa relative path đến playlist: "movie_name/movie_name.m3u8"
-            playlist_relative_path = result['video_file']
-            playlist_full_path = os.path.join(MOVIE_VIDEO_PATH, playlist_relative_path)
-            
-            print(f"[DEBUG] Movie HLS playlist path: {playlist_full_path}")
-            
-            if not os.path.exists(playlist_full_path):
-                print(f"[❌] M3U8 file not found: {playlist_full_path}")
-                return jsonify({'error': 'File m3u8 không tìm thấy'}), 404
-            
-            # Đọc và cập nhật playlist với URLs đầy đủ
-            with open(playlist_full_path, 'r', encoding='utf-8') as f:
-                playlist_lines = []
-                for line in f.readlines():
-                    line = line.strip()
-                    if line and not line.startswith('#'):
-                        # Cập nhật segment URLs
-                        full_segment_url = f"/api/stream/movie/{movie_id}/{line}"
-                        playlist_lines.append(full_segment_url)
-                    else:
-                        playlist_lines.append(line)
+        playlist_full_path = playlist_path(('movie', movie_id))
+        if playlist_full_path is None:
+            return jsonify({'error': 'Movie không tồn tại hoặc chưa có video'}), 404
 
-            playlist_content = "\n".join(playlist_lines)
+        response = playlist_response(('movie', movie_id), playlist_full_path, f"/api/stream/movie/{movie_id}")
+        if response is None:
+            print(f"[❌] M3U8 file not found: {playlist_full_path}")
+            return jsonify({'error': 'File m3u8 không tìm thấy'}), 404
+        return response
 
-            # Trả về nội dung playlist đã cập nhật
-            response = Response(playlist_content, mimetype='application/vnd.apple.mpegurl')
-            response.headers['Cache-Control'] = 'no-cache'
-            return response
-            
     except Exception as e:
         print(f"[❌ Stream Movie Error] {e}")
         return jsonify({'error': 'Lỗi khi stream video'}), 500
-    finally:
-        if conn:
-            conn.close()
+
+@stream_bp.route('/stream/movie/<int:movie_id>/dash')
+def stream_movie_dash(movie_id):
+    """DASH manifest (MPD) cho movie đóng gói fMP4, dùng chung file media với HLS"""
+    try:
+        playlist_full_path = playlist_path(('movie', movie_id))
+        if playlist_full_path is None:
+            return jsonify({'error': 'Movie không tồn tại hoặc chưa có video'}), 404
+
+        mpd_path = os.path.splitext(playlist_full_path)[0] + '.mpd'
+        response = playlist_response(('movie', movie_id), mpd_path, f"/api/stream/movie/{movie_id}")
+        if response is None:
+            return jsonify({'error': 'Movie chưa có bản DASH'}), 404
+        return response
+
+    except Exception as e:
+        print(f"[❌ Stream Movie DASH Error] {e}")
+        return jsonify({'error': 'Lỗi khi stream video'}), 500
 
 @stream_bp.route('/stream/movie/<int:movie_id>/<path:segment>')
 def stream_movie_segment(movie_id, segment):
-    """Stream các file .ts segments cho movie HLS"""
-    conn = get_db_connection()
-    
+    """Stream các file .ts segments (và variant playlist của thang ABR) cho movie HLS"""
     try:
-        with conn.cursor() as cursor:
-            cursor.execute("""
-                SELECT video_file
-                FROM movies
-                WHERE id = %s
-            """, (movie_id,))
-            
-            result = cursor.fetchone()
-            
-            if not result:
-                return jsonify({'error': 'Movie không tồn tại'}), 404
-            
-            # Lấy thư mục chứa video files
-            video_relative_path = result['video_file']
-            video_dir = os.path.dirname(os.path.join(MOVIE_VIDEO_PATH, video_relative_path))
-            
-            print(f"[📂] Movie video directory: {video_dir}")
-            
-            # Path đến file .ts
-            ts_path = os.path.join(video_dir, segment)
-            
-            if not os.path.exists(ts_path):
-                print(f"[❌] TS segment not found: {ts_path}")
-                return jsonify({'error': 'Segment không tìm thấy'}), 404
-            
-            # Trả về file .ts
-            return send_file(
-                ts_path,
-                mimetype='video/mp2t',
-                as_attachment=False,
-                conditional=True
-            )
-            
+        # URL segment do playlist phát ra, có chữ ký HMAC và hạn dùng
+        if not verify_url(request.path, request.args):
+            return jsonify({'error': 'URL segment không hợp lệ hoặc đã hết hạn'}), 403
+
+        ts_path = segment_path(('movie', movie_id), segment)
+        if ts_path is None:
+            return jsonify({'error': 'Movie không tồn tại'}), 404
+
+        if not os.path.isfile(ts_path):
+            print(f"[❌] TS segment not found: {ts_path}")
+            return jsonify({'error': 'Segment không tìm thấy'}), 404
+
+        # Variant playlist của thang ABR (hoặc DASH MPD): rewrite / cache như playlist chính
+        if segment.endswith(('.m3u8', '.mpd')):
+            return variant_playlist_response(('movie', movie_id), ts_path, f"/api/stream/movie/{movie_id}", segment)
+
+        # Trả về file .ts (hoặc để proxy phía trước trả, xem SEGMENT_OFFLOAD)
+        return send_segment(('movie', movie_id), ts_path)
+
     except Exception as e:
         print(f"[❌ Stream Movie Segment Error] {e}")
         return jsonify({'error': 'Lỗi khi stream segment'}), 500
-    finally:
-        if conn:
-            conn.close()
 
 @stream_bp.route('/stream/show/<int:show_id>/episode/<int:episode_id>')
 def stream_show_episode_hls(show_id, episode_id):
     """Stream HLS playlist (m3u8) cho show episode"""
-    conn = get_db_connection()
-    
     try:
-        with conn.cursor() as cursor:
-            cursor.execute("""
-                SELECT se.filepath, s.title as show_name
-                FROM show_episodes se
-                JOIN shows s ON s.id = se.show_id
-                WHERE se.show_id = %s AND se.id = %s
-            """, (show_id, episode_id))
-            
-            result = cursor.fetchone()
-            
-            if not result or not result.get('filepath'):
-                return jsonify({'error': 'Episode không tồn tại'}), 404
-            
-            # filepath từ DB: /videos/shows/1/ep1/movie.m3u8
-            # Chuyển thành path thực tế
-            filepath = result['filepath'].replace('/video/show/', '')
-            m3u8_path = os.path.join(SHOW_VIDEO_PATH, filepath)
-            print(m3u8_path)
-            
-            if not os.path.exists(m3u8_path):
-                print(f"[❌] M3U8 file not found: {m3u8_path}")
-                return jsonify({'error': 'File m3u8 không tìm thấy'}), 404
-            with open(m3u8_path, 'r', encoding='utf-8') as f:
-                playlist_lines = []
-                for line in f.readlines():
-                    line = line.strip()
-                    if line and not line.startswith('#'):
-                        full_segment = f"/api/stream/show/{show_id}/episode/{episode_id}/{line}"
-                        playlist_lines.append(full_segment)
-                    else:
-                        playlist_lines.append(line)
+        m3u8_path = playlist_path(('episode', show_id, episode_id))
+        if m3u8_path is None:
+            return jsonify({'error': 'Episode không tồn tại'}), 404
 
-            playlist_content = "\n".join(playlist_lines)
+        response = playlist_response(('episode', show_id, episode_id), m3u8_path, f"/api/stream/show/{show_id}/episode/{episode_id}")
+        if response is None:
+            print(f"[❌] M3U8 file not found: {m3u8_path}")
+            return jsonify({'error': 'File m3u8 không tìm thấy'}), 404
+        return response
 
-            # Trả về nội dung playlist đã cập nhật
-            response = Response(playlist_content, mimetype='application/vnd.apple.mpegurl')
-            response.headers['Cache-Control'] = 'no-cache'
-            return response
-            
     except Exception as e:
         print(f"[❌ Stream Show Episode Error] {e}")
         return jsonify({'error': 'Lỗi khi stream video'}), 500
 
 @stream_bp.route('/stream/show/<int:show_id>/episode/<int:episode_id>/<path:segment>')
 def stream_show_segment(show_id, episode_id, segment):
-    """Stream các file .ts segments cho HLS"""
-    conn = get_db_connection()
-    
+    """Stream các file .ts segments (và variant playlist của thang ABR) cho HLS"""
     try:
-        with conn.cursor() as cursor:
-            cursor.execute("""
-                SELECT filepath
-                FROM show_episodes
-                WHERE show_id = %s AND id = %s
-            """, (show_id, episode_id))
-            
-            result = cursor.fetchone()
-            
-            if not result:
-                return jsonify({'error': 'Episode không tồn tại'}), 404
-            
-            # Lấy thư mục chứa file m3u8
-            filepath = result['filepath'].replace('/video/show/', '')
-            print(f"[📂] Filepath: {filepath}")
-            episode_dir = os.path.dirname(SHOW_VIDEO_PATH+filepath)
-            print(episode_dir)
-            # Path đến file .ts
-            ts_path = f"{episode_dir}/"+segment
-            
-            if not os.path.exists(ts_path):
-                print(f"[❌] TS segment not found: {ts_path}")
-                return jsonify({'error': 'Segment không tìm thấy'}), 404
-            
-            # Trả về file .ts
-            return send_file(
-                ts_path,
-                mimetype='video/mp2t',
-                as_attachment=False,
-                conditional=True
-            )
-            
+        # URL segment do playlist phát ra, có chữ ký HMAC và hạn dùng
+        if not verify_url(request.path, request.args):
+            return jsonify({'error': 'URL segment không hợp lệ hoặc đã hết hạn'}), 403
+
+        ts_path = segment_path(('episode', show_id, episode_id), segment)
+        if ts_path is None:
+            return jsonify({'error': 'Episode không tồn tại'}), 404
+
+        if not os.path.isfile(ts_path):
+            print(f"[❌] TS segment not found: {ts_path}")
+            return jsonify({'error': 'Segment không tìm thấy'}), 404
+
+        # Variant playlist của thang ABR (hoặc DASH MPD): rewrite / cache như playlist chính
+        if segment.endswith(('.m3u8', '.mpd')):
+            return variant_playlist_response(('episode', show_id, episode_id), ts_path, f"/api/stream/show/{show_id}/episode/{episode_id}", segment)
+
+        # Trả về file .ts (hoặc để proxy phía trước trả, xem SEGMENT_OFFLOAD)
+        return send_segment(('episode', show_id, episode_id), ts_path)
+
     except Exception as e:
         print(f"[❌ Stream Segment Error] {e}")
         return jsonify({'error': 'Lỗi khi stream segment'}), 500
@@ -205,6 +133,13 @@ def stream_show_segment(show_id, episode_id, segment):
 
 
 # API lấy thông tin video
+def video_info(row, has_video):
+    """Metadata media (ghi khi ingest / backfill_media_metadata.py) cho player; None nếu chưa probe"""
+    info = {column: row.get(column) for column in MEDIA_COLUMNS}
+    info['has_video'] = has_video
+    info['type'] = 'hls'
+    return info
+
 @stream_bp.route('/video-info/movie/<int:movie_id>')
 def get_movie_video_info(movie_id):
     """Lấy thông tin video phim"""
@@ -212,8 +147,8 @@ def get_movie_video_info(movie_id):
     
     try:
         with conn.cursor() as cursor:
-            cursor.execute("""
-                SELECT video_file, duration, quality, file_size 
+            cursor.execute(f"""
+                SELECT video_file, {', '.join(MEDIA_COLUMNS)}
                 FROM movies 
                 WHERE id = %s
             """, (movie_id,))
@@ -223,17 +158,14 @@ def get_movie_video_info(movie_id):
             if not movie:
                 return jsonify({'error': 'Phim không tồn tại'}), 404
             
-            return jsonify({
-                'duration': movie.get('duration'),
-                'quality': movie.get('quality', '1080p'),
-                'file_size': movie.get('file_size'),
-                'has_video': bool(movie.get('video_file')),
-                'type': 'mp4'
-            })
+            return jsonify(video_info(movie, bool(movie.get('video_file'))))
             
     except Exception as e:
         print(f"[❌ Get Movie Info Error] {e}")
         return jsonify({'error': 'Lỗi lấy thông tin video'}), 500
+    finally:
+        if conn:
+            conn.close()
 
 @stream_bp.route('/video-info/show/<int:show_id>/episode/<int:episode_id>')
 def get_episode_video_info(show_id, episode_id):
@@ -242,8 +174,8 @@ def get_episode_video_info(show_id, episode_id):
     
     try:
         with conn.cursor() as cursor:
-            cursor.execute("""
-                SELECT filepath, duration, quality, file_size 
+            cursor.execute(f"""
+                SELECT filepath, {', '.join(MEDIA_COLUMNS)}
                 FROM show_episodes 
                 WHERE show_id = %s AND id = %s
             """, (show_id, episode_id))
@@ -253,14 +185,11 @@ def get_episode_video_info(show_id, episode_id):
             if not episode:
                 return jsonify({'error': 'Tập phim không tồn tại'}), 404
             
-            return jsonify({
-                'duration': episode.get('duration'),
-                'quality': episode.get('quality', '1080p'),
-                'file_size': episode.get('file_size'),
-                'has_video': bool(episode.get('filepath')),
-                'type': 'hls'
-            })
+            return jsonify(video_info(episode, bool(episode.get('filepath'))))
             
     except Exception as e:
         print(f"[❌ Get Episode Info Error] {e}")
-        return jsonify({'error': 'Lỗi lấy thông tin video'}), 500
\ No newline at end of file
+        return jsonify({'error': 'Lỗi lấy thông tin video'}), 500
+    finally:
+        if conn:
+            conn.close()
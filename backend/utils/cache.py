@@ -0,0 +1,183 @@
+import os
+import time
+import threading
+from collections import OrderedDict
+from functools import wraps
+from flask import Response, make_response, request
+from utils import catalog
+
+CATALOG_CACHE_SIZE = int(os.getenv("CATALOG_CACHE_SIZE", 512))    # số response tối đa
+CATALOG_CACHE_TTL = float(os.getenv("CATALOG_CACHE_TTL", 300))    # giây
+
+_MISSING = object()
+
+
+class TTLCache:
+    """LRU cache giới hạn số phần tử, mỗi phần tử có TTL; thread-safe"""
+
+    def __init__(self, maxsize, ttl, name=None):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.name = name
+        self._data = OrderedDict()   # key -> (expires_at, value)
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.invalidations = 0
+
+    def get(self, key, default=None):
+        now = time.monotonic()
+        with self._lock:
+            entry = self._data.get(key, _MISSING)
+            if entry is _MISSING:
+                self.misses += 1
+                return default
+            expires_at, value = entry
+            if expires_at <= now:
+                del self._data[key]
+                self.expirations += 1
+                self.misses += 1
+                return default
+            self._data.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def set(self, key, value, ttl=None):
+        expires_at = time.monotonic() + (self.ttl if ttl is None else ttl)
+        with self._lock:
+            self._data[key] = (expires_at, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+                self.evictions += 1
+
+    def invalidate(self, key=None):
+        """Xoá một key, hoặc toàn bộ cache nếu không truyền key"""
+        with self._lock:
+            if key is None:
+                self.invalidations += len(self._data)
+                self._data.clear()
+            elif self._data.pop(key, _MISSING) is not _MISSING:
+                self.invalidations += 1
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'size': len(self._data),
+                'maxsize': self.maxsize,
+                'ttl': self.ttl,
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_ratio': round(self.hits / lookups, 4) if lookups else 0,
+                'evictions': self.evictions,
+                'expirations': self.expirations,
+                'invalidations': self.invalidations
+            }
+
+
+class ByteLRUCache:
+    """LRU giới hạn theo tổng kích thước (byte) của các value; thread-safe.
+
+    size_of(value) trả về số byte của một value (mặc định len(value)). Value lớn hơn
+    cả dung lượng cache thì không được lưu.
+    """
+
+    def __init__(self, maxbytes, name=None, size_of=len):
+        self.maxbytes = maxbytes
+        self.name = name
+        self.size_of = size_of
+        self._data = OrderedDict()   # key -> (size, value)
+        self._lock = threading.Lock()
+        self.bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.rejections = 0
+
+    def get(self, key, default=None):
+        with self._lock:
+            entry = self._data.get(key, _MISSING)
+            if entry is _MISSING:
+                self.misses += 1
+                return default
+            self._data.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+    def set(self, key, value):
+        size = self.size_of(value)
+        with self._lock:
+            old = self._data.pop(key, None)
+            if old is not None:
+                self.bytes -= old[0]
+            if size > self.maxbytes:
+                self.rejections += 1
+                return False
+            self._data[key] = (size, value)
+            self.bytes += size
+            while self.bytes > self.maxbytes:
+                _, (evicted_size, _) = self._data.popitem(last=False)
+                self.bytes -= evicted_size
+                self.evictions += 1
+            return True
+
+    def invalidate(self, key=None):
+        """Xoá một key, hoặc toàn bộ cache nếu không truyền key"""
+        with self._lock:
+            if key is None:
+                self._data.clear()
+                self.bytes = 0
+            else:
+                entry = self._data.pop(key, None)
+                if entry is not None:
+                    self.bytes -= entry[0]
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'entries': len(self._data),
+                'bytes': self.bytes,
+                'maxbytes': self.maxbytes,
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_ratio': round(self.hits / lookups, 4) if lookups else 0,
+                'evictions': self.evictions,
+                'rejections': self.rejections
+            }
+
+
+# Cache response JSON của các endpoint catalog (movies / shows); xoá sạch khi catalog thay đổi
+catalog_cache = TTLCache(CATALOG_CACHE_SIZE, CATALOG_CACHE_TTL, name='catalog')
+
+
+@catalog.on_change
+def _invalidate_catalog_cache(item_type, item_id, action):
+    catalog_cache.invalidate()
+
+
+def cached_json(cache):
+    """Decorator cache response 200 của view theo path + query string"""
+    def decorator(view):
+        @wraps(view)
+        def wrapper(*args, **kwargs):
+            # version() cũng phát hiện thay đổi từ tiến trình khác trước khi đọc cache
+            version = catalog.version()
+            key = (request.path, tuple(sorted(request.args.items(multi=True))))
+            cached = cache.get(key)
+            if cached is not None:
+                body, mimetype, headers = cached
+                return Response(body, status=200, mimetype=mimetype, headers=headers)
+
+            response = make_response(view(*args, **kwargs))
+            # Bỏ qua nếu catalog đổi trong lúc view đang chạy (tránh lưu dữ liệu cũ)
+            if response.status_code == 200 and not response.direct_passthrough \
+                    and catalog.version() == version:
+                headers = [(k, v) for k, v in response.headers.items() if k not in ('Content-Type', 'Content-Length')]
+                cache.set(key, (response.get_data(), response.mimetype, headers))
+            return response
+        return wrapper
+    return decorator
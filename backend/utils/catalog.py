@@ -0,0 +1,93 @@
+import os
+import time
+import logging
+import threading
+
+logger = logging.getLogger(__name__)
+
+# File đánh dấu catalog thay đổi từ tiến trình khác (vd. import_tmdb_movies.py chạy ngoài server)
+CATALOG_STAMP_FILE = os.getenv(
+    "CATALOG_STAMP_FILE",
+    os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), '.catalog_stamp')
+)
+CATALOG_STAMP_POLL = float(os.getenv("CATALOG_STAMP_POLL", 2))  # giây giữa 2 lần stat() file đánh dấu
+
+_lock = threading.Lock()
+_listeners = []
+_version = 0
+_stamp_checked_at = 0.0
+
+
+def on_change(listener):
+    """Đăng ký hàm listener(item_type, item_id, action) được gọi mỗi khi catalog thay đổi.
+
+    action là 'upsert', 'delete' hoặc 'reload' (không rõ thay đổi gì, cần nạp lại toàn bộ).
+    """
+    _listeners.append(listener)
+    return listener
+
+
+def _read_stamp():
+    try:
+        return os.stat(CATALOG_STAMP_FILE).st_mtime_ns
+    except OSError:
+        return None
+
+
+_stamp_mtime = _read_stamp()
+
+
+def touch_stamp():
+    """Đánh dấu catalog đã đổi cho các tiến trình server đang chạy"""
+    with open(CATALOG_STAMP_FILE, 'a'):
+        pass
+    os.utime(CATALOG_STAMP_FILE, None)
+    return _read_stamp()
+
+
+def _dispatch(item_type, item_id, action):
+    for listener in list(_listeners):
+        try:
+            listener(item_type, item_id, action)
+        except Exception as e:
+            logger.error(f"[CATALOG] Listener {getattr(listener, '__name__', listener)} lỗi: {e}")
+
+
+def notify_change(item_type=None, item_id=None, action='reload'):
+    """Gọi sau khi commit thay đổi phim/show: tăng version, báo listener và các tiến trình khác"""
+    global _version, _stamp_mtime
+    with _lock:
+        _version += 1
+        try:
+            _stamp_mtime = touch_stamp()
+        except OSError as e:
+            logger.warning(f"[CATALOG] Không ghi được {CATALOG_STAMP_FILE}: {e}")
+    _dispatch(item_type, item_id, action)
+
+
+def version():
+    """Version hiện tại của catalog; tự phát hiện thay đổi từ tiến trình khác qua file đánh dấu"""
+    global _version, _stamp_mtime, _stamp_checked_at
+    now = time.monotonic()
+    if now - _stamp_checked_at < CATALOG_STAMP_POLL:
+        return _version
+
+    changed = False
+    with _lock:
+        if now - _stamp_checked_at >= CATALOG_STAMP_POLL:
+            _stamp_checked_at = now
+            mtime = _read_stamp()
+            if mtime != _stamp_mtime:
+                _stamp_mtime = mtime
+                _version += 1
+                changed = True
+    if changed:
+        logger.info("[CATALOG] Phát hiện catalog thay đổi từ tiến trình khác, nạp lại")
+        _dispatch(None, None, 'reload')
+    return _version
+
+
+def etag_seed():
+    """Giá trị đại diện cho phiên bản catalog, giống nhau giữa các worker (dựa trên file đánh dấu)"""
+    current = version()
+    return f"s{_stamp_mtime}" if _stamp_mtime is not None else f"v{current}"
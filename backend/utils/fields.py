@@ -0,0 +1,24 @@
+from flask import request
+
+
+def requested_fields(field_map, default, param='fields'):
+    """Đọc ?fields=a,b,c (sparse fieldset); bỏ field không hỗ trợ, luôn giữ 'id'"""
+    raw = request.args.get(param)
+    if not raw:
+        return list(default)
+    fields = [f for f in dict.fromkeys(x.strip() for x in raw.split(',')) if f in field_map]
+    if not fields:
+        return list(default)
+    if 'id' in field_map and 'id' not in fields:
+        fields.insert(0, 'id')
+    return fields
+
+
+def select_columns(field_map, fields, extra=()):
+    """Danh sách cột cần SELECT cho các field được serialize (thay cho SELECT *)"""
+    columns = dict.fromkeys(list(extra) + [c for f in fields for c in field_map[f][0]])
+    return ', '.join(f"`{c}`" for c in columns)
+
+
+def serialize_row(field_map, row, fields):
+    return {f: field_map[f][1](row) for f in fields}
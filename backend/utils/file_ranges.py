@@ -0,0 +1,141 @@
+import os
+import threading
+from collections import OrderedDict
+from flask import Response, request
+
+FD_CACHE_SIZE = int(os.getenv("FD_CACHE_SIZE", 64))   # số file media giữ fd mở
+RANGE_CHUNK_BYTES = 256 * 1024
+
+
+class _Handle:
+    """fd mở chỉ-đọc dùng chung giữa các request; đóng khi đã bị loại khỏi cache và không còn ai đọc"""
+
+    __slots__ = ('fd', 'readers', 'evicted')
+
+    def __init__(self, fd):
+        self.fd = fd
+        self.readers = 0
+        self.evicted = False
+
+
+class FileHandleCache:
+    """LRU các fd đã mở theo (path, mtime, size); đọc bằng os.pread nên nhiều thread dùng chung một fd
+    mà không cần seek. File được thay thế có mtime / size mới -> mở fd mới."""
+
+    def __init__(self, maxsize, name=None):
+        self.maxsize = maxsize
+        self.name = name
+        self._handles = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.opens = 0
+
+    def acquire(self, path, st):
+        key = (path, st.st_mtime_ns, st.st_size)
+        with self._lock:
+            handle = self._handles.get(key)
+            if handle is not None:
+                self._handles.move_to_end(key)
+                handle.readers += 1
+                self.hits += 1
+                return handle
+
+        fd = os.open(path, os.O_RDONLY | getattr(os, 'O_BINARY', 0))
+        with self._lock:
+            handle = self._handles.get(key)
+            if handle is not None:
+                # Thread khác vừa mở cùng file
+                os.close(fd)
+            else:
+                handle = self._handles[key] = _Handle(fd)
+                self.opens += 1
+                while len(self._handles) > self.maxsize:
+                    _, old = self._handles.popitem(last=False)
+                    old.evicted = True
+                    if not old.readers:
+                        os.close(old.fd)
+            self._handles.move_to_end(key)
+            handle.readers += 1
+            return handle
+
+    def release(self, handle):
+        with self._lock:
+            handle.readers -= 1
+            if handle.evicted and not handle.readers:
+                os.close(handle.fd)
+
+    def stats(self):
+        with self._lock:
+            return {'open': len(self._handles), 'maxsize': self.maxsize, 'hits': self.hits, 'opens': self.opens}
+
+
+fd_cache = FileHandleCache(FD_CACHE_SIZE, name='fd')
+
+
+class _RangeBody:
+    """Body WSGI đọc [start, stop) bằng os.pread; trả fd cho cache ở close() (server WSGI luôn gọi,
+    kể cả khi client ngắt giữa chừng hoặc body không được đọc, vd. HEAD)"""
+
+    def __init__(self, handle, start, stop):
+        self.handle = handle
+        self.start = start
+        self.stop = stop
+
+    def __iter__(self):
+        offset = self.start
+        while offset < self.stop and self.handle is not None:
+            chunk = os.pread(self.handle.fd, min(RANGE_CHUNK_BYTES, self.stop - offset), offset)
+            if not chunk:
+                break
+            offset += len(chunk)
+            yield chunk
+
+    def close(self):
+        if self.handle is not None:
+            fd_cache.release(self.handle)
+            self.handle = None
+
+
+def _if_range_matches(etag, mtime):
+    """False nếu có If-Range mà không khớp (file đã đổi -> phải trả toàn bộ thay vì một đoạn)"""
+    if_range = request.if_range
+    if if_range.etag is not None:
+        return if_range.etag == etag
+    if if_range.date is not None:
+        return if_range.date.timestamp() >= int(mtime)
+    return True
+
+
+def send_file_range(path, mimetype):
+    """Trả file (hoặc đoạn byte theo header Range) qua fd dùng chung trong fd_cache.
+
+    Dùng cho file media đóng gói một file / rendition (fMP4 + EXT-X-BYTERANGE): mỗi segment
+    là một Range trên cùng file nên không phải open() lại cho từng segment.
+    """
+    st = os.stat(path)
+    etag = f"{st.st_mtime_ns:x}-{st.st_size:x}"
+
+    if request.if_none_match.contains(etag):
+        response = Response(status=304)
+        response.set_etag(etag)
+        return response
+
+    start, stop, status = 0, st.st_size, 200
+    if request.range and _if_range_matches(etag, st.st_mtime):
+        byte_range = request.range.range_for_length(st.st_size)
+        if byte_range is None:
+            response = Response(status=416)
+            response.headers['Content-Range'] = f"bytes */{st.st_size}"
+            return response
+        start, stop = byte_range
+        status = 206
+
+    handle = fd_cache.acquire(path, st)
+    response = Response(_RangeBody(handle, start, stop), status=status, mimetype=mimetype, direct_passthrough=True)
+    response.content_length = stop - start
+    if status == 206:
+        response.headers['Content-Range'] = f"bytes {start}-{stop - 1}/{st.st_size}"
+    response.headers['Accept-Ranges'] = 'bytes'
+    response.set_etag(etag)
+    response.last_modified = st.st_mtime
+    return response
@@ -0,0 +1,99 @@
+from collections import Counter
+
+
+def trigrams(term):
+    """Trigram ký tự của term có đệm '$' 2 đầu: 'bo' -> {'$bo', 'bo$'}"""
+    padded = f"${term}$"
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+def max_typos(term):
+    """Số lỗi gõ cho phép theo độ dài term: từ rất ngắn không sửa (quá nhiều kết quả rác)"""
+    if len(term) < 3:
+        return 0
+    return 1 if len(term) <= 5 else 2
+
+
+def bounded_levenshtein(a, b, max_distance):
+    """Khoảng cách edit (optimal string alignment: đảo 2 ký tự liền nhau tính 1 lỗi, vd. 'chein' ->
+    'chien') giữa a và b, hoặc None nếu vượt max_distance (dừng sớm theo từng hàng DP)"""
+    if abs(len(a) - len(b)) > max_distance:
+        return None
+    before, previous = None, list(range(len(b) + 1))
+    for i, ca in enumerate(a, 1):
+        current = [i] + [0] * len(b)
+        for j, cb in enumerate(b, 1):
+            current[j] = min(
+                previous[j] + 1,
+                current[j - 1] + 1,
+                previous[j - 1] + (ca != cb)
+            )
+            if i > 1 and j > 1 and ca == b[j - 2] and a[i - 2] == cb:
+                current[j] = min(current[j], before[j - 2] + 1)
+        # Ô (i, j) luôn <= ô (i-1, j-1) + 1 nên hàng vượt ngưỡng thì các hàng sau cũng vượt
+        if min(current) > max_distance:
+            return None
+        before, previous = previous, current
+    return previous[-1] if previous[-1] <= max_distance else None
+
+
+def transpositions(term):
+    """Các biến thể đảo 2 ký tự liền nhau: 'yue' -> {'uye', 'yeu'}"""
+    return {term[:i] + term[i + 1] + term[i] + term[i + 2:] for i in range(len(term) - 1)} - {term}
+
+
+class TrigramIndex:
+    """trigram -> tập term của từ vựng; sinh ứng viên gần đúng rồi kiểm tra bằng edit distance.
+
+    Không tự khoá: dùng bên trong lock của index sở hữu nó.
+    """
+
+    def __init__(self):
+        self._grams = {}
+        self._terms = set()
+
+    def add(self, term):
+        self._terms.add(term)
+        for gram in trigrams(term):
+            self._grams.setdefault(gram, set()).add(term)
+
+    def remove(self, term):
+        self._terms.discard(term)
+        for gram in trigrams(term):
+            terms = self._grams.get(gram)
+            if terms is not None:
+                terms.discard(term)
+                if not terms:
+                    del self._grams[gram]
+
+    def similar(self, term, max_distance=None):
+        """[(term gần đúng, khoảng cách)] trong phạm vi max_distance lỗi, gần nhất trước"""
+        if max_distance is None:
+            max_distance = max_typos(term)
+        if max_distance <= 0:
+            return []
+
+        grams = trigrams(term)
+        shared = Counter()
+        for gram in grams:
+            shared.update(self._grams.get(gram, ()))
+
+        # Mỗi lỗi (kể cả đảo 2 ký tự liền nhau) làm hỏng tối đa 4 trigram -> ứng viên phải chung
+        # ít nhất len(grams) - 4k trigram
+        threshold = max(1, len(grams) - 4 * max_distance)
+        candidates = {candidate for candidate, count in shared.items() if count >= threshold}
+        # Từ 3-4 chữ có thể không còn trigram chung nào sau khi đảo ('yue' / 'yeu') -> tra thẳng biến thể
+        candidates.update(self._terms.intersection(transpositions(term)))
+
+        matches = []
+        for candidate in candidates:
+            if candidate == term:
+                continue
+            distance = bounded_levenshtein(term, candidate, max_distance)
+            if distance is not None:
+                matches.append((candidate, distance))
+        matches.sort(key=lambda item: (item[1], item[0]))
+        return matches
+
+    def __len__(self):
+        return len(self._grams)
@@ -0,0 +1,140 @@
+import bisect
+from datetime import datetime
+from utils import catalog
+from utils.memory_index import MemoryIndex
+
+
+def sort_key(created_at, movie_id):
+    """Khoá tăng dần tương ứng ORDER BY created_at DESC, id DESC (NULL xếp cuối) khi duyệt ngược"""
+    return (created_at is not None, created_at or datetime.min, movie_id)
+
+
+def tag_key(tag):
+    """Tag như collation _ci của movies.tag so sánh: không phân biệt hoa thường, bỏ khoảng trắng cuối"""
+    return tag.rstrip().lower() if tag else tag
+
+
+def _union(bitsets):
+    bits = 0
+    for b in bitsets:
+        bits |= b
+    return bits
+
+
+class GenreIndex(MemoryIndex):
+    """Inverted index thể loại / tag -> tập movie id (bitset là int Python, bit thứ i = phim id i)"""
+
+    name = 'genre'
+
+    def __init__(self):
+        super().__init__()
+        self._reset()
+
+    def _reset(self):
+        self._genres = {}      # genre_id -> bitset
+        self._tags = {}        # tag_key(tag) -> bitset
+        self._movies = {}      # movie_id -> (sort_key, tag, genre_ids)
+        self._order = []       # sort_key tăng dần của mọi phim
+        self._all = 0
+        self._building = True  # đang nạp toàn bộ: append rồi sắp xếp một lần ở _finish
+
+    def _load(self, cursor, keys=None):
+        if keys is None:
+            cursor.execute("SELECT id, created_at, tag FROM movies")
+            movies = cursor.fetchall()
+            cursor.execute("SELECT movie_id, genre_id FROM movie_genres")
+        else:
+            placeholders = ', '.join(['%s'] * len(keys))
+            cursor.execute(f"SELECT id, created_at, tag FROM movies WHERE id IN ({placeholders})", keys)
+            movies = cursor.fetchall()
+            cursor.execute(f"SELECT movie_id, genre_id FROM movie_genres WHERE movie_id IN ({placeholders})", keys)
+
+        genres = {}
+        for row in cursor.fetchall():
+            genres.setdefault(row['movie_id'], []).append(row['genre_id'])
+        return [(m['id'], (m['created_at'], m['tag'], genres.get(m['id'], []))) for m in movies]
+
+    def _add(self, movie_id, data):
+        created_at, tag, genre_ids = data
+        tag = tag_key(tag)
+        key = sort_key(created_at, movie_id)
+        bit = 1 << movie_id
+        self._movies[movie_id] = (key, tag, genre_ids)
+        if self._building:
+            self._order.append(key)
+        else:
+            bisect.insort(self._order, key)
+        self._all |= bit
+        if tag:
+            self._tags[tag] = self._tags.get(tag, 0) | bit
+        for genre_id in genre_ids:
+            self._genres[genre_id] = self._genres.get(genre_id, 0) | bit
+
+    def _remove(self, movie_id):
+        entry = self._movies.pop(movie_id, None)
+        if entry is None:
+            return
+        key, tag, genre_ids = entry
+        mask = ~(1 << movie_id)
+        del self._order[bisect.bisect_left(self._order, key)]
+        self._all &= mask
+        if tag in self._tags:
+            self._tags[tag] &= mask
+        for genre_id in genre_ids:
+            self._genres[genre_id] &= mask
+
+    def _finish(self, rebuild):
+        if self._building:
+            self._order.sort()
+            self._building = False
+
+    # --- truy vấn ---
+
+    def query(self, genres=(), match_all=True, tags=()):
+        """Bitset các phim khớp: thể loại AND (match_all) / OR, tags luôn OR"""
+        self.sync()
+        with self._lock:
+            bits = self._all
+            if genres:
+                sets = [self._genres.get(genre_id, 0) for genre_id in genres]
+                if match_all:
+                    for genre_bits in sets:
+                        bits &= genre_bits
+                else:
+                    bits &= _union(sets)
+            if tags:
+                bits &= _union(self._tags.get(tag_key(tag), 0) for tag in tags)
+            return bits
+
+    def page(self, bits, limit, after=None):
+        """Tối đa limit vị trí (created_at, movie id) thuộc bitset theo thứ tự created_at DESC, id DESC,
+        sau cursor (created_at, id)"""
+        with self._lock:
+            start = len(self._order) if after is None else bisect.bisect_left(self._order, sort_key(*after))
+            positions = []
+            for i in range(start - 1, -1, -1):
+                has_created_at, created_at, movie_id = self._order[i]
+                if bits >> movie_id & 1:
+                    positions.append((created_at if has_created_at else None, movie_id))
+                    if len(positions) == limit:
+                        break
+            return positions
+
+    def stats(self):
+        with self._lock:
+            return dict({
+                'movies': len(self._movies),
+                'genres': {genre_id: bin(bits).count('1') for genre_id, bits in sorted(self._genres.items())},
+                'tags': {tag: bin(bits).count('1') for tag, bits in sorted(self._tags.items())}
+            }, **self.sync_stats())
+
+
+genre_index = GenreIndex()
+
+
+@catalog.on_change
+def _update_genre_index(item_type, item_id, action):
+    if action == 'reload' or item_id is None:
+        genre_index.mark_stale()
+    elif item_type == 'movie':
+        genre_index.mark_dirty(item_id)
@@ -0,0 +1,250 @@
+import os
+import re
+import json
+import subprocess
+from xml.sax.saxutils import escape
+
+FFMPEG_PATH = "ffmpeg"    # Đảm bảo ffmpeg / ffprobe đã được thêm vào PATH
+FFPROBE_PATH = "ffprobe"
+
+# Các mức chất lượng có thể dùng: tên -> (chiều cao, video kbps, audio kbps, level H.264 Main)
+RENDITIONS = {
+    '240p': (240, 400, 64, '3.0'),
+    '360p': (360, 800, 96, '3.0'),
+    '480p': (480, 1400, 128, '3.0'),
+    '540p': (540, 2000, 128, '3.1'),
+    '720p': (720, 3000, 128, '3.1'),
+    '1080p': (1080, 5000, 192, '4.0'),
+    '1440p': (1440, 9000, 192, '5.0'),
+    '2160p': (2160, 16000, 192, '5.1'),
+}
+# Thang bitrate mặc định khi ingest, vd. HLS_LADDER=360p,720p
+HLS_LADDER = [name.strip() for name in os.getenv("HLS_LADDER", "360p,540p,720p,1080p").split(',') if name.strip()]
+HLS_SEGMENT_SECONDS = int(os.getenv("HLS_SEGMENT_SECONDS", 6))
+HLS_PRESET = os.getenv("HLS_PRESET", "veryfast")
+HLS_TIMEOUT = int(os.getenv("HLS_TIMEOUT", 3 * 3600))   # giây cho toàn bộ thang
+# ts   -> mỗi segment một file .ts
+# fmp4 -> mỗi rendition một file fMP4, playlist dùng EXT-X-BYTERANGE, kèm DASH MPD trỏ tới cùng file
+HLS_PACKAGING = os.getenv("HLS_PACKAGING", "ts").lower()
+
+_MAXRATE_FACTOR = 1.07   # đỉnh bitrate cho phép so với trung bình (VBV)
+_BUFSIZE_FACTOR = 1.5
+_CONTAINER_OVERHEAD = 1.1   # header MPEG-TS / fMP4 cộng vào BANDWIDTH khai báo
+_AAC_CODEC = 'mp4a.40.2'
+_H264_MAIN_LEVELS = {'3.0': 0x1e, '3.1': 0x1f, '4.0': 0x28, '4.1': 0x29, '5.0': 0x32, '5.1': 0x33}
+
+
+def probe_source(path):
+    """{'width', 'height', 'has_audio'} của video nguồn, None nếu ffprobe không đọc được"""
+    try:
+        result = subprocess.run([
+            FFPROBE_PATH, "-v", "error",
+            "-show_entries", "stream=codec_type,width,height",
+            "-of", "json", path
+        ], capture_output=True, text=True, timeout=60)
+        if result.returncode != 0:
+            return None
+        streams = json.loads(result.stdout).get('streams', [])
+    except (OSError, ValueError, subprocess.TimeoutExpired):
+        return None
+    video = next((s for s in streams if s.get('codec_type') == 'video' and s.get('height')), None)
+    if video is None:
+        return None
+    return {
+        'width': video['width'],
+        'height': video['height'],
+        'has_audio': any(s.get('codec_type') == 'audio' for s in streams)
+    }
+
+
+def _even(value):
+    return max(2, int(round(value / 2)) * 2)
+
+
+def plan_ladder(source, ladder=None):
+    """Các rendition sẽ encode, thấp -> cao.
+
+    Mỗi mức là khung 16:9 (vd. 720p = 1280x720); video được thu nhỏ giữ tỉ lệ cho vừa khung,
+    nên phim 2.39:1 ở 1080p là 1920x804. Bỏ các mức phải phóng to nguồn nhưng luôn giữ mức thấp nhất.
+    """
+    names = [name for name in (ladder or HLS_LADDER) if name in RENDITIONS]
+    if not names:
+        raise ValueError(f"HLS_LADDER không có mức hợp lệ (chọn trong {', '.join(RENDITIONS)})")
+    names.sort(key=lambda name: RENDITIONS[name][0])
+
+    plan = []
+    for name in names:
+        height, video_kbps, audio_kbps, level = RENDITIONS[name]
+        box_width = _even(height * 16 / 9)
+        if source:
+            scale = min(box_width / source['width'], height / source['height'])
+            if scale > 1 and plan:
+                break
+            width, height = _even(source['width'] * scale), _even(source['height'] * scale)
+        else:
+            # Không probe được -> encode đủ thang theo khung 16:9
+            width = box_width
+        plan.append({
+            'name': name,
+            'width': width,
+            'height': height,
+            'video_kbps': video_kbps,
+            'audio_kbps': audio_kbps if not source or source['has_audio'] else 0,
+            'level': level
+        })
+    return plan
+
+
+def codecs(rendition):
+    """Chuỗi CODECS (RFC 6381) của rendition: H.264 Main + AAC-LC"""
+    video = f"avc1.4d40{_H264_MAIN_LEVELS[rendition['level']]:02x}"
+    return f"{video},{_AAC_CODEC}" if rendition['audio_kbps'] else video
+
+
+def variant_playlist_name(base_name, rendition):
+    return f"{base_name}_{rendition['name']}.m3u8"
+
+
+def media_file_name(base_name, rendition):
+    """File fMP4 duy nhất của rendition (HLS_PACKAGING=fmp4)"""
+    return f"{base_name}_{rendition['name']}.mp4"
+
+
+def build_ffmpeg_command(input_file_path, output_dir, base_name, plan, packaging=None):
+    """Một lệnh ffmpeg decode nguồn một lần và encode mọi rendition.
+
+    Keyframe được ép tại cùng mốc thời gian (mỗi HLS_SEGMENT_SECONDS) và tắt scenecut, nên
+    ranh giới segment của các rendition trùng nhau -> player chuyển mức không bị giật.
+    """
+    split = f"[0:v]split={len(plan)}" + ''.join(f"[v{i}]" for i in range(len(plan)))
+    scales = [f"[v{i}]scale={r['width']}:{r['height']}[v{i}out]" for i, r in enumerate(plan)]
+    cmd = [FFMPEG_PATH, "-y", "-i", input_file_path, "-filter_complex", ';'.join([split] + scales)]
+    packaging = packaging or HLS_PACKAGING
+
+    for i, r in enumerate(plan):
+        kbps = r['video_kbps']
+        cmd += ["-map", f"[v{i}out]"]
+        if r['audio_kbps']:
+            # '?': nguồn không probe được (plan giữ audio) mà thực ra không có tiếng -> bỏ qua thay vì lỗi
+            cmd += ["-map", "0:a:0?", "-c:a", "aac", "-b:a", f"{r['audio_kbps']}k", "-ac", "2"]
+        cmd += [
+            "-c:v", "libx264",
+            "-preset", HLS_PRESET,
+            "-profile:v", "main",
+            "-level", r['level'],
+            "-pix_fmt", "yuv420p",
+            "-b:v", f"{kbps}k",
+            "-maxrate", f"{int(kbps * _MAXRATE_FACTOR)}k",
+            "-bufsize", f"{int(kbps * _BUFSIZE_FACTOR)}k",
+            "-sc_threshold", "0",
+            "-force_key_frames", f"expr:gte(t,n_forced*{HLS_SEGMENT_SECONDS})",
+            "-f", "hls",
+            "-hls_time", str(HLS_SEGMENT_SECONDS),
+            "-hls_playlist_type", "vod",
+            "-hls_list_size", "0",
+            "-start_number", "0",
+        ]
+        if packaging == 'fmp4':
+            # Init section + mọi fragment nằm trong một file; EXT-X-MAP / EXT-X-BYTERANGE chỉ vào đoạn byte
+            cmd += [
+                "-hls_segment_type", "fmp4",
+                "-hls_flags", "single_file",
+                "-hls_segment_filename", os.path.join(output_dir, media_file_name(base_name, r))
+            ]
+        else:
+            cmd += ["-hls_segment_filename", os.path.join(output_dir, f"{base_name}_{r['name']}_%03d.ts")]
+        cmd.append(os.path.join(output_dir, variant_playlist_name(base_name, r)))
+    return cmd
+
+
+def _bandwidth(rendition):
+    """(đỉnh, trung bình) bit/s khai báo cho client, gồm cả overhead container"""
+    average = (rendition['video_kbps'] + rendition['audio_kbps']) * 1000
+    peak = (int(rendition['video_kbps'] * _MAXRATE_FACTOR) + rendition['audio_kbps']) * 1000
+    return int(peak * _CONTAINER_OVERHEAD), int(average * _CONTAINER_OVERHEAD)
+
+
+def write_master_playlist(path, base_name, plan, packaging=None):
+    """Master playlist liệt kê các rendition kèm BANDWIDTH / RESOLUTION / CODECS"""
+    # EXT-X-MAP trong media playlist fMP4 cần version 6 trở lên
+    version = 7 if (packaging or HLS_PACKAGING) == 'fmp4' else 3
+    lines = ["#EXTM3U", f"#EXT-X-VERSION:{version}", "#EXT-X-INDEPENDENT-SEGMENTS"]
+    for r in plan:
+        peak, average = _bandwidth(r)
+        lines.append(
+            f"#EXT-X-STREAM-INF:BANDWIDTH={peak},AVERAGE-BANDWIDTH={average},"
+            f"RESOLUTION={r['width']}x{r['height']},CODECS=\"{codecs(r)}\""
+        )
+        lines.append(variant_playlist_name(base_name, r))
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write("\n".join(lines) + "\n")
+    return path
+
+
+_BYTERANGE = re.compile(r'(\d+)(?:@(\d+))?')
+
+
+def parse_byterange_playlist(path):
+    """Đọc media playlist fMP4 single-file -> (file media, (init start, end), [(thời lượng giây, start, end)...])
+
+    end là byte cuối (bao gồm), như cú pháp range của DASH. EXT-X-BYTERANGE thiếu @offset
+    thì nối tiếp đoạn trước.
+    """
+    media, init, segments = None, None, []
+    duration, next_offset = None, 0
+    with open(path, 'r', encoding='utf-8') as f:
+        for line in f:
+            line = line.strip()
+            if line.startswith('#EXT-X-MAP:'):
+                media = re.search(r'URI="([^"]+)"', line).group(1)
+                length, offset = _BYTERANGE.match(re.search(r'BYTERANGE="([^"]+)"', line).group(1)).groups()
+                init = (int(offset or 0), int(offset or 0) + int(length) - 1)
+            elif line.startswith('#EXTINF:'):
+                duration = float(line[len('#EXTINF:'):].split(',')[0])
+            elif line.startswith('#EXT-X-BYTERANGE:'):
+                length, offset = _BYTERANGE.match(line[len('#EXT-X-BYTERANGE:'):]).groups()
+                start = int(offset) if offset is not None else next_offset
+                next_offset = start + int(length)
+                segments.append((duration, start, next_offset - 1))
+            elif line and not line.startswith('#'):
+                media = media or line
+    return media, init, segments
+
+
+def write_dash_manifest(path, output_dir, base_name, plan):
+    """DASH MPD (SegmentList + mediaRange) dùng chung các file fMP4 với HLS, không encode / đóng gói lại"""
+    representations = []
+    total_duration = 0.0
+    for r in plan:
+        media, init, segments = parse_byterange_playlist(os.path.join(output_dir, variant_playlist_name(base_name, r)))
+        total_duration = max(total_duration, sum(duration for duration, _, _ in segments))
+        peak, _ = _bandwidth(r)
+        timeline = ''.join(f'<S d="{round(duration * 1000)}"/>' for duration, _, _ in segments)
+        urls = '\n'.join(f'          <SegmentURL mediaRange="{start}-{end}"/>' for _, start, end in segments)
+        representations.append(
+            f'      <Representation id="{r["name"]}" bandwidth="{peak}" width="{r["width"]}" height="{r["height"]}" '
+            f'codecs="{codecs(r)}">\n'
+            f'        <BaseURL>{escape(media)}</BaseURL>\n'
+            f'        <SegmentList timescale="1000">\n'
+            f'          <Initialization range="{init[0]}-{init[1]}"/>\n'
+            f'          <SegmentTimeline>{timeline}</SegmentTimeline>\n'
+            f'{urls}\n'
+            f'        </SegmentList>\n'
+            f'      </Representation>'
+        )
+
+    mpd = '\n'.join([
+        '<?xml version="1.0" encoding="utf-8"?>',
+        '<MPD xmlns="urn:mpeg:dash:schema:mpd:2011" profiles="urn:mpeg:dash:profile:isoff-main:2011" type="static"',
+        f'     mediaPresentationDuration="PT{total_duration:.3f}S" minBufferTime="PT{HLS_SEGMENT_SECONDS}S">',
+        '  <Period id="0" start="PT0S">',
+        f'    <AdaptationSet id="0" mimeType="video/mp4" segmentAlignment="true" startWithSAP="1">',
+        *representations,
+        '    </AdaptationSet>',
+        '  </Period>',
+        '</MPD>',
+        ''
+    ])
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write(mpd)
+    return path
@@ -0,0 +1,27 @@
+import hashlib
+from functools import wraps
+from flask import Response, make_response, request
+from utils import catalog
+
+# Trình duyệt / proxy được lưu nhưng phải revalidate (If-None-Match) trước mỗi lần dùng lại
+CATALOG_CACHE_CONTROL = "public, max-age=0, must-revalidate"
+
+
+def catalog_etag(view):
+    """Gắn ETag theo phiên bản catalog; trả 304 khi If-None-Match khớp mà không gọi view (không query DB)"""
+    @wraps(view)
+    def wrapper(*args, **kwargs):
+        digest = hashlib.sha1(f"{catalog.etag_seed()}|{request.full_path}".encode('utf-8')).hexdigest()
+        etag = digest[:32]
+
+        if request.if_none_match.contains_weak(etag):
+            response = Response(status=304)
+        else:
+            response = make_response(view(*args, **kwargs))
+            if response.status_code != 200:
+                return response
+
+        response.set_etag(etag)
+        response.headers['Cache-Control'] = CATALOG_CACHE_CONTROL
+        return response
+    return wrapper
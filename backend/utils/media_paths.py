@@ -0,0 +1,84 @@
+import os
+from db import get_db_connection
+from utils import catalog
+from utils.cache import TTLCache
+
+# Đường dẫn lưu video
+MOVIE_VIDEO_PATH = os.getenv("MOVIE_VIDEO_PATH", "C:/Users/PC/Desktop/netflix-project/video/movie/")
+SHOW_VIDEO_PATH = os.getenv("SHOW_VIDEO_PATH", "C:/Users/PC/Desktop/netflix-project/video/show/")
+
+MEDIA_PATH_CACHE_SIZE = int(os.getenv("MEDIA_PATH_CACHE_SIZE", 4096))   # số title tối đa
+MEDIA_PATH_CACHE_TTL = float(os.getenv("MEDIA_PATH_CACHE_TTL", 3600))   # giây, phòng khi DB bị sửa tay
+
+_NOT_FOUND = ''   # title không có video: cũng cache để request segment rác không chạm DB
+
+# ('movie', movie_id) | ('episode', show_id, episode_id) -> đường dẫn playlist m3u8 trên đĩa
+media_paths = TTLCache(MEDIA_PATH_CACHE_SIZE, MEDIA_PATH_CACHE_TTL, name='media_paths')
+
+
+@catalog.on_change
+def _invalidate_media_paths(item_type, item_id, action):
+    if item_type == 'movie' and item_id is not None:
+        media_paths.invalidate(('movie', item_id))
+    else:
+        media_paths.invalidate()
+
+
+def movie_playlist_path(video_file):
+    """movies.video_file ("movie_name/movie_name.m3u8", tương đối) -> đường dẫn trên đĩa"""
+    return os.path.join(MOVIE_VIDEO_PATH, video_file)
+
+
+def episode_playlist_path(filepath):
+    """show_episodes.filepath (/video/show/<show>/<ep>/<ep>.m3u8) -> đường dẫn trên đĩa"""
+    return os.path.join(SHOW_VIDEO_PATH, filepath.replace('/video/show/', ''))
+
+
+def _query_playlist_path(key):
+    conn = get_db_connection()
+    try:
+        with conn.cursor() as cursor:
+            if key[0] == 'movie':
+                cursor.execute("SELECT video_file FROM movies WHERE id = %s", (key[1],))
+                row = cursor.fetchone()
+                if not row or not row.get('video_file'):
+                    return _NOT_FOUND
+                return movie_playlist_path(row['video_file'])
+
+            cursor.execute("""
+                SELECT filepath
+                FROM show_episodes
+                WHERE show_id = %s AND id = %s
+            """, (key[1], key[2]))
+            row = cursor.fetchone()
+            if not row or not row.get('filepath'):
+                return _NOT_FOUND
+            return episode_playlist_path(row['filepath'])
+    finally:
+        conn.close()
+
+
+def playlist_path(key):
+    """Đường dẫn playlist của title (None nếu không có video); chỉ query DB lần đầu hoặc sau khi catalog đổi"""
+    # version() phát hiện thay đổi từ tiến trình khác (file đánh dấu) trước khi đọc cache
+    version = catalog.version()
+    path = media_paths.get(key)
+    if path is None:
+        path = _query_playlist_path(key)
+        # Bỏ qua nếu catalog đổi trong lúc đang query (tránh lưu đường dẫn cũ)
+        if catalog.version() == version:
+            media_paths.set(key, path)
+    return path or None
+
+
+def segment_path(key, segment):
+    """Đường dẫn file segment trong thư mục playlist của title, None nếu title không có video
+    hoặc segment trỏ ra ngoài thư mục đó"""
+    playlist = playlist_path(key)
+    if playlist is None:
+        return None
+    video_dir = os.path.dirname(playlist)
+    path = os.path.normpath(os.path.join(video_dir, segment))
+    if not path.startswith(os.path.normpath(video_dir) + os.sep):
+        return None
+    return path
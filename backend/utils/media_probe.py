@@ -0,0 +1,134 @@
+import os
+import re
+import json
+import subprocess
+from utils.hls_ladder import FFPROBE_PATH
+
+# Các cột metadata media (movies / show_episodes), ghi khi ingest hoặc bằng backfill_media_metadata.py
+MEDIA_COLUMNS = (
+    'duration', 'quality', 'file_size', 'width', 'height', 'video_codec', 'audio_codec',
+    'bitrate', 'segment_count', 'renditions', 'packaging'
+)
+_TABLES = {'movie': 'movies', 'episode': 'show_episodes'}
+
+_ATTRIBUTE = re.compile(r'([A-Z0-9-]+)=("[^"]*"|[^,]*)')
+_TAG_URI = re.compile(r'URI="([^"]+)"')
+
+
+def _parse_playlist(path):
+    """m3u8 -> (variants [(uri, thuộc tính STREAM-INF)], segments [(thời lượng, uri)], uri init EXT-X-MAP)"""
+    variants, segments, init = [], [], None
+    attributes, duration = None, None
+    with open(path, 'r', encoding='utf-8') as f:
+        for line in f:
+            line = line.strip()
+            if line.startswith('#EXT-X-STREAM-INF:'):
+                attributes = {k: v.strip('"') for k, v in _ATTRIBUTE.findall(line.split(':', 1)[1])}
+            elif line.startswith('#EXTINF:'):
+                duration = float(line[len('#EXTINF:'):].split(',')[0])
+            elif line.startswith('#EXT-X-MAP:'):
+                init = _TAG_URI.search(line).group(1)
+            elif line and not line.startswith('#'):
+                if attributes is not None:
+                    variants.append((line, attributes))
+                    attributes = None
+                else:
+                    segments.append((duration or 0.0, line))
+                    duration = None
+    return variants, segments, init
+
+
+def _ffprobe_streams(path):
+    """Stream video / audio đầu tiên của file theo ffprobe, ({}, {}) nếu không đọc được"""
+    try:
+        result = subprocess.run([
+            FFPROBE_PATH, "-v", "error",
+            "-show_entries", "stream=codec_type,codec_name,profile,width,height",
+            "-of", "json", path
+        ], capture_output=True, text=True, timeout=60)
+        streams = json.loads(result.stdout).get('streams', []) if result.returncode == 0 else []
+    except (OSError, ValueError, subprocess.TimeoutExpired):
+        streams = []
+    video = next((s for s in streams if s.get('codec_type') == 'video'), {})
+    audio = next((s for s in streams if s.get('codec_type') == 'audio'), {})
+    return video, audio
+
+
+def _codec_name(stream):
+    """{'codec_name': 'h264', 'profile': 'Main'} -> 'h264 (Main)'"""
+    if not stream.get('codec_name'):
+        return None
+    profile = stream.get('profile')
+    return f"{stream['codec_name']} ({profile})" if profile and profile != 'unknown' else stream['codec_name']
+
+
+def _file_sizes(directory, uris):
+    total = 0
+    for uri in set(uris):
+        try:
+            total += os.path.getsize(os.path.join(directory, uri))
+        except OSError:
+            pass
+    return total
+
+
+def probe_media(playlist_path):
+    """Metadata của một title HLS từ playlist (master hoặc media) + một lần ffprobe.
+
+    Thời lượng / số segment / dung lượng lấy từ playlist và kích thước file (chính xác, không cần
+    decode); ffprobe chỉ chạy trên file media đầu tiên của rendition cao nhất để lấy độ phân giải
+    và codec. None nếu không có playlist.
+    """
+    if not os.path.isfile(playlist_path):
+        return None
+    directory = os.path.dirname(playlist_path)
+    variants, segments, init = _parse_playlist(playlist_path)
+
+    # Master playlist -> đọc từng rendition; rendition cao nhất (BANDWIDTH lớn nhất) đại diện cho title
+    top_attributes = {}
+    total_bytes = 0
+    if variants:
+        top_uri, top_attributes = max(variants, key=lambda v: int(v[1].get('BANDWIDTH', 0)))
+        for uri, _ in variants:
+            variant_path = os.path.join(directory, uri)
+            if not os.path.isfile(variant_path):
+                continue
+            _, variant_segments, variant_init = _parse_playlist(variant_path)
+            variant_dir = os.path.dirname(variant_path)
+            total_bytes += _file_sizes(variant_dir, [u for _, u in variant_segments] + ([variant_init] if variant_init else []))
+            if uri == top_uri:
+                segments, init, directory = variant_segments, variant_init, variant_dir
+    media_uris = [uri for _, uri in segments] + ([init] if init else [])
+    top_bytes = _file_sizes(directory, media_uris)
+    total_bytes = total_bytes or top_bytes
+
+    duration = sum(d for d, _ in segments)
+    # File init (fMP4) chứa thông tin codec; TS thì segment đầu tiên là đủ
+    probe_uri = init or (segments[0][1] if segments else None)
+    video, audio = _ffprobe_streams(os.path.join(directory, probe_uri)) if probe_uri else ({}, {})
+
+    width, height = video.get('width'), video.get('height')
+    if not height and 'RESOLUTION' in top_attributes:
+        width, height = (int(n) for n in top_attributes['RESOLUTION'].split('x'))
+    return {
+        'duration': round(duration) if segments else None,
+        'quality': f"{height}p" if height else None,
+        'file_size': total_bytes or None,
+        'width': width,
+        'height': height,
+        'video_codec': _codec_name(video),
+        'audio_codec': _codec_name(audio),
+        'bitrate': int(top_bytes * 8 / duration) if duration else None,
+        'segment_count': len(segments),
+        'renditions': len(variants) or 1,
+        'packaging': 'fmp4' if init else 'ts'
+    }
+
+
+def save_media_metadata(cursor, item_type, item_id, metadata):
+    """Ghi metadata (kết quả probe_media) vào movies / show_episodes"""
+    assignments = ', '.join(f"{column} = %s" for column in MEDIA_COLUMNS)
+    cursor.execute(
+        f"UPDATE {_TABLES[item_type]} SET {assignments}, media_probed_at = NOW() WHERE id = %s",
+        [metadata[column] for column in MEDIA_COLUMNS] + [item_id]
+    )
@@ -0,0 +1,109 @@
+import time
+import logging
+import threading
+from db import get_db_connection
+
+logger = logging.getLogger(__name__)
+
+
+class MemoryIndex:
+    """Khung chung cho index trong bộ nhớ nạp lười từ DB.
+
+    Lần dùng đầu (hoặc sau mark_stale) nạp toàn bộ; mark_dirty(key) chỉ đánh dấu phần tử
+    cần đọc lại, việc truy vấn DB dồn vào lần sync() kế tiếp. Lớp con cài đặt
+    _load / _reset / _add / _remove.
+    """
+
+    name = 'index'
+
+    def __init__(self):
+        self._lock = threading.RLock()
+        self._stale = True
+        self._dirty = set()
+        self.rebuilds = 0
+        self.refreshes = 0
+        self.last_rebuild_ms = None
+
+    # --- hook cho lớp con ---
+
+    def _load(self, cursor, keys=None):
+        """Đọc các phần tử (toàn bộ nếu keys là None) -> list[(key, data)]"""
+        raise NotImplementedError
+
+    def _reset(self):
+        raise NotImplementedError
+
+    def _add(self, key, data):
+        raise NotImplementedError
+
+    def _remove(self, key):
+        raise NotImplementedError
+
+    def _finish(self, rebuild):
+        """Gọi sau khi đã _add xong một lượt nạp (vd. sắp xếp lại một lần thay vì mỗi lần _add)"""
+
+    # --- cập nhật ---
+
+    def mark_stale(self):
+        with self._lock:
+            self._stale = True
+
+    def mark_dirty(self, key):
+        with self._lock:
+            self._dirty.add(key)
+
+    def sync(self):
+        """Đồng bộ với DB nếu index cũ (nạp toàn bộ) hoặc có phần tử bị đánh dấu (nạp riêng các phần tử đó)"""
+        if not self._stale and not self._dirty:
+            return
+        with self._lock:
+            if not self._stale and not self._dirty:
+                return
+            rebuild = self._stale
+            dirty = list(self._dirty)
+            self._stale = False
+            self._dirty.clear()
+
+            started = time.perf_counter()
+            conn = get_db_connection()
+            try:
+                with conn.cursor() as cursor:
+                    items = self._load(cursor, None if rebuild else dirty)
+            except Exception:
+                # Lần sau thử lại
+                self._stale = self._stale or rebuild
+                self._dirty.update(dirty)
+                raise
+            finally:
+                conn.close()
+
+            if rebuild:
+                self._reset()
+            else:
+                for key in dirty:
+                    self._remove(key)
+            for key, data in items:
+                self._add(key, data)
+            self._finish(rebuild)
+
+            if rebuild:
+                self.rebuilds += 1
+                self.last_rebuild_ms = round((time.perf_counter() - started) * 1000, 2)
+                logger.info(f"[{self.name.upper()} INDEX] Đã nạp {len(items)} phần tử trong {self.last_rebuild_ms}ms")
+            else:
+                self.refreshes += 1
+
+    def rebuild(self):
+        """Nạp lại toàn bộ ngay lập tức"""
+        with self._lock:
+            self._stale = True
+            self.sync()
+
+    def sync_stats(self):
+        return {
+            'stale': self._stale,
+            'dirty': len(self._dirty),
+            'rebuilds': self.rebuilds,
+            'refreshes': self.refreshes,
+            'last_rebuild_ms': self.last_rebuild_ms
+        }
@@ -0,0 +1,166 @@
+import ast
+import json
+
+
+def parse_genre_ids(value):
+    """Chuẩn hoá genre_ids về list[int]; nhận list, JSON '[28, 12]', str(list) cũ hoặc '28, 12' từ form admin"""
+    if value is None:
+        return []
+    if isinstance(value, str):
+        value = value.strip()
+        if not value:
+            return []
+        try:
+            value = json.loads(value)
+        except ValueError:
+            try:
+                value = ast.literal_eval(value)
+            except (ValueError, SyntaxError):
+                value = value.strip('[]').split(',')
+    if isinstance(value, (int, str)):
+        value = [value]
+
+    genre_ids = []
+    for item in value:
+        try:
+            genre_id = int(str(item).strip())
+        except ValueError:
+            continue
+        if genre_id not in genre_ids:
+            genre_ids.append(genre_id)
+    return genre_ids
+
+
+# Độ dài cột people.name / movie_cast.character_name (VARCHAR(255)): cắt trước khi upsert và tra cứu,
+# nếu không DB cắt tên khi ghi còn SELECT theo tên đầy đủ -> không tìm thấy, mất diễn viên
+NAME_MAX_LENGTH = 255
+
+
+def _text(value, max_length=None):
+    """Giá trị bất kỳ -> chuỗi đã strip (cắt tối đa max_length ký tự), None nếu rỗng"""
+    if value is None:
+        return None
+    text = str(value).strip()
+    if max_length:
+        text = text[:max_length].rstrip()
+    return text or None
+
+
+def parse_cast(value):
+    """Chuẩn hoá cast về list[dict(name, character, profile_path)]; bỏ phần tử không phải dict hoặc không có tên"""
+    if isinstance(value, (str, bytes)):
+        try:
+            value = json.loads(value) if value else []
+        except ValueError:
+            value = []
+    if not isinstance(value, (list, tuple)):
+        return []
+    cast = []
+    for member in value:
+        if not isinstance(member, dict):
+            continue
+        name = _text(member.get('name'), NAME_MAX_LENGTH)
+        if not name:
+            continue
+        cast.append({
+            'name': name,
+            'character': _text(member.get('character'), NAME_MAX_LENGTH),
+            'profile_path': _text(member.get('profile_path'))
+        })
+    return cast
+
+
+def save_movie_genres(cursor, movie_id, genre_ids):
+    """Ghi lại toàn bộ thể loại của một phim vào movie_genres"""
+    genre_ids = parse_genre_ids(genre_ids)
+    cursor.execute("DELETE FROM movie_genres WHERE movie_id = %s", (movie_id,))
+    if genre_ids:
+        cursor.executemany(
+            "INSERT INTO movie_genres (movie_id, genre_id, genre_order) VALUES (%s, %s, %s)",
+            [(movie_id, genre_id, order) for order, genre_id in enumerate(genre_ids)]
+        )
+    return genre_ids
+
+
+def _person_ids(cursor, cast):
+    """Upsert people theo tên, trả về {name: person_id}"""
+    names = list(dict.fromkeys(member['name'] for member in cast))
+    profiles = {}
+    for member in cast:
+        profiles.setdefault(member['name'], member['profile_path'])
+
+    cursor.executemany("""
+        INSERT INTO people (name, profile_path) VALUES (%s, %s)
+        ON DUPLICATE KEY UPDATE profile_path = COALESCE(VALUES(profile_path), profile_path)
+    """, [(name, profiles[name]) for name in names])
+
+    placeholders = ', '.join(['%s'] * len(names))
+    cursor.execute(f"SELECT id, name FROM people WHERE name IN ({placeholders})", names)
+    return {row['name']: row['id'] for row in cursor.fetchall()}
+
+
+def save_movie_cast(cursor, movie_id, cast):
+    """Ghi lại toàn bộ diễn viên của một phim (people + movie_cast), giữ thứ tự billing"""
+    cast = parse_cast(cast)
+    cursor.execute("DELETE FROM movie_cast WHERE movie_id = %s", (movie_id,))
+    if not cast:
+        return cast
+
+    person_ids = _person_ids(cursor, cast)
+    rows, seen = [], set()
+    for member in cast:
+        person_id = person_ids.get(member['name'])
+        # Một diễn viên đóng nhiều vai trong cùng phim -> chỉ giữ lần xuất hiện đầu
+        if person_id is None or person_id in seen:
+            continue
+        seen.add(person_id)
+        rows.append((movie_id, person_id, member['character'], len(rows)))
+
+    cursor.executemany(
+        "INSERT INTO movie_cast (movie_id, person_id, character_name, cast_order) VALUES (%s, %s, %s, %s)",
+        rows
+    )
+    return cast
+
+
+def save_movie_relations(cursor, movie_id, genre_ids, cast):
+    save_movie_genres(cursor, movie_id, genre_ids)
+    save_movie_cast(cursor, movie_id, cast)
+
+
+def load_movie_cast(cursor, movie_ids):
+    """{movie_id: [cast...]} cho nhiều phim trong một truy vấn"""
+    result = {movie_id: [] for movie_id in movie_ids}
+    if not movie_ids:
+        return result
+    placeholders = ', '.join(['%s'] * len(movie_ids))
+    cursor.execute(f"""
+        SELECT mc.movie_id, p.name, mc.character_name, p.profile_path
+        FROM movie_cast mc
+        JOIN people p ON p.id = mc.person_id
+        WHERE mc.movie_id IN ({placeholders})
+        ORDER BY mc.movie_id, mc.cast_order
+    """, list(movie_ids))
+    for row in cursor.fetchall():
+        result[row['movie_id']].append({
+            'name': row['name'],
+            'character': row['character_name'],
+            'profile_path': row['profile_path']
+        })
+    return result
+
+
+def load_movie_genres(cursor, movie_ids):
+    """{movie_id: [genre_id...]} cho nhiều phim trong một truy vấn"""
+    result = {movie_id: [] for movie_id in movie_ids}
+    if not movie_ids:
+        return result
+    placeholders = ', '.join(['%s'] * len(movie_ids))
+    cursor.execute(f"""
+        SELECT movie_id, genre_id FROM movie_genres
+        WHERE movie_id IN ({placeholders})
+        ORDER BY movie_id, genre_order
+    """, list(movie_ids))
+    for row in cursor.fetchall():
+        result[row['movie_id']].append(row['genre_id'])
+    return result
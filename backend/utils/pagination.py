@@ -0,0 +1,97 @@
+import os
+import base64
+from datetime import datetime
+from flask import jsonify, request
+
+CATALOG_PAGE_SIZE = int(os.getenv("CATALOG_PAGE_SIZE", 50))           # số phần tử mặc định mỗi trang
+CATALOG_MAX_PAGE_SIZE = int(os.getenv("CATALOG_MAX_PAGE_SIZE", 100))   # trần cho ?limit=
+
+_CURSOR_TIME_FORMAT = '%Y-%m-%dT%H:%M:%S.%f'
+_FIRST_PAGE_TIME = datetime(9999, 12, 31)
+_MIN_TIME = datetime(1000, 1, 1)
+_MAX_ID = 2 ** 63 - 1
+
+
+def page_limit(raw):
+    """Đọc ?limit=, giới hạn trong [1, CATALOG_MAX_PAGE_SIZE]"""
+    try:
+        limit = int(raw) if raw else CATALOG_PAGE_SIZE
+    except ValueError:
+        limit = CATALOG_PAGE_SIZE
+    return max(1, min(limit, CATALOG_MAX_PAGE_SIZE))
+
+
+def encode_cursor(created_at, row_id):
+    """Cursor mờ (opaque) trỏ tới dòng cuối cùng của trang hiện tại"""
+    stamp = created_at.strftime(_CURSOR_TIME_FORMAT) if created_at else ''
+    return base64.urlsafe_b64encode(f"{stamp}|{row_id}".encode('ascii')).decode('ascii').rstrip('=')
+
+
+def decode_cursor(token):
+    """Giải mã cursor -> (created_at | None, id); ValueError nếu cursor không hợp lệ"""
+    try:
+        raw = base64.urlsafe_b64decode(token + '=' * (-len(token) % 4)).decode('ascii')
+        stamp, row_id = raw.split('|')
+        created_at = datetime.strptime(stamp, _CURSOR_TIME_FORMAT) if stamp else None
+        return created_at, int(row_id)
+    except Exception:
+        raise ValueError('Cursor không hợp lệ')
+
+
+def encode_offset_cursor(offset):
+    """Cursor mờ cho danh sách xếp hạng (vd. kết quả tìm kiếm) - không có khoá keyset ổn định"""
+    return base64.urlsafe_b64encode(f"o|{offset}".encode('ascii')).decode('ascii').rstrip('=')
+
+
+def decode_offset_cursor(token):
+    """Giải mã cursor offset -> int; ValueError nếu cursor không hợp lệ"""
+    try:
+        raw = base64.urlsafe_b64decode(token + '=' * (-len(token) % 4)).decode('ascii')
+        kind, offset = raw.split('|')
+        if kind != 'o' or int(offset) < 0:
+            raise ValueError
+        return int(offset)
+    except Exception:
+        raise ValueError('Cursor không hợp lệ')
+
+
+def keyset_params(cursor):
+    """Tham số cho điều kiện keyset dùng chung trong các route:
+
+        (created_at < %s OR (created_at = %s AND id < %s) OR (created_at IS NULL AND id < %s))
+
+    tương ứng ORDER BY created_at DESC, id DESC (NULL xếp cuối). cursor=None là trang đầu.
+    """
+    if cursor is None:
+        return [_FIRST_PAGE_TIME, _FIRST_PAGE_TIME, _MAX_ID, _MAX_ID]
+    created_at, row_id = cursor
+    if created_at is None:
+        # Đã sang phần các dòng created_at NULL: chỉ còn lọc theo id
+        return [_MIN_TIME, _MIN_TIME, 0, row_id]
+    return [created_at, created_at, row_id, _MAX_ID]
+
+
+def paginate(rows, limit):
+    """Cắt rows (đã lấy dư 1 dòng) thành trang và tính next_cursor"""
+    page = rows[:limit]
+    next_cursor = None
+    if len(rows) > limit:
+        last = page[-1]
+        next_cursor = encode_cursor(last['created_at'], last['id'])
+    return page, next_cursor
+
+
+def request_cursor():
+    """Đọc ?cursor= từ request; ValueError nếu không hợp lệ"""
+    token = request.args.get('cursor')
+    return decode_cursor(token) if token else None
+
+
+def paged_response(items, next_cursor):
+    """Client dùng ?limit= / ?cursor= nhận {items, next_cursor}; client cũ vẫn nhận mảng, cursor nằm ở header"""
+    if 'cursor' in request.args or 'limit' in request.args:
+        return jsonify({'items': items, 'next_cursor': next_cursor})
+    response = jsonify(items)
+    if next_cursor:
+        response.headers['X-Next-Cursor'] = next_cursor
+    return response
@@ -0,0 +1,89 @@
+from utils import catalog
+from utils.memory_index import MemoryIndex
+from utils.text import tokenize
+
+
+def name_key(name):
+    """Tên đã chuẩn hoá để tra cứu: 'Florence  Pugh' / 'florence pugh' -> 'florence pugh'"""
+    return ' '.join(tokenize(name))
+
+
+class PeopleIndex(MemoryIndex):
+    """Index diễn viên -> phim, dựng từ people + movie_cast.
+
+    Key là person id. Một phim đổi có thể đổi cast của nhiều người nên mọi thay đổi catalog
+    đều nạp lại toàn bộ (một truy vấn join, rẻ so với tần suất upload).
+    """
+
+    name = 'people'
+
+    def __init__(self):
+        super().__init__()
+        self._reset()
+
+    def _reset(self):
+        self._people = {}     # person_id -> (name, profile_path, [(movie_id, character)...])
+        self._by_name = {}    # tên đã chuẩn hoá -> {person_id...}
+
+    def _load(self, cursor, keys=None):
+        # Chỉ dùng mark_stale -> luôn nạp toàn bộ
+        cursor.execute("""
+            SELECT p.id, p.name, p.profile_path, mc.movie_id, mc.character_name
+            FROM people p
+            JOIN movie_cast mc ON mc.person_id = p.id
+            ORDER BY p.id, mc.movie_id
+        """)
+        people = {}
+        for row in cursor.fetchall():
+            entry = people.setdefault(row['id'], (row['name'], row['profile_path'], []))
+            entry[2].append((row['movie_id'], row['character_name']))
+        return list(people.items())
+
+    def _add(self, person_id, data):
+        self._people[person_id] = data
+        self._by_name.setdefault(name_key(data[0]), set()).add(person_id)
+
+    def _remove(self, person_id):
+        entry = self._people.pop(person_id, None)
+        if entry is None:
+            return
+        ids = self._by_name.get(name_key(entry[0]))
+        if ids is not None:
+            ids.discard(person_id)
+            if not ids:
+                del self._by_name[name_key(entry[0])]
+
+    # --- truy vấn ---
+
+    def lookup(self, name):
+        """(thông tin diễn viên, [(movie_id, character)...]) theo tên (không phân biệt hoa thường / dấu),
+        None nếu không có. Các người trùng tên sau chuẩn hoá được gộp."""
+        self.sync()
+        with self._lock:
+            person_ids = sorted(self._by_name.get(name_key(name), ()))
+            if not person_ids:
+                return None
+            name, profile_path, _ = self._people[person_ids[0]]
+            movies = {}
+            for person_id in person_ids:
+                for movie_id, character in self._people[person_id][2]:
+                    movies.setdefault(movie_id, character)
+            # id tăng theo thời gian thêm phim -> mới nhất trước như các listing khác
+            return {'name': name, 'profile_path': profile_path}, sorted(movies.items(), reverse=True)
+
+    def stats(self):
+        with self._lock:
+            return dict({
+                'people': len(self._people),
+                'names': len(self._by_name),
+                'credits': sum(len(entry[2]) for entry in self._people.values())
+            }, **self.sync_stats())
+
+
+people_index = PeopleIndex()
+
+
+@catalog.on_change
+def _update_people_index(item_type, item_id, action):
+    if item_type in (None, 'movie'):
+        people_index.mark_stale()
@@ -0,0 +1,81 @@
+import os
+import re
+import hashlib
+from datetime import datetime, timezone
+from xml.sax.saxutils import escape, unescape
+from flask import Response, request
+from utils.cache import ByteLRUCache
+from utils.segments import SEGMENT_URL_TTL, SEGMENT_URL_STEP, sign_url, url_expiry
+
+PLAYLIST_CACHE_BYTES = int(os.getenv("PLAYLIST_CACHE_BYTES", 8 * 1024 * 1024))   # tổng dung lượng playlist đã rewrite
+PLAYLIST_MAX_AGE = int(os.getenv("PLAYLIST_MAX_AGE", 60))                        # giây client dùng lại không cần hỏi
+
+HLS_MIMETYPE = 'application/vnd.apple.mpegurl'
+DASH_MIMETYPE = 'application/dash+xml'
+
+# URI="..." trong tag (EXT-X-MEDIA, EXT-X-I-FRAME-STREAM-INF, EXT-X-MAP...)
+_TAG_URI = re.compile(r'URI="([^"]+)"')
+# <BaseURL> tương đối trong DASH MPD
+_BASE_URL = re.compile(r'<BaseURL>([^<]+)</BaseURL>')
+
+# (title, path, mtime, size, hạn URL) -> (nội dung đã rewrite, etag, last-modified); file đổi thì key đổi theo
+playlist_cache = ByteLRUCache(PLAYLIST_CACHE_BYTES, name='playlist', size_of=lambda entry: len(entry[0]))
+
+
+def rewrite_playlist(path, url_prefix, expires):
+    """Đọc m3u8 và đổi URI tương đối (dòng segment / variant playlist, thuộc tính URI của tag)
+    thành URL đã ký dưới url_prefix"""
+    def signed(uri):
+        return sign_url(f"{url_prefix}/{uri}", expires)
+
+    with open(path, 'r', encoding='utf-8') as f:
+        lines = []
+        for line in f:
+            line = line.strip()
+            if line and not line.startswith('#'):
+                lines.append(signed(line))
+            elif line.startswith('#EXT') and 'URI="' in line:
+                lines.append(_TAG_URI.sub(lambda m: f'URI="{signed(m.group(1))}"', line))
+            else:
+                lines.append(line)
+    return "\n".join(lines).encode('utf-8')
+
+
+def rewrite_manifest(path, url_prefix, expires):
+    """Đọc DASH MPD và đổi các BaseURL (file fMP4 của từng rendition) thành URL đã ký dưới url_prefix"""
+    with open(path, 'r', encoding='utf-8') as f:
+        mpd = f.read()
+    return _BASE_URL.sub(
+        lambda m: f"<BaseURL>{escape(sign_url(f'{url_prefix}/{unescape(m.group(1))}', expires))}</BaseURL>", mpd
+    ).encode('utf-8')
+
+
+def playlist_response(title_key, path, url_prefix):
+    """Response playlist (m3u8, hoặc DASH MPD nếu path là .mpd) đã rewrite, lấy từ cache nếu file
+    chưa đổi, kèm ETag / Last-Modified.
+
+    Trả None nếu file không tồn tại. 304 khi If-None-Match / If-Modified-Since còn khớp.
+    """
+    try:
+        st = os.stat(path)
+    except FileNotFoundError:
+        return None
+
+    expires = url_expiry()
+    key = (title_key, path, st.st_mtime_ns, st.st_size, expires)
+    entry = playlist_cache.get(key)
+    if entry is None:
+        rewrite = rewrite_manifest if path.endswith('.mpd') else rewrite_playlist
+        body = rewrite(path, url_prefix, expires)
+        etag = hashlib.sha1(body).hexdigest()[:32]
+        # Nội dung đổi theo hạn URL -> Last-Modified là lúc file đổi hoặc lúc bắt đầu bước ký hiện tại
+        issued_at = expires - SEGMENT_URL_TTL - SEGMENT_URL_STEP
+        entry = (body, etag, datetime.fromtimestamp(max(st.st_mtime, issued_at), tz=timezone.utc))
+        playlist_cache.set(key, entry)
+
+    body, etag, last_modified = entry
+    response = Response(body, mimetype=DASH_MIMETYPE if path.endswith('.mpd') else HLS_MIMETYPE)
+    response.set_etag(etag)
+    response.last_modified = last_modified
+    response.headers['Cache-Control'] = f"public, max-age={PLAYLIST_MAX_AGE}, must-revalidate"
+    return response.make_conditional(request)
@@ -0,0 +1,165 @@
+import os
+import re
+import time
+import logging
+import threading
+from collections import Counter, deque
+from flask import g, has_request_context, request
+
+logger = logging.getLogger(__name__)
+
+# Số lần lặp lại cùng một dạng câu lệnh trong 1 request thì bị coi là N+1
+SQL_N_PLUS_ONE_THRESHOLD = int(os.getenv("SQL_N_PLUS_ONE_THRESHOLD", 5))
+# Số request gần nhất giữ lại cho mỗi endpoint trong bảng tổng hợp
+SQL_STATS_WINDOW = int(os.getenv("SQL_STATS_WINDOW", 200))
+
+_STRING_LITERAL = re.compile(r"'(?:[^'\\]|\\.)*'")
+_NUMBER_LITERAL = re.compile(r"\b\d+(?:\.\d+)?\b")
+_IN_LIST = re.compile(r"\bIN\s*\([^)]*\)", re.IGNORECASE)
+_WHITESPACE = re.compile(r"\s+")
+
+
+def statement_shape(sql):
+    """Chuẩn hoá câu SQL thành dạng chung (bỏ literal, gộp IN-list) để phát hiện N+1"""
+    shape = _STRING_LITERAL.sub('?', sql)
+    shape = _NUMBER_LITERAL.sub('?', shape)
+    shape = _IN_LIST.sub('IN (?)', shape)
+    return _WHITESPACE.sub(' ', shape).strip()
+
+
+class RequestQueryStats:
+    """Thống kê truy vấn của một request"""
+
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+        self.slowest = None
+        self.slowest_time = 0.0
+        self.shapes = Counter()
+
+    def record(self, sql, elapsed):
+        self.count += 1
+        self.total += elapsed
+        if elapsed >= self.slowest_time:
+            self.slowest_time = elapsed
+            self.slowest = sql
+        self.shapes[statement_shape(sql)] += 1
+
+    def repeated_shapes(self):
+        return {shape: n for shape, n in self.shapes.items() if n >= SQL_N_PLUS_ONE_THRESHOLD}
+
+
+class EndpointSummary:
+    """Tổng hợp cuốn chiếu (rolling) theo endpoint trên SQL_STATS_WINDOW request gần nhất"""
+
+    def __init__(self, window):
+        self._lock = threading.Lock()
+        self._window = window
+        self._samples = {}          # endpoint -> deque[(count, total_ms)]
+        self._slowest = {}          # endpoint -> (ms, sql)
+        self._n_plus_one = {}       # endpoint -> Counter[shape]
+
+    def add(self, endpoint, stats):
+        total_ms = stats.total * 1000
+        with self._lock:
+            samples = self._samples.setdefault(endpoint, deque(maxlen=self._window))
+            samples.append((stats.count, total_ms))
+
+            slowest_ms = stats.slowest_time * 1000
+            if stats.slowest and slowest_ms >= self._slowest.get(endpoint, (0, None))[0]:
+                self._slowest[endpoint] = (slowest_ms, statement_shape(stats.slowest))
+
+            repeated = stats.repeated_shapes()
+            if repeated:
+                self._n_plus_one.setdefault(endpoint, Counter()).update(repeated.keys())
+
+    def snapshot(self):
+        with self._lock:
+            result = {}
+            for endpoint, samples in self._samples.items():
+                counts = [c for c, _ in samples]
+                times = sorted(t for _, t in samples)
+                slowest = self._slowest.get(endpoint)
+                result[endpoint] = {
+                    'requests': len(samples),
+                    'queries_avg': round(sum(counts) / len(counts), 2),
+                    'queries_max': max(counts),
+                    'db_ms_avg': round(sum(times) / len(times), 3),
+                    'db_ms_p95': round(times[min(len(times) - 1, int(len(times) * 0.95))], 3),
+                    'slowest_ms': round(slowest[0], 3) if slowest else 0,
+                    'slowest_statement': slowest[1] if slowest else None,
+                    'n_plus_one': dict(self._n_plus_one.get(endpoint, {}))
+                }
+            return result
+
+
+summary = EndpointSummary(SQL_STATS_WINDOW)
+
+
+def record_query(sql, elapsed):
+    if has_request_context() and '_query_stats' in g:
+        g._query_stats.record(sql, elapsed)
+
+
+class InstrumentedCursor:
+    """Bọc cursor của pymysql để đo thời gian từng câu lệnh"""
+
+    def __init__(self, cursor):
+        self._cursor = cursor
+
+    def __getattr__(self, name):
+        return getattr(self._cursor, name)
+
+    def __iter__(self):
+        return iter(self._cursor)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self._cursor.close()
+
+    def execute(self, query, args=None):
+        start = time.perf_counter()
+        try:
+            return self._cursor.execute(query, args)
+        finally:
+            record_query(query, time.perf_counter() - start)
+
+    def executemany(self, query, args):
+        start = time.perf_counter()
+        try:
+            return self._cursor.executemany(query, args)
+        finally:
+            record_query(query, time.perf_counter() - start)
+
+
+def init_app(app):
+    """Gắn thống kê SQL vào vòng đời request: header Server-Timing + tổng hợp theo endpoint"""
+    @app.before_request
+    def _start_query_stats():
+        g._query_stats = RequestQueryStats()
+        g._request_started = time.perf_counter()
+
+    @app.after_request
+    def _report_query_stats(response):
+        stats = g.pop('_query_stats', None)
+        if stats is None:
+            return response
+
+        elapsed_ms = (time.perf_counter() - g.pop('_request_started')) * 1000
+        db_ms = stats.total * 1000
+        response.headers.add(
+            'Server-Timing',
+            f'db;dur={db_ms:.2f};desc="{stats.count} queries", app;dur={elapsed_ms:.2f}'
+        )
+        response.headers['X-DB-Query-Count'] = str(stats.count)
+
+        endpoint = request.endpoint or request.path
+        repeated = stats.repeated_shapes()
+        for shape, n in repeated.items():
+            logger.warning(f"[N+1] {endpoint} chạy {n} lần: {shape}")
+
+        if stats.count:
+            summary.add(endpoint, stats)
+        return response
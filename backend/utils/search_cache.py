@@ -0,0 +1,99 @@
+import os
+import threading
+from collections import Counter
+from utils import catalog
+from utils.cache import TTLCache
+from utils.text import fold
+
+SEARCH_CACHE_SIZE = int(os.getenv("SEARCH_CACHE_SIZE", 1024))          # số truy vấn tối đa
+SEARCH_CACHE_TTL = float(os.getenv("SEARCH_CACHE_TTL", 120))           # giây, truy vấn có kết quả
+SEARCH_NEGATIVE_TTL = float(os.getenv("SEARCH_NEGATIVE_TTL", 30))      # giây, truy vấn không có kết quả
+SEARCH_TOP_QUERIES = int(os.getenv("SEARCH_TOP_QUERIES", 20))          # số truy vấn hiển thị ở /health/cache
+_TRACKED_QUERIES = 1000   # số truy vấn khác nhau được đếm trước khi bỏ bớt truy vấn hiếm
+
+_MISSING = object()
+
+# Kết quả tìm kiếm theo truy vấn đã chuẩn hoá; xoá sạch khi catalog thay đổi
+search_cache = TTLCache(SEARCH_CACHE_SIZE, SEARCH_CACHE_TTL, name='search')
+
+
+@catalog.on_change
+def _invalidate_search_cache(item_type, item_id, action):
+    search_cache.invalidate()
+
+
+def normalize_query(query):
+    """'  Bố   ƠI ' -> 'bo oi': chữ thường, bỏ dấu, gộp khoảng trắng"""
+    return ' '.join(fold(query).split())
+
+
+def collapse_query(query):
+    """'  Bố   ƠI ' -> 'bố ơi': chữ thường, gộp khoảng trắng nhưng giữ dấu (cho backend DB)"""
+    return ' '.join(query.lower().split())
+
+
+class QueryCounter:
+    """Đếm số lần gọi theo truy vấn đã chuẩn hoá (giới hạn số truy vấn theo dõi) và số lần trả rỗng"""
+
+    def __init__(self, tracked=_TRACKED_QUERIES):
+        self.tracked = tracked
+        self._counts = Counter()
+        self._lock = threading.Lock()
+        self.searches = 0
+        self.negative_hits = 0     # lấy từ cache một kết quả rỗng
+        self.empty_results = 0     # tính ra kết quả rỗng
+
+    def record(self, query, cached, empty):
+        with self._lock:
+            self.searches += 1
+            self._counts[query] += 1
+            if len(self._counts) > self.tracked:
+                # Giữ nửa phổ biến hơn để bộ đếm không phình theo truy vấn ngẫu nhiên
+                self._counts = Counter(dict(self._counts.most_common(self.tracked // 2)))
+            if empty:
+                if cached:
+                    self.negative_hits += 1
+                else:
+                    self.empty_results += 1
+
+    def stats(self, top=SEARCH_TOP_QUERIES):
+        with self._lock:
+            return {
+                'searches': self.searches,
+                'negative_hits': self.negative_hits,
+                'empty_results': self.empty_results,
+                'top_queries': [{'query': q, 'count': c} for q, c in self._counts.most_common(top)]
+            }
+
+
+query_counter = QueryCounter()
+
+
+def cached_search(scope, query, compute, exact=False):
+    """Kết quả compute(truy vấn) -> (tổng số, kết quả trang), cache theo (scope, truy vấn).
+
+    scope phân biệt các biến thể của cùng một truy vấn (backend, bộ lọc, trang...).
+    Mặc định compute nhận truy vấn đã chuẩn hoá (cũng là khoá cache); exact=True cho backend
+    so khớp trên chuỗi có dấu (LIKE / FULLTEXT, không phân biệt hoa thường) -> khoá theo và tính
+    trên truy vấn chỉ hạ chữ thường + gộp khoảng trắng.
+    Truy vấn không có kết quả nào cũng được cache nhưng với TTL ngắn hơn.
+    """
+    normalized = normalize_query(query)
+    query = collapse_query(query) if exact else normalized
+    key = (scope, query)
+    version = catalog.version()
+
+    result = search_cache.get(key, _MISSING)
+    cached = result is not _MISSING
+    if not cached:
+        result = compute(query)
+        # Bỏ qua nếu catalog đổi trong lúc đang tính (tránh lưu kết quả cũ)
+        if catalog.version() == version:
+            search_cache.set(key, result, ttl=None if result[0] else SEARCH_NEGATIVE_TTL)
+
+    query_counter.record(normalized, cached, not result[0])
+    return result
+
+
+def stats():
+    return dict(search_cache.stats(), negative_ttl=SEARCH_NEGATIVE_TTL, **query_counter.stats())
@@ -0,0 +1,202 @@
+import math
+import heapq
+from datetime import datetime
+from collections import Counter
+from utils import catalog
+from utils.memory_index import MemoryIndex
+from utils.text import tokenize
+from utils.fuzzy import TrigramIndex
+
+# Trọng số field khi tính tần suất term (BM25 trên tf có trọng số)
+FIELD_WEIGHTS = {
+    'title': 3.0,
+    'original_title': 2.0,
+    'tag': 1.0,
+    'overview': 1.0,
+    'cast': 1.5,         # tên diễn viên
+    'character': 0.5,    # tên nhân vật
+}
+BM25_K1 = 1.2
+BM25_B = 0.75
+# Term không có trong từ vựng (gõ sai) -> thay bằng tối đa N term gần đúng, điểm nhân hệ số theo số lỗi
+FUZZY_EXPANSIONS = 5
+FUZZY_PENALTY = {1: 0.6, 2: 0.35}
+
+
+def search_document(row, content_type):
+    """Kết quả tìm kiếm trả cho client (cùng định dạng cho mọi backend tìm kiếm)"""
+    poster_path = row['poster_path']
+    poster_prefix = "/api/static/posters/" if content_type == 'movie' else "/api/static/show-poster/"
+    return {
+        'id': row['id'],
+        'title': row['title'],
+        'poster_path': f"{poster_prefix}{poster_path}" if poster_path else None,
+        'backdrop_path': f"/api/static/backdrops/{row['backdrop_path']}" if row.get('backdrop_path') else None,
+        'overview': row['overview'],
+        'release_date': row['release_date'].strftime('%Y-%m-%d') if row.get('release_date') else '',
+        'type': content_type  # 'movie' or 'show'
+    }
+
+
+class SearchIndex(MemoryIndex):
+    """Inverted index full-text trên phim + show, xếp hạng BM25, không phân biệt dấu tiếng Việt.
+
+    Key tài liệu là (content_type, id).
+    """
+
+    name = 'search'
+
+    def __init__(self):
+        super().__init__()
+        self._reset()
+
+    def _reset(self):
+        self._postings = {}    # term -> {doc_key: tf có trọng số}
+        self._docs = {}        # doc_key -> (kết quả trả client, created_at, [term...], độ dài)
+        self._total_length = 0.0
+        self._trigrams = TrigramIndex()   # từ vựng -> ứng viên khi gõ sai
+
+    def _load(self, cursor, keys=None):
+        movie_ids = show_ids = None
+        if keys is not None:
+            movie_ids = [item_id for item_type, item_id in keys if item_type == 'movie']
+            show_ids = [item_id for item_type, item_id in keys if item_type == 'show']
+
+        items = []
+        if movie_ids is None or movie_ids:
+            placeholders = ', '.join(['%s'] * len(movie_ids or ()))
+            where, cast_where = ('', '') if movie_ids is None else \
+                (f"WHERE id IN ({placeholders})", f"WHERE mc.movie_id IN ({placeholders})")
+            cursor.execute(f"""
+                SELECT id, title, original_title, overview, tag, poster_path, backdrop_path,
+                       release_date, created_at
+                FROM movies {where}
+            """, movie_ids or ())
+            movies = cursor.fetchall()
+
+            # Tên diễn viên / nhân vật từ bảng chuẩn hoá (people + movie_cast)
+            cursor.execute(f"""
+                SELECT mc.movie_id, p.name, mc.character_name
+                FROM movie_cast mc
+                JOIN people p ON p.id = mc.person_id
+                {cast_where}
+            """, movie_ids or ())
+            cast = {}
+            for row in cursor.fetchall():
+                names, characters = cast.setdefault(row['movie_id'], ([], []))
+                names.append(row['name'])
+                characters.append(row['character_name'] or '')
+
+            for row in movies:
+                fields = {name: row[name] for name in ('title', 'original_title', 'tag', 'overview')}
+                names, characters = cast.get(row['id'], ([], []))
+                fields['cast'] = ' '.join(names)
+                fields['character'] = ' '.join(characters)
+                items.append((('movie', row['id']), (search_document(row, 'movie'), row['created_at'], fields)))
+
+        if show_ids is None or show_ids:
+            where = '' if show_ids is None else f"WHERE id IN ({', '.join(['%s'] * len(show_ids))})"
+            cursor.execute(f"""
+                SELECT id, title, description AS overview, show_poster AS poster_path,
+                       NULL AS backdrop_path, NULL AS release_date, created_at
+                FROM shows {where}
+            """, show_ids or ())
+            for row in cursor.fetchall():
+                fields = {'title': row['title'], 'overview': row['overview']}
+                items.append((('show', row['id']), (search_document(row, 'show'), row['created_at'], fields)))
+        return items
+
+    def _add(self, key, data):
+        document, created_at, fields = data
+        tf = Counter()
+        for name, text in fields.items():
+            weight = FIELD_WEIGHTS[name]
+            for term in tokenize(text):
+                tf[term] += weight
+        length = sum(tf.values())
+
+        self._docs[key] = (document, created_at, list(tf), length)
+        self._total_length += length
+        for term, weight in tf.items():
+            postings = self._postings.get(term)
+            if postings is None:
+                postings = self._postings[term] = {}
+                self._trigrams.add(term)
+            postings[key] = weight
+
+    def _remove(self, key):
+        entry = self._docs.pop(key, None)
+        if entry is None:
+            return
+        _, _, terms, length = entry
+        self._total_length -= length
+        for term in terms:
+            postings = self._postings[term]
+            del postings[key]
+            if not postings:
+                del self._postings[term]
+                self._trigrams.remove(term)
+
+    # --- truy vấn ---
+
+    def _expand(self, term):
+        """[(term trong từ vựng, hệ số)]: chính nó nếu có, ngược lại các term gần đúng (chịu lỗi gõ)"""
+        if term in self._postings:
+            return [(term, 1.0)]
+        similar = self._trigrams.similar(term)[:FUZZY_EXPANSIONS]
+        return [(candidate, FUZZY_PENALTY[distance]) for candidate, distance in similar]
+
+    def search(self, query, limit, offset=0, content_type=None):
+        """(tổng số kết quả, kết quả trang [offset, offset + limit)) xếp theo điểm BM25, hoà thì mới hơn trước"""
+        self.sync()
+        terms = list(dict.fromkeys(tokenize(query)))
+        with self._lock:
+            total_docs = len(self._docs)
+            if not terms or not total_docs:
+                return 0, []
+            avg_length = self._total_length / total_docs or 1.0
+
+            scores = {}
+            for term in terms:
+                # Một term gõ sai có thể khớp nhiều term gần đúng trong cùng tài liệu -> chỉ lấy điểm cao nhất
+                term_scores = {}
+                for candidate, factor in self._expand(term):
+                    postings = self._postings[candidate]
+                    idf = math.log(1 + (total_docs - len(postings) + 0.5) / (len(postings) + 0.5))
+                    for key, tf in postings.items():
+                        if content_type and key[0] != content_type:
+                            continue
+                        length = self._docs[key][3]
+                        norm = tf + BM25_K1 * (1 - BM25_B + BM25_B * length / avg_length)
+                        score = factor * idf * tf * (BM25_K1 + 1) / norm
+                        if score > term_scores.get(key, 0.0):
+                            term_scores[key] = score
+                for key, score in term_scores.items():
+                    scores[key] = scores.get(key, 0.0) + score
+
+            def rank(key):
+                created_at = self._docs[key][1]
+                return (scores[key], created_at is not None, created_at or datetime.min, key[1])
+
+            top = heapq.nlargest(offset + limit, scores, key=rank)
+            return len(scores), [dict(self._docs[key][0], score=round(scores[key], 4)) for key in top[offset:]]
+
+    def stats(self):
+        with self._lock:
+            return dict({
+                'documents': len(self._docs),
+                'terms': len(self._postings),
+                'trigrams': len(self._trigrams),
+                'avg_length': round(self._total_length / len(self._docs), 2) if self._docs else 0
+            }, **self.sync_stats())
+
+
+search_index = SearchIndex()
+
+
+@catalog.on_change
+def _update_search_index(item_type, item_id, action):
+    if action == 'reload' or item_id is None:
+        search_index.mark_stale()
+    else:
+        search_index.mark_dirty((item_type, item_id))
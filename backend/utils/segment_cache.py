@@ -0,0 +1,147 @@
+import os
+import threading
+from collections import OrderedDict
+from utils import catalog
+
+# Tổng dung lượng RAM cho segment nóng; 0 = tắt (mọi segment đọc từ đĩa như cũ)
+SEGMENT_CACHE_BYTES = int(os.getenv("SEGMENT_CACHE_BYTES", 0))
+SEGMENT_CACHE_TITLE_BYTES = int(os.getenv("SEGMENT_CACHE_TITLE_BYTES", 64 * 1024 * 1024))   # tối đa mỗi phim / tập
+SEGMENT_CACHE_ADMIT_HITS = int(os.getenv("SEGMENT_CACHE_ADMIT_HITS", 2))   # segment được đọc bao nhiêu lần mới vào cache
+SEGMENT_CACHE_MAX_ITEM = int(os.getenv("SEGMENT_CACHE_MAX_ITEM", 16 * 1024 * 1024))   # segment lớn hơn luôn đọc từ đĩa
+_TRACKED_MISSES = 4096   # số segment chưa vào cache được đếm lượt đọc
+
+
+class HotSegmentCache:
+    """LRU nội dung segment giới hạn theo tổng byte và theo byte mỗi title; thread-safe.
+
+    Segment chỉ được nhận vào cache sau admit_hits lần đọc (một người xem lướt qua không đẩy
+    phần đầu phim đang hot ra ngoài). Key gồm mtime / size nên file encode lại tự thành key mới.
+    """
+
+    def __init__(self, maxbytes, title_bytes, admit_hits, max_item, name=None):
+        self.maxbytes = maxbytes
+        self.title_bytes = title_bytes
+        self.admit_hits = admit_hits
+        self.max_item = min(max_item, title_bytes, maxbytes)
+        self.name = name
+        self._data = OrderedDict()    # (path, mtime_ns, size) -> (title, nội dung)
+        self._titles = {}             # title -> OrderedDict[key -> None] theo thứ tự LRU
+        self._title_bytes = {}        # title -> tổng byte đang giữ
+        self._misses = OrderedDict()  # key chưa vào cache -> số lần đọc
+        self._lock = threading.Lock()
+        self.bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.admissions = 0
+        self.evictions = 0
+        self.bytes_from_memory = 0
+        self.bytes_from_disk = 0
+
+    @property
+    def enabled(self):
+        return self.maxbytes > 0
+
+    def _evict(self, key):
+        title, data = self._data.pop(key)
+        entries = self._titles[title]
+        del entries[key]
+        self._title_bytes[title] -= len(data)
+        if not entries:
+            del self._titles[title]
+            del self._title_bytes[title]
+        self.bytes -= len(data)
+        self.evictions += 1
+
+    def get(self, title, path, st):
+        """Nội dung segment từ RAM (hoặc vừa đọc để nhận vào cache); None nếu caller nên đọc từ đĩa"""
+        key = (path, st.st_mtime_ns, st.st_size)
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is not None:
+                self._data.move_to_end(key)
+                self._titles[entry[0]].move_to_end(key)
+                self.hits += 1
+                self.bytes_from_memory += st.st_size
+                return entry[1]
+
+            self.misses += 1
+            if st.st_size > self.max_item:
+                self.bytes_from_disk += st.st_size
+                return None
+            count = self._misses.pop(key, 0) + 1
+            if count < self.admit_hits:
+                self._misses[key] = count
+                if len(self._misses) > _TRACKED_MISSES:
+                    self._misses.popitem(last=False)
+                self.bytes_from_disk += st.st_size
+                return None
+
+        # Đọc ngoài lock để các request khác không phải chờ I/O
+        with open(path, 'rb') as f:
+            data = f.read()
+        if len(data) != st.st_size:
+            # File đang bị ghi / thay thế -> không cache
+            with self._lock:
+                self.bytes_from_disk += len(data)
+            return data
+
+        with self._lock:
+            if key not in self._data:
+                self._data[key] = (title, data)
+                self._titles.setdefault(title, OrderedDict())[key] = None
+                self._title_bytes[title] = self._title_bytes.get(title, 0) + len(data)
+                self.bytes += len(data)
+                self.admissions += 1
+                # Vượt hạn mức title -> bỏ segment cũ nhất của chính title đó trước
+                while self._title_bytes[title] > self.title_bytes:
+                    self._evict(next(iter(self._titles[title])))
+                while self.bytes > self.maxbytes:
+                    self._evict(next(iter(self._data)))
+            # Lần này vẫn đọc từ đĩa; chỉ các lần hit sau mới tính là từ RAM
+            self.bytes_from_disk += len(data)
+        return data
+
+    def invalidate(self, title=None):
+        """Xoá segment của một title, hoặc toàn bộ cache nếu không truyền title"""
+        with self._lock:
+            if title is None:
+                keys = list(self._data)
+            else:
+                keys = list(self._titles.get(title, ()))
+            for key in keys:
+                self._evict(key)
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            served = self.bytes_from_memory + self.bytes_from_disk
+            return {
+                'enabled': self.enabled,
+                'entries': len(self._data),
+                'titles': len(self._titles),
+                'bytes': self.bytes,
+                'maxbytes': self.maxbytes,
+                'title_bytes': self.title_bytes,
+                'admit_hits': self.admit_hits,
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_ratio': round(self.hits / lookups, 4) if lookups else 0,
+                'admissions': self.admissions,
+                'evictions': self.evictions,
+                'bytes_from_memory': self.bytes_from_memory,
+                'bytes_from_disk': self.bytes_from_disk,
+                'memory_byte_ratio': round(self.bytes_from_memory / served, 4) if served else 0
+            }
+
+
+segment_cache = HotSegmentCache(
+    SEGMENT_CACHE_BYTES, SEGMENT_CACHE_TITLE_BYTES, SEGMENT_CACHE_ADMIT_HITS, SEGMENT_CACHE_MAX_ITEM,
+    name='segments'
+)
+
+
+@catalog.on_change
+def _invalidate_segment_cache(item_type, item_id, action):
+    # Segment của phim đã xoá không còn ai đọc -> trả RAM ngay thay vì chờ LRU
+    if action == 'delete' and item_type == 'movie':
+        segment_cache.invalidate(('movie', item_id))
@@ -0,0 +1,106 @@
+import os
+import hmac
+import time
+import hashlib
+import logging
+from urllib.parse import quote
+from flask import Response, request, send_file
+from utils.media_paths import MOVIE_VIDEO_PATH, SHOW_VIDEO_PATH
+from utils.segment_cache import segment_cache
+from utils.file_ranges import send_file_range
+
+logger = logging.getLogger(__name__)
+
+SEGMENT_URL_TTL = int(os.getenv("SEGMENT_URL_TTL", 6 * 3600))   # giây URL segment còn hiệu lực sau khi phát playlist
+# Hạn URL được làm tròn lên theo bước này để playlist đã rewrite dùng lại được (cache / ETag) trong cả bước
+SEGMENT_URL_STEP = max(1, SEGMENT_URL_TTL // 6)
+
+# Cách trả file segment:
+#   python   -> send_file, worker Python đẩy toàn bộ nội dung
+#   nginx    -> X-Accel-Redirect tới location internal (xem SEGMENT_ACCEL_*_PREFIX)
+#   sendfile -> X-Sendfile với đường dẫn tuyệt đối (Apache mod_xsendfile, lighttpd)
+SEGMENT_OFFLOAD = os.getenv("SEGMENT_OFFLOAD", "python").lower()
+SEGMENT_ACCEL_MOVIE_PREFIX = os.getenv("SEGMENT_ACCEL_MOVIE_PREFIX", "/internal/video/movie/")
+SEGMENT_ACCEL_SHOW_PREFIX = os.getenv("SEGMENT_ACCEL_SHOW_PREFIX", "/internal/video/show/")
+
+# Phần mở rộng -> mimetype; file đóng gói một file / rendition (fMP4) được đọc theo Range
+SEGMENT_MIMETYPES = {'.ts': 'video/mp2t', '.mp4': 'video/mp4', '.m4s': 'video/iso.segment'}
+_SINGLE_FILE_EXTENSIONS = {'.mp4'}
+
+_fallback_secret = None
+
+
+def _secret():
+    """Khoá HMAC: SEGMENT_URL_SECRET, rồi tới JWT_SECRET; không có thì khoá ngẫu nhiên theo tiến trình"""
+    global _fallback_secret
+    secret = os.getenv("SEGMENT_URL_SECRET") or os.getenv("JWT_SECRET")
+    if secret:
+        return secret.encode('utf-8')
+    if _fallback_secret is None:
+        logger.warning("[SEGMENT] Chưa cấu hình SEGMENT_URL_SECRET / JWT_SECRET, dùng khoá ngẫu nhiên (chỉ đúng với 1 worker)")
+        _fallback_secret = os.urandom(32)
+    return _fallback_secret
+
+
+def _signature(url_path, expires):
+    message = f"{url_path}|{expires}".encode('utf-8')
+    return hmac.new(_secret(), message, hashlib.sha256).hexdigest()[:32]
+
+
+def url_expiry(now=None):
+    """Hạn dùng cho các URL segment phát ra lúc này (cùng giá trị trong suốt một SEGMENT_URL_STEP)"""
+    now = int(time.time() if now is None else now)
+    return (now // SEGMENT_URL_STEP + 1) * SEGMENT_URL_STEP + SEGMENT_URL_TTL
+
+
+def sign_url(url_path, expires):
+    """'/api/stream/movie/1/seg0.ts' -> '/api/stream/movie/1/seg0.ts?exp=...&sig=...'
+
+    Ký trên path chưa encode (giống request.path phía Flask), URL trả về đã percent-encode.
+    """
+    return f"{quote(url_path)}?exp={expires}&sig={_signature(url_path, expires)}"
+
+
+def verify_url(url_path, args):
+    """True nếu query string (exp, sig) là chữ ký hợp lệ, chưa hết hạn của url_path"""
+    try:
+        expires = int(args.get('exp', ''))
+    except ValueError:
+        return False
+    if expires < time.time():
+        return False
+    # So sánh bytes: compare_digest với str không phải ASCII (vd. sig=é) ném TypeError -> 500 thay vì 403
+    return hmac.compare_digest(args.get('sig', '').encode('utf-8'), _signature(url_path, expires).encode('ascii'))
+
+
+def send_segment(key, path):
+    """Response trả file segment theo SEGMENT_OFFLOAD; proxy phía trước tự đọc file (kể cả Range) nếu được offload.
+
+    Khi Flask tự trả file: file fMP4 một file / rendition đọc theo Range qua fd dùng chung,
+    segment .ts nóng lấy từ segment_cache (nếu bật) thay vì đọc đĩa.
+    """
+    extension = os.path.splitext(path)[1].lower()
+    mimetype = SEGMENT_MIMETYPES.get(extension, 'application/octet-stream')
+    if SEGMENT_OFFLOAD == 'nginx':
+        root, prefix = (MOVIE_VIDEO_PATH, SEGMENT_ACCEL_MOVIE_PREFIX) if key[0] == 'movie' \
+            else (SHOW_VIDEO_PATH, SEGMENT_ACCEL_SHOW_PREFIX)
+        relative = os.path.relpath(path, root).replace(os.sep, '/')
+        response = Response(mimetype=mimetype)
+        response.headers['X-Accel-Redirect'] = prefix.rstrip('/') + '/' + quote(relative)
+        return response
+    if SEGMENT_OFFLOAD == 'sendfile':
+        response = Response(mimetype=mimetype)
+        response.headers['X-Sendfile'] = os.path.abspath(path)
+        return response
+    if extension in _SINGLE_FILE_EXTENSIONS and hasattr(os, 'pread'):
+        return send_file_range(path, mimetype)
+    if segment_cache.enabled:
+        st = os.stat(path)
+        data = segment_cache.get(key, path, st)
+        if data is not None:
+            # Segment nóng từ RAM; vẫn hỗ trợ If-None-Match / Range như send_file
+            response = Response(data, mimetype=mimetype)
+            response.set_etag(f"{st.st_mtime_ns:x}-{st.st_size:x}")
+            response.last_modified = st.st_mtime
+            return response.make_conditional(request, accept_ranges=True, complete_length=len(data))
+    return send_file(path, mimetype=mimetype, as_attachment=False, conditional=True)
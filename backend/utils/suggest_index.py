@@ -0,0 +1,205 @@
+import os
+import bisect
+import heapq
+from utils import catalog
+from utils.memory_index import MemoryIndex
+from utils.text import tokenize
+
+# Mỗi lượt yêu thích tính bằng bao nhiêu vote TMDB khi xếp hạng gợi ý
+SUGGEST_FAVORITE_WEIGHT = int(os.getenv("SUGGEST_FAVORITE_WEIGHT", 50))
+# Tiền tố ngắn khớp rất nhiều cụm từ -> nhớ sẵn kết quả thay vì quét lại mỗi lần gõ
+SUGGEST_MEMO_PREFIX_LENGTH = 2
+
+
+def _phrases(*names):
+    """Các hậu tố bắt đầu ở mỗi từ của tên đã fold: 'ky uc chien' -> 'ky uc chien', 'uc chien', 'chien'"""
+    phrases = set()
+    for name in names:
+        tokens = tokenize(name)
+        for i in range(len(tokens)):
+            phrases.add(' '.join(tokens[i:]))
+    return phrases
+
+
+class SuggestIndex(MemoryIndex):
+    """Gợi ý tìm kiếm theo tiền tố: mảng (cụm từ, key) đã sắp xếp + bisect, xếp hạng theo độ phổ biến.
+
+    Key là ('movie' | 'show' | 'person', id). Độ phổ biến: phim = vote_count + yêu thích,
+    show = yêu thích, diễn viên = tổng vote_count các phim tham gia.
+    """
+
+    name = 'suggest'
+
+    def __init__(self):
+        super().__init__()
+        self._reset()
+
+    def _reset(self):
+        self._entries = []     # (cụm từ đã fold, key) tăng dần
+        self._items = {}       # key -> (gợi ý trả client, độ phổ biến, [cụm từ...])
+        self._cast = {}        # movie_id -> [person key...] để cập nhật diễn viên khi phim đổi
+        self._memo = {}        # (tiền tố ngắn, limit, types) -> kết quả
+        self._building = True  # đang nạp toàn bộ: append rồi sắp xếp một lần ở _finish
+
+    def mark_dirty(self, key):
+        with self._lock:
+            super().mark_dirty(key)
+            if key[0] == 'movie':
+                # Độ phổ biến của diễn viên phụ thuộc phim -> nạp lại cả diễn viên cũ của phim
+                for person_key in self._cast.get(key[1], ()):
+                    super().mark_dirty(person_key)
+
+    def _load(self, cursor, keys=None):
+        ids = {'movie': None, 'show': None, 'person': None}
+        if keys is not None:
+            for item_type in ids:
+                ids[item_type] = [item_id for kind, item_id in keys if kind == item_type]
+            if ids['movie']:
+                placeholders = ', '.join(['%s'] * len(ids['movie']))
+                cursor.execute(f"SELECT DISTINCT person_id FROM movie_cast WHERE movie_id IN ({placeholders})", ids['movie'])
+                ids['person'] = list(dict.fromkeys(ids['person'] + [row['person_id'] for row in cursor.fetchall()]))
+
+        def where(column, item_ids):
+            return '' if item_ids is None else f"WHERE {column} IN ({', '.join(['%s'] * len(item_ids))})"
+
+        items = []
+        if ids['movie'] is None or ids['movie']:
+            cursor.execute(f"""
+                SELECT movie_id, person_id FROM movie_cast {where('movie_id', ids['movie'])}
+            """, ids['movie'] or ())
+            cast = {}
+            for row in cursor.fetchall():
+                cast.setdefault(row['movie_id'], []).append(('person', row['person_id']))
+
+            cursor.execute(f"""
+                SELECT m.id, m.title, m.original_title, m.poster_path,
+                       COALESCE(m.vote_count, 0) + %s * COUNT(f.id) AS popularity
+                FROM movies m
+                LEFT JOIN favorites f ON f.item_type = 'movie' AND f.item_id = m.id
+                {where('m.id', ids['movie'])}
+                GROUP BY m.id
+            """, [SUGGEST_FAVORITE_WEIGHT] + (ids['movie'] or []))
+            for row in cursor.fetchall():
+                suggestion = {
+                    'type': 'movie',
+                    'id': row['id'],
+                    'title': row['title'],
+                    'poster_path': f"/api/static/posters/{row['poster_path']}" if row['poster_path'] else None
+                }
+                phrases = _phrases(row['title'], row['original_title'])
+                items.append((('movie', row['id']), (suggestion, row['popularity'], phrases, cast.get(row['id'], []))))
+
+        if ids['show'] is None or ids['show']:
+            cursor.execute(f"""
+                SELECT s.id, s.title, s.show_poster, %s * COUNT(f.id) AS popularity
+                FROM shows s
+                LEFT JOIN favorites f ON f.item_type = 'show' AND f.item_id = s.id
+                {where('s.id', ids['show'])}
+                GROUP BY s.id
+            """, [SUGGEST_FAVORITE_WEIGHT] + (ids['show'] or []))
+            for row in cursor.fetchall():
+                suggestion = {
+                    'type': 'show',
+                    'id': row['id'],
+                    'title': row['title'],
+                    'poster_path': f"/api/static/show-poster/{row['show_poster']}" if row['show_poster'] else None
+                }
+                items.append((('show', row['id']), (suggestion, row['popularity'], _phrases(row['title']), [])))
+
+        if ids['person'] is None or ids['person']:
+            cursor.execute(f"""
+                SELECT p.id, p.name, p.profile_path, COALESCE(SUM(m.vote_count), 0) AS popularity
+                FROM people p
+                JOIN movie_cast mc ON mc.person_id = p.id
+                JOIN movies m ON m.id = mc.movie_id
+                {where('p.id', ids['person'])}
+                GROUP BY p.id
+            """, ids['person'] or ())
+            for row in cursor.fetchall():
+                suggestion = {
+                    'type': 'person',
+                    'id': row['id'],
+                    'title': row['name'],
+                    'poster_path': row['profile_path']
+                }
+                items.append((('person', row['id']), (suggestion, row['popularity'], _phrases(row['name']), [])))
+        return items
+
+    def _add(self, key, data):
+        # Diễn viên có thể được nạp lại cùng phim mà không nằm trong danh sách dirty
+        self._remove(key)
+        suggestion, popularity, phrases, cast = data
+        self._memo.clear()
+        self._items[key] = (suggestion, int(popularity or 0), list(phrases))
+        for phrase in phrases:
+            if self._building:
+                self._entries.append((phrase, key))
+            else:
+                bisect.insort(self._entries, (phrase, key))
+        if key[0] == 'movie':
+            self._cast[key[1]] = cast
+
+    def _remove(self, key):
+        entry = self._items.pop(key, None)
+        if entry is None:
+            return
+        self._memo.clear()
+        for phrase in entry[2]:
+            i = bisect.bisect_left(self._entries, (phrase, key))
+            if i < len(self._entries) and self._entries[i] == (phrase, key):
+                del self._entries[i]
+        if key[0] == 'movie':
+            self._cast.pop(key[1], None)
+
+    def _finish(self, rebuild):
+        if self._building:
+            self._entries.sort()
+            self._building = False
+
+    # --- truy vấn ---
+
+    def suggest(self, query, limit, types=None):
+        """Tối đa limit gợi ý có một từ bắt đầu bằng query (đã fold), phổ biến nhất trước"""
+        self.sync()
+        prefix = ' '.join(tokenize(query))
+        if not prefix:
+            return []
+        memo_key = (prefix, limit, frozenset(types or ()))
+        with self._lock:
+            if memo_key in self._memo:
+                return self._memo[memo_key]
+
+            matches = set()
+            i = bisect.bisect_left(self._entries, (prefix,))
+            while i < len(self._entries) and self._entries[i][0].startswith(prefix):
+                key = self._entries[i][1]
+                if not types or key[0] in types:
+                    matches.add(key)
+                i += 1
+
+            def rank(key):
+                suggestion, popularity, _ = self._items[key]
+                return (popularity, -len(suggestion['title'] or ''))
+
+            result = [self._items[key][0] for key in heapq.nlargest(limit, matches, key=rank)]
+            if len(prefix) <= SUGGEST_MEMO_PREFIX_LENGTH:
+                self._memo[memo_key] = result
+            return result
+
+    def stats(self):
+        with self._lock:
+            return dict({
+                'items': len(self._items),
+                'entries': len(self._entries)
+            }, **self.sync_stats())
+
+
+suggest_index = SuggestIndex()
+
+
+@catalog.on_change
+def _update_suggest_index(item_type, item_id, action):
+    if action == 'reload' or item_id is None:
+        suggest_index.mark_stale()
+    else:
+        suggest_index.mark_dirty((item_type, item_id))
@@ -0,0 +1,17 @@
+import re
+import unicodedata
+
+_TOKEN = re.compile(r'\w+')
+
+
+def fold(text):
+    """Chữ thường, bỏ dấu tiếng Việt: 'Bố Ơi' -> 'bo oi', 'Đất' -> 'dat'"""
+    if not text:
+        return ''
+    text = unicodedata.normalize('NFD', text.lower()).replace('đ', 'd')
+    return ''.join(ch for ch in text if unicodedata.category(ch) != 'Mn')
+
+
+def tokenize(text):
+    """Tách text đã fold thành các token chữ / số"""
+    return _TOKEN.findall(fold(text))
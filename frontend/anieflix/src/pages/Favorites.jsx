@@ -28,24 +28,29 @@ export default function Favorites() {
         return
       }
 
-      // Lấy thông tin chi tiết từng item
-      const itemPromises = favorites.map(favorite => {
-        const endpoint = favorite.item_type === 'show'
-          ? `/shows/${favorite.item_id}`
-          : `/movies/${favorite.item_id}`
-
-        return axios.get(endpoint).then(res => ({
-          ...res.data,
-          item_type: favorite.item_type,
-          addedToFavorites: favorite.created_at || new Date()
-        })).catch(err => {
-          console.error(`Error fetching ${favorite.item_type} ${favorite.item_id}:`, err)
-          return null
-        })
+      // Lấy thông tin tất cả item trong 1 request thay vì gọi chi tiết từng item
+      const movieIds = favorites.filter(f => f.item_type !== 'show').map(f => f.item_id)
+      const showIds = favorites.filter(f => f.item_type === 'show').map(f => f.item_id)
+      const batchRes = await axios.get('/items/batch', {
+        params: { movie_ids: movieIds.join(','), show_ids: showIds.join(',') }
       })
 
-      const itemResponses = await Promise.all(itemPromises)
-      const items = itemResponses.filter(res => res !== null)
+      const moviesById = new Map(batchRes.data.movies.map(m => [m.id, m]))
+      const showsById = new Map(batchRes.data.shows.map(s => [s.id, s]))
+
+      const items = favorites
+        .map(favorite => {
+          const detail = favorite.item_type === 'show'
+            ? showsById.get(favorite.item_id)
+            : moviesById.get(favorite.item_id)
+          if (!detail) return null
+          return {
+            ...detail,
+            item_type: favorite.item_type,
+            addedToFavorites: favorite.created_at || new Date()
+          }
+        })
+        .filter(item => item !== null)
 
       setFavoriteMovies(items)
     } catch (error) {
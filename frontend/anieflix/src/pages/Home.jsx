@@ -13,14 +13,12 @@ export default function Home() {
   useEffect(() => {
     const fetchAll = async () => {
       try {
-        const [t, r, u] = await Promise.all([
-          axios.get('/movies?type=trending'),
-          axios.get('/movies?type=top_rated'),
-          axios.get('/movies?type=upcoming')
-        ])
-        setTrending(t.data)
-        setTopRated(r.data)
-        setUpcoming(u.data)
+        // Tất cả các hàng của trang chủ trong 1 request
+        const res = await axios.get('/home')
+        const rows = Object.fromEntries(res.data.rows.map(row => [row.tag, row.items]))
+        setTrending(rows.trending || [])
+        setTopRated(rows.top_rated || [])
+        setUpcoming(rows.upcoming || [])
       } catch (err) {
         console.error('[❌ API ERROR]', err)
       }
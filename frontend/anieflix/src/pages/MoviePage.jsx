@@ -2,17 +2,33 @@ import { useEffect, useState } from 'react'
 import { useNavigate } from 'react-router-dom'
 import axios from '../api/axios'
 
+const PAGE_SIZE = 40
+
 export default function MoviePage() {
   const navigate = useNavigate()
   const [movies, setMovies] = useState([])
+  const [nextCursor, setNextCursor] = useState(null)
 
   useEffect(() => {
     axios
-      .get('/movies')
-      .then(res => setMovies(res.data))
+      .get(`/movies?fields=id,title,poster_path,release_date&limit=${PAGE_SIZE}`)
+      .then(res => {
+        setMovies(res.data.items)
+        setNextCursor(res.data.next_cursor)
+      })
       .catch(() => setMovies([]))
   }, [])
 
+  const loadMore = () => {
+    axios
+      .get(`/movies?fields=id,title,poster_path,release_date&limit=${PAGE_SIZE}&cursor=${nextCursor}`)
+      .then(res => {
+        setMovies(prev => [...prev, ...res.data.items])
+        setNextCursor(res.data.next_cursor)
+      })
+      .catch(err => console.error(err))
+  }
+
   if (!movies.length) {
     return (
       <div className="min-h-screen flex items-center justify-center text-lg">
@@ -48,6 +64,17 @@ export default function MoviePage() {
             </div>
           ))}
         </div>
+
+        {nextCursor && (
+          <div className="flex justify-center">
+            <button
+              onClick={loadMore}
+              className="mt-8 px-4 py-2 rounded bg-gray-700 hover:bg-gray-600 text-sm"
+            >
+              Xem thêm
+            </button>
+          </div>
+        )}
       </div>
     </div>
   )
@@ -1,25 +1,62 @@
 import { useEffect, useState } from 'react'
 import axios from 'axios'
 
+const PAGE_SIZE = 20
+
 export default function SearchResults() {
   const [query, setQuery] = useState('')
   const [results, setResults] = useState([])
+  const [suggestions, setSuggestions] = useState([])
+  const [total, setTotal] = useState(0)
+  const [nextCursor, setNextCursor] = useState(null)
 
   useEffect(() => {
     const delayDebounce = setTimeout(() => {
       if (query.trim()) {
         axios
-          .get(`/api/search?q=${encodeURIComponent(query)}`)
-          .then(res => setResults(res.data))
+          .get(`/api/search?q=${encodeURIComponent(query)}&limit=${PAGE_SIZE}`)
+          .then(res => {
+            setResults(res.data.items)
+            setTotal(res.data.total)
+            setNextCursor(res.data.next_cursor)
+          })
           .catch(err => console.error(err))
       } else {
         setResults([])
+        setTotal(0)
+        setNextCursor(null)
       }
     }, 400) // debounce: đợi 400ms sau khi người dùng ngừng gõ
 
     return () => clearTimeout(delayDebounce)
   }, [query])
 
+  // Gợi ý theo tiền tố: endpoint trong bộ nhớ nên debounce ngắn hơn nhiều so với tìm kiếm đầy đủ
+  useEffect(() => {
+    const delaySuggest = setTimeout(() => {
+      if (query.trim()) {
+        axios
+          .get(`/api/search/suggest?q=${encodeURIComponent(query)}`)
+          .then(res => setSuggestions(res.data))
+          .catch(() => setSuggestions([]))
+      } else {
+        setSuggestions([])
+      }
+    }, 80)
+
+    return () => clearTimeout(delaySuggest)
+  }, [query])
+
+  const loadMore = () => {
+    axios
+      .get(`/api/search?q=${encodeURIComponent(query)}&limit=${PAGE_SIZE}&cursor=${nextCursor}`)
+      .then(res => {
+        setResults(prev => [...prev, ...res.data.items])
+        setNextCursor(res.data.next_cursor)
+      })
+      .catch(err => console.error(err))
+  }
+
   return (
     <div className="px-6 py-8 text-white">
       <input
@@ -29,7 +66,21 @@ export default function SearchResults() {
         placeholder="Tìm kiếm phim hoặc show..."
         className="w-full p-2 mb-4 rounded bg-gray-700 text-white placeholder-gray-400"
       />
-      <h2 className="text-xl font-semibold mb-4">Kết quả cho: "{query}"</h2>
+      {suggestions.length > 0 && (
+        <ul className="mb-4 -mt-3 rounded bg-gray-800 divide-y divide-gray-700">
+          {suggestions.map(item => (
+            <li
+              key={`${item.type}-${item.id}`}
+              onClick={() => setQuery(item.title)}
+              className="px-3 py-2 text-sm cursor-pointer hover:bg-gray-700 flex justify-between"
+            >
+              <span>{item.title}</span>
+              <span className="text-xs text-gray-400 uppercase">{item.type}</span>
+            </li>
+          ))}
+        </ul>
+      )}
+      <h2 className="text-xl font-semibold mb-4">Kết quả cho: "{query}" {total > 0 && `(${total})`}</h2>
       {results.length === 0 ? (
         <p>Không tìm thấy kết quả nào.</p>
       ) : (
@@ -50,6 +101,14 @@ export default function SearchResults() {
           ))}
         </div>
       )}
+      {nextCursor && (
+        <button
+          onClick={loadMore}
+          className="mt-6 px-4 py-2 rounded bg-gray-700 hover:bg-gray-600 text-sm"
+        >
+          Xem thêm
+        </button>
+      )}
     </div>
   )
 }
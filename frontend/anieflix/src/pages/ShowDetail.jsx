@@ -93,8 +93,9 @@ export default function ShowDetail() {
 
   const fetchSuggested = async () => {
     try {
-      const res = await axios.get('/shows')
-      setSuggested(res.data.filter(s => String(s.id) !== String(id)).slice(0, 8))
+      // Chỉ cần vài show mới nhất (trừ show đang xem), không tải cả danh sách
+      const res = await axios.get('/shows?limit=9&fields=id,title,show_poster')
+      setSuggested(res.data.items.filter(s => String(s.id) !== String(id)).slice(0, 8))
     } catch (error) {
       console.error('Error fetching suggested shows:', error)
       setSuggested([])
@@ -3,16 +3,33 @@ import { useNavigate } from 'react-router-dom'
 import { useEffect, useState } from 'react'
 import axios from 'axios'
 
+const PAGE_SIZE = 40
+
 export default function ShowPage() {
   const navigate = useNavigate()
   const [shows, setShows] = useState([])
+  const [nextCursor, setNextCursor] = useState(null)
 
   useEffect(() => {
-    axios.get('/api/shows')
-      .then(res => setShows(res.data))
+    axios
+      .get(`/api/shows?fields=id,title,show_poster,year,genre&limit=${PAGE_SIZE}`)
+      .then(res => {
+        setShows(res.data.items)
+        setNextCursor(res.data.next_cursor)
+      })
       .catch(() => setShows([]))
   }, [])
 
+  const loadMore = () => {
+    axios
+      .get(`/api/shows?fields=id,title,show_poster,year,genre&limit=${PAGE_SIZE}&cursor=${nextCursor}`)
+      .then(res => {
+        setShows(prev => [...prev, ...res.data.items])
+        setNextCursor(res.data.next_cursor)
+      })
+      .catch(err => console.error(err))
+  }
+
   if (!shows.length) {
     return (
       <div className="min-h-screen flex items-center justify-center text-lg">
@@ -49,6 +66,17 @@ export default function ShowPage() {
             </div>
           ))}
         </div>
+
+        {nextCursor && (
+          <div className="flex justify-center">
+            <button
+              onClick={loadMore}
+              className="mt-8 px-4 py-2 rounded bg-gray-700 hover:bg-gray-600 text-sm"
+            >
+              Xem thêm
+            </button>
+          </div>
+        )}
       </div>
     </div>
   )